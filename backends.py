@@ -0,0 +1,691 @@
+import csv
+import glob
+import io
+import json
+import os
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+import metrics
+from categories import roll_up_frame
+from validation import DEFAULT_ACCOUNT
+
+
+def typed_frame(df, columns, date_format):
+    """Coerce a ledger frame to the in-memory dtypes (parsing string dates)."""
+    df = df.reindex(columns=columns)
+    if "id" in df:
+        # Ledgers written before ids existed lack the column; the store numbers them.
+        df["id"] = pd.to_numeric(df["id"], errors="coerce")
+    df["date"] = parse_dates(df["date"], date_format)
+    df["amount"] = df["amount"].astype("float64")
+    df["category"] = df["category"].astype(object)
+    df["description"] = df["description"].fillna("").astype(object)
+    if "account" in df:
+        # Ledgers written before accounts existed keep every row in the default one.
+        df["account"] = df["account"].fillna(DEFAULT_ACCOUNT).astype(object)
+    return df.reset_index(drop=True)
+
+
+def parse_dates(values, date_format, errors="raise"):
+    """to_datetime via the distinct strings only; ledgers repeat each day many times."""
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values.astype("datetime64[ns]")
+    with metrics.span("parse_dates"):
+        return _parse_dates(values, date_format, errors)
+
+
+def _parse_dates(values, date_format, errors):
+    codes, uniques = pd.factorize(values)
+    parsed = pd.to_datetime(pd.Index(uniques, dtype=object).str.strip(), format=date_format, errors=errors)
+    # Missing values get code -1, which picks the trailing NaT.
+    lookup = np.append(parsed.to_numpy(dtype="M8[ns]"), np.datetime64("NaT", "ns"))
+    return pd.Series(lookup[codes], index=values.index)
+
+
+def format_dates(dates, date_format):
+    """strftime via the distinct dates only; ledgers repeat each day many times."""
+    codes, uniques = pd.factorize(dates)
+    lookup = np.append(uniques.strftime(date_format).to_numpy(dtype=object), "")
+    return pd.Series(lookup[codes], index=dates.index)
+
+
+def _dictionary_codes(values, names):
+    """Codes of ``values`` into the list ``names``, appending the values it lacks."""
+    values = values.astype("category")
+    for value in values.cat.categories.tolist():
+        if value not in names:
+            names.append(value)
+    lookup = pd.Index(names).get_indexer(values.cat.categories)
+    return lookup[values.cat.codes.to_numpy()]
+
+
+def _fsync_write(path, data, mode="wb"):
+    with open(path, mode) as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+class CSVBackend:
+    """The original text layout: one finance_data.csv with a header row."""
+
+    def __init__(self, path, columns, date_format):
+        self.path = path
+        self.columns = columns
+        self.date_format = date_format
+
+    @property
+    def commit_path(self):
+        """File whose mtime/size change whenever the ledger changes."""
+        return self.path
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def create(self):
+        pd.DataFrame(columns=self.columns).to_csv(self.path, index=False)
+
+    def outdated(self):
+        """True if the file lacks a column (e.g. one written before accounts); the store rewrites it."""
+        with open(self.path, newline="") as f:
+            return next(csv.reader(f), []) != self.columns
+
+    def read(self):
+        return typed_frame(pd.read_csv(self.path), self.columns, self.date_format)
+
+    def iter_chunks(self, chunksize):
+        """Yield the ledger as typed frames of at most ``chunksize`` rows."""
+        for chunk in pd.read_csv(self.path, chunksize=chunksize):
+            yield typed_frame(chunk, self.columns, self.date_format)
+
+    def append(self, df):
+        out = df.copy()
+        out["date"] = format_dates(out["date"], self.date_format)
+        with open(self.path, "a", newline="") as csvfile:
+            out.to_csv(csvfile, header=False, index=False, columns=self.columns)
+
+    def prepare_write(self, df):
+        """Write ``df`` to a temp file and return its path; see commit_write."""
+        out = df.copy()
+        out["date"] = format_dates(out["date"], self.date_format)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", newline="") as tmp:
+            out.to_csv(tmp, index=False)
+            tmp.flush()
+            os.fsync(tmp.fileno())
+        return tmp_path
+
+    def commit_write(self, tmp_path):
+        os.replace(tmp_path, self.path)
+
+
+class ColumnarBackend:
+    """
+    Binary column files under a directory, readable with ``np.memmap``.
+
+    Layout of ``<path>/``:
+        meta.json                 row count, category and account dictionaries, generation
+        id.<gen>.bin              int64 transaction ids
+        date.<gen>.bin            datetime64[ns]
+        amount.<gen>.bin          float64
+        category.<gen>.bin        uint16 codes into meta["categories"]
+        description.<gen>.bin     UTF-8 strings, each terminated by NUL
+        account.<gen>.bin         uint16 codes into meta["accounts"]
+
+    meta.json is the commit point: appends write past the committed length
+    and then replace meta.json, so a torn append is invisible and is
+    truncated away by the next one. Full rewrites go to a new generation of
+    column files and become live when meta.json switches to it.
+
+    Version 2 directories (uint8 category codes, no accounts) are still
+    read; ``outdated()`` tells the store to rewrite them as version 3.
+    """
+
+    NUMERIC = {"id": "int64", "date": "M8[ns]", "amount": "float64", "category": "uint16", "account": "uint16"}
+
+    def __init__(self, path, columns, date_format):
+        self.path = path
+        self.columns = columns
+        self.date_format = date_format
+
+    @property
+    def commit_path(self):
+        return os.path.join(self.path, "meta.json")
+
+    def exists(self):
+        return os.path.exists(self.commit_path)
+
+    def create(self):
+        os.makedirs(self.path, exist_ok=True)
+        self.commit_write(self.prepare_write(pd.DataFrame(columns=self.columns)))
+
+    def _file(self, column, generation):
+        return os.path.join(self.path, f"{column}.{generation}.bin")
+
+    def meta(self):
+        with open(self.commit_path) as f:
+            return json.load(f)
+
+    def outdated(self):
+        return self.meta()["version"] < 3
+
+    def _dtype(self, column, meta):
+        if column == "category" and meta["version"] < 3:
+            return "uint8"
+        return self.NUMERIC[column]
+
+    def _write_meta(self, meta):
+        tmp_path = self.commit_path + ".tmp"
+        _fsync_write(tmp_path, json.dumps(meta).encode())
+        return tmp_path
+
+    def memmap(self, column, meta=None):
+        """Zero-copy, read-only view of a numeric column."""
+        meta = meta or self.meta()
+        if meta["rows"] == 0:
+            return np.empty(0, dtype=self._dtype(column, meta))
+        return np.memmap(self._file(column, meta["generation"]), dtype=self._dtype(column, meta),
+                         mode="r", shape=(meta["rows"],))
+
+    def _frame(self, meta, start, stop, descriptions):
+        """Rows ``start:stop`` decoded from the memory-mapped columns."""
+        def decoded(column, names):
+            codes = np.asarray(self.memmap(column, meta)[start:stop], dtype="int32")
+            return pd.Series(pd.Categorical.from_codes(codes, names), dtype=object)
+
+        # Version 1 directories predate ids; the store assigns them on load.
+        if meta["version"] >= 2:
+            ids = np.array(self.memmap("id", meta)[start:stop])
+        else:
+            ids = np.full(stop - start, np.nan)
+        return pd.DataFrame({
+            "id": ids,
+            "date": np.array(self.memmap("date", meta)[start:stop]),
+            "amount": np.array(self.memmap("amount", meta)[start:stop]),
+            "category": decoded("category", meta["categories"]),
+            "description": pd.Series(descriptions, dtype=object),
+            "account": decoded("account", meta["accounts"]) if meta["version"] >= 3 else DEFAULT_ACCOUNT,
+        }, columns=self.columns)
+
+    def read(self):
+        meta = self.meta()
+        with open(self._file("description", meta["generation"]), "rb") as f:
+            blob = f.read(meta["description_bytes"])
+        descriptions = blob.decode().split("\0")[:-1] if blob else []
+        return self._frame(meta, 0, meta["rows"], descriptions)
+
+    def iter_chunks(self, chunksize, block_size=1 << 20):
+        """
+        Yield the ledger as typed frames of at most ``chunksize`` rows.
+
+        Numeric columns are sliced from their memory maps; descriptions are
+        read ``block_size`` bytes at a time, so memory stays bounded by the
+        chunk size whatever the ledger size.
+        """
+        meta = self.meta()
+        remaining = meta["description_bytes"]
+        pending, tail = [], b""
+        with open(self._file("description", meta["generation"]), "rb") as f:
+            for start in range(0, meta["rows"], chunksize):
+                stop = min(start + chunksize, meta["rows"])
+                while len(pending) < stop - start and remaining:
+                    block = f.read(min(block_size, remaining))
+                    remaining -= len(block)
+                    parts = (tail + block).split(b"\0")
+                    tail = parts.pop()
+                    pending.extend(part.decode() for part in parts)
+                descriptions, pending = pending[:stop - start], pending[stop - start:]
+                yield self._frame(meta, start, stop, descriptions)
+
+    def _encode(self, df, categories, accounts):
+        text = "".join(str(d).replace("\0", "") + "\0" for d in df["description"]).encode()
+        return {
+            "id": df["id"].to_numpy(dtype="int64").tobytes(),
+            "date": df["date"].to_numpy(dtype="M8[ns]").tobytes(),
+            "amount": df["amount"].to_numpy(dtype="float64").tobytes(),
+            "category": _dictionary_codes(df["category"], categories).astype("uint16").tobytes(),
+            "description": text,
+            "account": _dictionary_codes(df["account"], accounts).astype("uint16").tobytes(),
+        }
+
+    def append(self, df):
+        meta = self.meta()
+        chunks = self._encode(df, meta["categories"], meta["accounts"])
+        committed = {column: meta["rows"] * np.dtype(dtype).itemsize for column, dtype in self.NUMERIC.items()}
+        committed["description"] = meta["description_bytes"]
+        for column, data in chunks.items():
+            with open(self._file(column, meta["generation"]), "r+b") as f:
+                f.truncate(committed[column])
+                f.seek(0, os.SEEK_END)
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+        meta["rows"] += len(df)
+        meta["description_bytes"] += len(chunks["description"])
+        os.replace(self._write_meta(meta), self.commit_path)
+
+    def prepare_write(self, df):
+        try:
+            generation = self.meta()["generation"] + 1
+        except FileNotFoundError:
+            generation = 0
+        categories, accounts = [], []
+        chunks = self._encode(df, categories, accounts)
+        for column, data in chunks.items():
+            _fsync_write(self._file(column, generation), data)
+        meta = {
+            "version": 3,
+            "generation": generation,
+            "rows": len(df),
+            "description_bytes": len(chunks["description"]),
+            "categories": categories,
+            "accounts": accounts,
+        }
+        return self._write_meta(meta)
+
+    def commit_write(self, tmp_path):
+        os.replace(tmp_path, self.commit_path)
+        generation = self.meta()["generation"]
+        for stale in glob.glob(os.path.join(self.path, "*.bin")):
+            if not stale.endswith(f".{generation}.bin"):
+                os.remove(stale)
+
+
+class PartitionedBackend:
+    """
+    One CSV file per calendar month under a directory.
+
+    Layout of ``<path>/``:
+        manifest.json             generation, and per month its file, size and row count
+        <YYYY-MM>.<gen>.csv       that month's rows, with a header row
+
+    manifest.json is the commit point, as meta.json is for ColumnarBackend:
+    appends write past a partition's committed size and then replace the
+    manifest, and full rewrites produce a new generation of files. Range
+    queries only need to read the months they overlap (see parallel.py).
+    Version 1 partitions have no account column; ``outdated()`` tells the
+    store to rewrite them.
+    """
+
+    def __init__(self, path, columns, date_format):
+        self.path = path
+        self.columns = columns
+        self.date_format = date_format
+
+    @property
+    def commit_path(self):
+        return os.path.join(self.path, "manifest.json")
+
+    def exists(self):
+        return os.path.exists(self.commit_path)
+
+    def create(self):
+        os.makedirs(self.path, exist_ok=True)
+        self.commit_write(self.prepare_write(pd.DataFrame(columns=self.columns)))
+
+    def manifest(self):
+        with open(self.commit_path) as f:
+            return json.load(f)
+
+    def outdated(self):
+        return self.manifest()["version"] < 2
+
+    def _write_manifest(self, manifest):
+        tmp_path = self.commit_path + ".tmp"
+        _fsync_write(tmp_path, json.dumps(manifest).encode())
+        return tmp_path
+
+    def _groups(self, df):
+        """``df`` split by month, as (key, rows) pairs."""
+        if df.empty:
+            return []
+        return list(df.groupby(format_dates(df["date"], "%Y-%m").to_numpy(), sort=True))
+
+    def _encode(self, df, header):
+        out = df.copy()
+        out["date"] = format_dates(out["date"], self.date_format)
+        return out.to_csv(index=False, header=header, columns=self.columns).encode()
+
+    def partitions(self, start=None, end=None, manifest=None):
+        """Keys ("YYYY-MM") of the months overlapping start..end, oldest first."""
+        manifest = manifest or self.manifest()
+        first = None if start is None else pd.Timestamp(start).strftime("%Y-%m")
+        last = None if end is None else pd.Timestamp(end).strftime("%Y-%m")
+        return [key for key in sorted(manifest["partitions"])
+                if (first is None or key >= first) and (last is None or key <= last)]
+
+    def read_partition(self, key, manifest=None):
+        manifest = manifest or self.manifest()
+        entry = manifest["partitions"][key]
+        with open(os.path.join(self.path, entry["file"]), "rb") as f:
+            data = f.read(entry["bytes"])
+        return typed_frame(pd.read_csv(io.BytesIO(data)), self.columns, self.date_format)
+
+    def read(self):
+        manifest = self.manifest()
+        parts = [self.read_partition(key, manifest) for key in self.partitions(manifest=manifest)]
+        if not parts:
+            return typed_frame(pd.DataFrame(columns=self.columns), self.columns, self.date_format)
+        return pd.concat(parts, ignore_index=True)
+
+    def iter_chunks(self, chunksize):
+        """Yield the ledger month by month, in frames of at most ``chunksize`` rows."""
+        manifest = self.manifest()
+        for key in self.partitions(manifest=manifest):
+            part = self.read_partition(key, manifest)
+            for start in range(0, len(part), chunksize):
+                yield part.iloc[start:start + chunksize]
+
+    def append(self, df):
+        manifest = self.manifest()
+        for key, rows in self._groups(df):
+            entry = manifest["partitions"].get(key)
+            if entry is None:
+                entry = {"file": f"{key}.{manifest['generation']}.csv", "bytes": 0, "rows": 0}
+                manifest["partitions"][key] = entry
+            data = self._encode(rows, header=entry["bytes"] == 0)
+            with open(os.path.join(self.path, entry["file"]), "ab") as f:
+                f.truncate(entry["bytes"])
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            entry["bytes"] += len(data)
+            entry["rows"] += len(rows)
+        os.replace(self._write_manifest(manifest), self.commit_path)
+
+    def prepare_write(self, df):
+        try:
+            generation = self.manifest()["generation"] + 1
+        except FileNotFoundError:
+            generation = 0
+        partitions = {}
+        for key, rows in self._groups(df):
+            name = f"{key}.{generation}.csv"
+            data = self._encode(rows, header=True)
+            _fsync_write(os.path.join(self.path, name), data)
+            partitions[key] = {"file": name, "bytes": len(data), "rows": len(rows)}
+        return self._write_manifest({"version": 2, "generation": generation, "partitions": partitions})
+
+    def commit_write(self, tmp_path):
+        os.replace(tmp_path, self.commit_path)
+        live = {entry["file"] for entry in self.manifest()["partitions"].values()}
+        for stale in glob.glob(os.path.join(self.path, "*.csv")):
+            if os.path.basename(stale) not in live:
+                os.remove(stale)
+
+
+class SQLiteBackend:
+    """
+    A SQLite database with one ``transactions`` table.
+
+    Dates are stored as ISO ``YYYY-MM-DD`` text, indexed on their own and
+    together with the category. Categories and accounts are stored once in
+    the ``categories`` and ``accounts`` tables and referenced by integer id;
+    the ``ledger`` view joins the names back in. The database runs in WAL
+    mode, so readers in other processes never see a half-written ledger and
+    are not blocked by a writer. Unlike the file backends it changes rows in
+    place: ``update``/``delete`` are single statements, so the store needs
+    no append log, and ``get``/``range``/``summary``/``daily_totals``/
+    ``totals_by`` run as indexed SQL queries without loading the ledger.
+
+    Every write also bumps a ``generation`` counter in the ``meta`` table in
+    the same transaction; ``signature()`` reports it so other sessions can
+    tell when to reload. Databases from before accounts (category names in
+    every row) are converted when first opened.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS categories (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE);
+        CREATE TABLE IF NOT EXISTS accounts (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE);
+        CREATE TABLE IF NOT EXISTS transactions (
+            id INTEGER PRIMARY KEY,
+            date TEXT NOT NULL,
+            amount REAL NOT NULL,
+            category_id INTEGER NOT NULL REFERENCES categories (id),
+            description TEXT NOT NULL DEFAULT '',
+            account_id INTEGER NOT NULL REFERENCES accounts (id)
+        );
+        CREATE INDEX IF NOT EXISTS transactions_date ON transactions (date);
+        CREATE INDEX IF NOT EXISTS transactions_category_date ON transactions (category_id, date);
+        CREATE VIEW IF NOT EXISTS ledger AS
+            SELECT t.id, t.date, t.amount, c.name AS category, t.description, a.name AS account
+            FROM transactions t
+            JOIN categories c ON c.id = t.category_id
+            JOIN accounts a ON a.id = t.account_id;
+        CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL);
+        INSERT OR IGNORE INTO meta VALUES ('generation', 0);
+    """
+    MIGRATE_V1 = """
+        DROP INDEX IF EXISTS transactions_date;
+        DROP INDEX IF EXISTS transactions_category_date;
+        ALTER TABLE transactions RENAME TO transactions_v1;
+        {schema};
+        INSERT OR IGNORE INTO categories (name) SELECT DISTINCT category FROM transactions_v1;
+        INSERT OR IGNORE INTO accounts (name) VALUES (:account);
+        INSERT INTO transactions
+            SELECT t.id, t.date, t.amount, c.id, t.description, (SELECT id FROM accounts WHERE name = :account)
+            FROM transactions_v1 t JOIN categories c ON c.name = t.category;
+        DROP TABLE transactions_v1;
+        UPDATE meta SET value = value + 1 WHERE key = 'generation';
+    """
+    DATA_COLUMNS = ["id", "date", "amount", "category", "description", "account"]
+    # Groupings totals_by accepts
+    GROUPS = ("account", "category")
+
+    def __init__(self, path, columns, date_format):
+        self.path = path
+        self.columns = columns
+        self.date_format = date_format
+        self._connection = None
+
+    @property
+    def commit_path(self):
+        return self.path
+
+    def connection(self):
+        if self._connection is None:
+            # The store serializes access with its lock; GUI jobs use worker threads.
+            self._connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._migrate(self._connection)
+        return self._connection
+
+    def _migrate(self, db):
+        """Convert a database written before accounts, in one transaction."""
+        def columns():
+            return [row[1] for row in db.execute("PRAGMA table_info(transactions)")]
+
+        if "category" not in columns():
+            return
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            # Another process may have converted it while we waited for the lock.
+            if "category" in columns():
+                script = self.MIGRATE_V1.format(schema=self.SCHEMA)
+                for statement in script.split(";"):
+                    if statement.strip():
+                        db.execute(statement, {"account": DEFAULT_ACCOUNT} if ":account" in statement else ())
+        except BaseException:
+            db.rollback()
+            raise
+        db.commit()
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def create(self):
+        with self.connection() as db:
+            db.executescript(self.SCHEMA)
+
+    def signature(self):
+        """(generation, 0); rows change in place, so there is no meaningful size to report."""
+        (generation,) = self.connection().execute("SELECT value FROM meta WHERE key = 'generation'").fetchone()
+        return (generation, 0)
+
+    def _bump(self, db):
+        db.execute("UPDATE meta SET value = value + 1 WHERE key = 'generation'")
+
+    def _ids(self, db, table, names):
+        """{name: id} from a dictionary table, adding the ``names`` it lacks."""
+        db.executemany(f"INSERT OR IGNORE INTO {table} (name) VALUES (?)", [(name,) for name in names])
+        return dict(db.execute(f"SELECT name, id FROM {table}").fetchall())
+
+    def _frame(self, rows):
+        df = pd.DataFrame(rows, columns=self.DATA_COLUMNS)
+        df["date"] = parse_dates(df["date"], "%Y-%m-%d")
+        return typed_frame(df, self.columns, self.date_format)
+
+    def _rows(self, db, df):
+        def ids(column, table):
+            values = df[column].astype(object)
+            return values.map(self._ids(db, table, pd.unique(values).tolist()))
+
+        out = pd.DataFrame({
+            "id": df["id"].astype("int64"),
+            "date": format_dates(df["date"], "%Y-%m-%d"),
+            "amount": df["amount"].astype("float64"),
+            "category_id": ids("category", "categories"),
+            "description": df["description"].fillna(""),
+            "account_id": ids("account", "accounts"),
+        })
+        return list(out.itertuples(index=False, name=None))
+
+    def read(self):
+        return self._frame(self.connection().execute(
+            "SELECT id, date, amount, category, description, account FROM ledger ORDER BY id"
+        ).fetchall())
+
+    def iter_chunks(self, chunksize):
+        """Yield the ledger as typed frames of at most ``chunksize`` rows."""
+        cursor = self.connection().cursor()
+        cursor.execute("SELECT id, date, amount, category, description, account FROM ledger ORDER BY id")
+        while True:
+            rows = cursor.fetchmany(chunksize)
+            if not rows:
+                break
+            yield self._frame(rows)
+
+    def append(self, df):
+        with self.connection() as db:
+            db.executemany("INSERT INTO transactions VALUES (?, ?, ?, ?, ?, ?)", self._rows(db, df))
+            self._bump(db)
+
+    def update(self, transaction_id, row):
+        """Replace one row with ``row`` (a records.Transaction)."""
+        with self.connection() as db:
+            category_id = self._ids(db, "categories", [row.category])[row.category]
+            account_id = self._ids(db, "accounts", [row.account])[row.account]
+            db.execute(
+                "UPDATE transactions SET date = ?, amount = ?, category_id = ?, description = ?, account_id = ?"
+                " WHERE id = ?",
+                (row.date.strftime("%Y-%m-%d"), row.amount, category_id, row.description, account_id,
+                 int(transaction_id)),
+            )
+            self._bump(db)
+
+    def delete(self, transaction_id):
+        with self.connection() as db:
+            db.execute("DELETE FROM transactions WHERE id = ?", (int(transaction_id),))
+            self._bump(db)
+
+    def prepare_write(self, df):
+        """Stage ``df`` in a scratch table and return its name; see commit_write."""
+        with self.connection() as db:
+            db.execute("DROP TABLE IF EXISTS transactions_staging")
+            db.execute("CREATE TABLE transactions_staging AS SELECT * FROM transactions WHERE 0")
+            db.executemany("INSERT INTO transactions_staging VALUES (?, ?, ?, ?, ?, ?)", self._rows(db, df))
+        return "transactions_staging"
+
+    def commit_write(self, staging):
+        # One transaction: readers see the old ledger or the new one.
+        with self.connection() as db:
+            db.execute("DELETE FROM transactions")
+            db.execute(f"INSERT INTO transactions SELECT * FROM {staging}")
+            db.execute(f"DROP TABLE {staging}")
+            db.execute("DELETE FROM categories WHERE id NOT IN (SELECT category_id FROM transactions)")
+            db.execute("DELETE FROM accounts WHERE id NOT IN (SELECT account_id FROM transactions)")
+            self._bump(db)
+
+    # ---------- queries ----------
+    def _between(self, start, end):
+        return pd.Timestamp(start).strftime("%Y-%m-%d"), pd.Timestamp(end).strftime("%Y-%m-%d")
+
+    def range(self, start, end):
+        """Rows with start <= date <= end, in date order, indexed by id."""
+        rows = self.connection().execute(
+            "SELECT id, date, amount, category, description, account FROM ledger"
+            " WHERE date BETWEEN ? AND ? ORDER BY date, id",
+            self._between(start, end),
+        ).fetchall()
+        return self._frame(rows).set_index("id")
+
+    def count(self):
+        return self.connection().execute("SELECT COUNT(*) FROM transactions").fetchone()[0]
+
+    def get(self, transaction_id):
+        """One row as a frame indexed by id; empty if there is no such id."""
+        rows = self.connection().execute(
+            "SELECT id, date, amount, category, description, account FROM ledger WHERE id = ?",
+            (int(transaction_id),),
+        ).fetchall()
+        return self._frame(rows).set_index("id")
+
+    def date_span(self):
+        """(first, last) date as Timestamps, or None when the table is empty."""
+        first, last = self.connection().execute("SELECT MIN(date), MAX(date) FROM transactions").fetchone()
+        if first is None:
+            return None
+        return pd.Timestamp(first), pd.Timestamp(last)
+
+    def max_id(self):
+        """The highest id in the table (0 when it is empty)."""
+        return self.connection().execute("SELECT MAX(id) FROM transactions").fetchone()[0] or 0
+
+    def summary(self, start, end):
+        """Per-category amount totals for start <= date <= end."""
+        rows = self.connection().execute(
+            "SELECT c.name, SUM(t.amount) FROM transactions t JOIN categories c ON c.id = t.category_id"
+            " WHERE t.date BETWEEN ? AND ? GROUP BY t.category_id",
+            self._between(start, end),
+        ).fetchall()
+        return {category: float(total) for category, total in rows}
+
+    def daily_totals(self, categories, start, end):
+        """Frame of per-day totals (one column per category, including its subcategories), zero-filled."""
+        start, end = pd.Timestamp(start).normalize(), pd.Timestamp(end).normalize()
+        rows = self.connection().execute(
+            "SELECT date, category, SUM(amount) FROM ledger WHERE date BETWEEN ? AND ? GROUP BY date, category",
+            self._between(start, end),
+        ).fetchall()
+        daily = pd.DataFrame(rows, columns=["date", "category", "amount"])
+        daily["date"] = parse_dates(daily["date"], "%Y-%m-%d")
+        daily = roll_up_frame(daily.pivot(index="date", columns="category", values="amount").fillna(0.0), categories)
+        index = pd.date_range(start, end, freq="D")
+        return daily.reindex(index=index, fill_value=0.0).rename_axis(index=None, columns=None)
+
+    def totals_by(self, columns, start, end):
+        """Amount totals for start <= date <= end grouped by ``columns`` (see GROUPS), as a Series."""
+        if not set(columns) <= set(self.GROUPS):
+            raise ValueError(f"Cannot group by {columns!r}; choose from {self.GROUPS}.")
+        names = ", ".join(columns)
+        rows = self.connection().execute(
+            f"SELECT {names}, SUM(amount) FROM ledger WHERE date BETWEEN ? AND ? GROUP BY {names} ORDER BY {names}",
+            self._between(start, end),
+        ).fetchall()
+        totals = pd.DataFrame(rows, columns=list(columns) + ["amount"])
+        return totals.set_index(list(columns))["amount"]
+
+
+BACKENDS = {"csv": CSVBackend, "columnar": ColumnarBackend, "partitioned": PartitionedBackend, "sqlite": SQLiteBackend}
+
+
+def open_backend(kind, path, columns, date_format):
+    try:
+        backend = BACKENDS[kind]
+    except KeyError:
+        raise ValueError(f"Unknown storage backend {kind!r}; choose from {sorted(BACKENDS)}.")
+    return backend(path, columns, date_format)
@@ -0,0 +1,228 @@
+"""
+Benchmarks for the ledger operations on synthetic data.
+
+    python benchmark.py --sizes 10000 100000 1000000 --out bench.json
+
+Each size gets a fresh ledger in a temp directory. Timings (best of
+``--repeat`` runs, in seconds) are printed and written as JSON so that runs
+from different commits can be compared.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from main import CSV
+
+DESCRIPTION_WORDS = [
+    "grocery", "store", "rent", "salary", "coffee", "shop", "fuel", "station", "restaurant", "online",
+    "transfer", "utilities", "electric", "water", "insurance", "pharmacy", "subscription", "gym",
+    "bookshop", "train", "ticket", "cinema", "refund", "bonus", "market", "hardware", "clinic",
+]
+
+EXPENSE_CATEGORIES = [
+    "Expense/Food/Groceries", "Expense/Food/Restaurants", "Expense/Transport", "Expense/Home", "Expense/Leisure",
+]
+ACCOUNTS = ["Main", "Savings", "Card"]
+
+
+def generate_ledger(rows, seed=0, start="2015-01-01", years=10):
+    """
+    Synthetic ledger with a realistic shape.
+
+    Dates are spread over ``years`` with more activity on weekdays, about
+    one row in ten is income (larger amounts), expenses are log-normal and
+    filed under a handful of subcategories, descriptions are 0-6 words
+    long, and rows are spread over three accounts.
+    """
+    rng = np.random.default_rng(seed)
+    days = pd.date_range(start, periods=int(365.25 * years), freq="D")
+    weights = np.where(days.dayofweek < 5, 1.0, 0.6)
+    dates = np.sort(rng.choice(days.to_numpy(), size=rows, p=weights / weights.sum()))
+    income = rng.random(rows) < 0.1
+    amounts = np.where(income, rng.lognormal(7.5, 0.5, rows), rng.lognormal(3.0, 1.0, rows)).round(2)
+    vocabulary = np.array(DESCRIPTION_WORDS, dtype=object)
+    lengths = rng.integers(0, 7, rows)
+    words = rng.integers(0, len(vocabulary), (rows, 6))
+    descriptions = [" ".join(vocabulary[words[i, :n]]) for i, n in enumerate(lengths)]
+    expenses = np.array(EXPENSE_CATEGORIES, dtype=object)[rng.integers(0, len(EXPENSE_CATEGORIES), rows)]
+    return pd.DataFrame({
+        "id": np.arange(1, rows + 1),
+        "date": dates,
+        "amount": np.maximum(amounts, 0.01),
+        "category": np.where(income, "Income/Salary", expenses),
+        "description": descriptions,
+        "account": np.array(ACCOUNTS, dtype=object)[rng.integers(0, len(ACCOUNTS), rows)],
+    }, columns=CSV.COLUMNS)
+
+
+def _timed(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _quiet(fn):
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()):
+            fn()
+    return run
+
+
+def _gui_refresh(rows, repeat):
+    """Time a headless table refresh; None when no display is available."""
+    import tkinter as tk
+    from widgets import VirtualTable
+    from gui import TABLE_COLUMNS, table_rows
+
+    try:
+        root = tk.Tk()
+    except tk.TclError:
+        return None
+    root.withdraw()
+    table = VirtualTable(root, TABLE_COLUMNS, table_rows)
+    table.pack()
+
+    def refresh():
+        table.set_rows(*rows())
+        root.update_idletasks()
+    try:
+        return _timed(refresh, repeat)
+    finally:
+        root.destroy()
+
+
+def _cli_add(date):
+    """Start a fresh interpreter that imports main and adds one transaction, as the CLI does."""
+    script = "\n".join([
+        "import sys",
+        f"sys.path.insert(0, {os.path.dirname(os.path.abspath(__file__))!r})",
+        "from main import CSV",
+        f"CSV.CSV_FILE, CSV.COLUMNAR_DIR = {CSV.CSV_FILE!r}, {CSV.COLUMNAR_DIR!r}",
+        f"CSV.PARTITION_DIR, CSV.SQLITE_FILE = {CSV.PARTITION_DIR!r}, {CSV.SQLITE_FILE!r}",
+        f"CSV.BACKEND = {CSV.BACKEND!r}",
+        "CSV.initialize_csv()",
+        f"CSV.add_entry({date!r}, 1.0, 'Expense', 'cli bench', on_duplicate='allow')",
+        "CSV.close()",
+    ])
+    subprocess.run([sys.executable, "-c", script], check=True, capture_output=True)
+
+
+def bench_size(rows, repeat, backend, workdir):
+    ledger = generate_ledger(rows)
+    CSV.CSV_FILE = os.path.join(workdir, "finance_data.csv")
+    CSV.COLUMNAR_DIR = os.path.join(workdir, "finance_data.cols")
+    CSV.PARTITION_DIR = os.path.join(workdir, "finance_data.parts")
+    CSV.SQLITE_FILE = os.path.join(workdir, "finance_data.db")
+    CSV.BACKEND = backend
+    CSV._store = None
+    store = CSV.store()
+    if not store.backend.exists():
+        store.backend.create()
+    store.write(ledger)
+    ledger_bytes = sum(
+        os.path.getsize(os.path.join(dirpath, name))
+        for dirpath, _, names in os.walk(workdir) for name in names
+    )
+
+    first, last = ledger["date"].iloc[0], ledger["date"].iloc[-1]
+    mid = first + (last - first) / 2
+    month = (mid.strftime(CSV.DATE_FORMAT), (mid + pd.Timedelta(days=30)).strftime(CSV.DATE_FORMAT))
+    full = (first.strftime(CSV.DATE_FORMAT), last.strftime(CSV.DATE_FORMAT))
+
+    def cold_initialize():
+        CSV._store = None
+        CSV.initialize_csv()
+
+    def cold_load():
+        CSV._store = None
+        CSV.store().frame()
+
+    # With FAST_START, startup may only check the header; the full parse is timed separately.
+    results = {"initialize_csv (startup)": _timed(_quiet(cold_initialize), repeat),
+               "cold load (full parse)": _timed(cold_load, repeat)}
+    counter = iter(range(10 ** 9))
+    results["add_entry"] = _timed(
+        _quiet(lambda: CSV.add_entry(month[0], 12.5, "Expense", f"bench {next(counter)}", on_duplicate="allow")),
+        repeat,
+    )
+    results["get_transactions (30 days)"] = _timed(_quiet(lambda: CSV.get_transactions(*month)), repeat)
+    results["get_transactions (full range)"] = _timed(_quiet(lambda: CSV.get_transactions(*full)), repeat)
+    results["edit_entry"] = _timed(_quiet(lambda: CSV.edit_entry(rows // 2, month[0], 99.0, "Expense", "edited")), repeat)
+    victims = iter(range(rows // 3, rows))
+    results["delete_entry"] = _timed(_quiet(lambda: CSV.delete_entry(next(victims))), repeat)
+    results["plot data (full range)"] = _timed(lambda: CSV.daily_totals(*full), repeat)
+    if backend == "partitioned":
+        results["summary (parallel, full range)"] = _timed(lambda: CSV.query().summary(*full), repeat)
+        results["plot data (parallel, full range)"] = _timed(
+            lambda: CSV.query().daily_totals(["Income", "Expense"], *full), repeat
+        )
+    results["compact"] = _timed(_quiet(CSV.compact), 1)
+    store = CSV.store()
+    gui = _gui_refresh(lambda: (store.slots_frame(), store.live_slots()), repeat)
+    if gui is not None:
+        results["gui table refresh"] = gui
+    CSV.close()
+    results["cli add (new process)"] = _timed(lambda: _cli_add(month[0]), repeat)
+    return {"rows": rows, "backend": backend, "ledger_bytes": ledger_bytes, "seconds": results}
+
+
+def _commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark ledger operations on synthetic data.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--backend", choices=["csv", "columnar", "partitioned", "sqlite"], default="csv")
+    parser.add_argument("--out", help="write the results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    report = {
+        "commit": _commit(),
+        "python": sys.version.split()[0],
+        "pandas": pd.__version__,
+        "platform": platform.platform(),
+        "results": [],
+    }
+    for rows in args.sizes:
+        workdir = tempfile.mkdtemp(prefix="finance-bench-")
+        try:
+            result = bench_size(rows, args.repeat, args.backend, workdir)
+        finally:
+            if CSV._query is not None:
+                CSV._query.close()
+                CSV._query = None
+            CSV._store = None
+            shutil.rmtree(workdir, ignore_errors=True)
+        report["results"].append(result)
+        print(f"\n{rows} rows ({args.backend}):")
+        for operation, seconds in result["seconds"].items():
+            print(f"  {operation:<32} {seconds * 1000:10.2f} ms")
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Hierarchical categories.
+
+A category is a path of names separated by ``SEPARATOR``, such as
+``Expense/Food/Groceries``. The first name is always Income or Expense
+(see validation.parse_category); deeper levels are whatever the user
+types. Rows carry their full path and totals for any node of the tree
+(``Expense``, ``Expense/Food``, ...) are the sum over the paths under it,
+so the income/expense summaries keep working however finely rows are
+categorized. Only the standard library is used here.
+"""
+
+SEPARATOR = "/"
+
+
+def split(category):
+    return str(category).split(SEPARATOR)
+
+
+def root(category):
+    """The top-level name: "Income" or "Expense"."""
+    return split(category)[0]
+
+
+def truncate(category, depth):
+    """The ancestor of ``category`` ``depth`` levels deep (itself if it is shallower)."""
+    return SEPARATOR.join(split(category)[:depth])
+
+
+def ancestors(category):
+    """Every node from the root down to ``category`` itself."""
+    parts = split(category)
+    return [SEPARATOR.join(parts[:depth]) for depth in range(1, len(parts) + 1)]
+
+
+def is_under(category, node):
+    """True if ``category`` is ``node`` or one of its descendants."""
+    category = str(category)
+    return category == node or category.startswith(node + SEPARATOR)
+
+
+def roll_up(totals, nodes):
+    """Totals per node from a {category: total} mapping of leaves."""
+    return {node: sum(total for category, total in totals.items() if is_under(category, node)) for node in nodes}
+
+
+def roll_up_frame(frame, nodes):
+    """``frame`` (one column per category) summed into one column per node, in ``nodes`` order."""
+    out = frame.iloc[:, :0].copy()
+    for node in nodes:
+        out[node] = frame.loc[:, [category for category in frame.columns if is_under(category, node)]].sum(axis=1)
+    return out
+
+
+def mask_under(values, node):
+    """Boolean Series: which entries of a Series of categories lie under ``node``."""
+    values = values.astype(str)
+    return (values == node) | values.str.startswith(node + SEPARATOR)
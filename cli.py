@@ -0,0 +1,344 @@
+"""
+Non-interactive command line, for scripts and cron jobs.
+
+    python cli.py add 05-03-2024 12.50 E/Food "lunch" --account Card
+    python cli.py summary users/*.csv --month 2024-01:2024-12 --out report.csv
+    python cli.py query --range 01-03-2024 31-03-2024 --search coffee
+    python cli.py plot users/*.csv --month 2024-03 --out "plots/{ledger}-{period}.png"
+    python cli.py export --month 2024-01:2024-03 --out "export-{period}.parquet"
+
+Every reporting command takes any number of ledgers (default: the one
+configured in main.CSV) and any number of ranges (``--range START END``,
+``--month YYYY-MM`` or ``--month YYYY-MM:YYYY-MM`` for one range per
+month; default: the whole ledger, recurring transactions due by today
+included). Each ledger is loaded once and all of
+its ranges are answered from the loaded store, mostly from the rollups
+and the query cache, so a year of monthly reports for many users runs in
+one process. Output goes to stdout as a table, or with ``--out`` to CSV,
+JSON or Parquet (by suffix, or ``--format``). ``--out`` may contain
+``{ledger}``, ``{period}``, ``{start}`` and ``{end}`` to write one file per
+ledger and range. Otherwise everything goes into one file, with
+``ledger`` and ``period`` columns telling the rows apart. Plots are rendered
+without a display. Only ``add`` writes to a ledger; the other commands
+open them read-only. The exit status is 1 if anything failed (including
+a missing ledger or a range with nothing to plot).
+"""
+import argparse
+import os
+import sys
+from datetime import datetime, timedelta
+
+from main import CSV, plot_transactions
+
+FORMATS = {".csv": "csv", ".json": "json", ".parquet": "parquet"}
+PLACEHOLDERS = ("{ledger}", "{period}", "{start}", "{end}")
+
+
+class Period:
+    """A named date range: a month ("2024-03") or an explicit START_END range."""
+
+    __slots__ = ("label", "start", "end")
+
+    def __init__(self, label, start, end):
+        self.label = label
+        self.start = start
+        self.end = end
+
+    def fields(self):
+        return {"period": self.label, "start": self.start.strftime(CSV.DATE_FORMAT),
+                "end": self.end.strftime(CSV.DATE_FORMAT)}
+
+
+def _date(value):
+    try:
+        return datetime.strptime(value, CSV.DATE_FORMAT)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid date {value!r}; use {CSV.DATE_FORMAT}") from None
+
+
+def _months(spec):
+    """Periods for "YYYY-MM" or every month of "YYYY-MM:YYYY-MM"."""
+    first, _, last = spec.partition(":")
+    try:
+        month = datetime.strptime(first, "%Y-%m")
+        last = datetime.strptime(last or first, "%Y-%m")
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid month {spec!r}; use YYYY-MM or YYYY-MM:YYYY-MM") from None
+    periods = []
+    while month <= last:
+        following = (month.replace(day=28) + timedelta(days=4)).replace(day=1)
+        periods.append(Period(month.strftime("%Y-%m"), month, following - timedelta(days=1)))
+        month = following
+    return periods
+
+
+def _periods(args):
+    """The ranges asked for, in command-line order; None for the whole ledger."""
+    periods = [period for months in args.month or [] for period in months]
+    for start, end in args.range or []:
+        periods.append(Period(f"{start.strftime(CSV.DATE_FORMAT)}_{end.strftime(CSV.DATE_FORMAT)}", start, end))
+    return periods or None
+
+
+def _whole_ledger():
+    """
+    The range from the first to the last transaction, counting recurring
+    ones due by today; None if the ledger has neither.
+    """
+    span = CSV.date_span()
+    if span is None:
+        return None
+    start, end = (date.to_pydatetime() for date in span)
+    return Period("all", start, end)
+
+
+def _ledgers(args):
+    """
+    Yield (name, periods) for each ledger named on the command line with
+    CSV switched to it; ledgers that do not exist are reported and skipped.
+    """
+    paths = args.ledgers or [None]
+    for path in paths:
+        if path is not None:
+            CSV.use_ledger(path, args.backend)
+        elif args.backend:
+            CSV.use_ledger(CSV.backend(args.backend).path, args.backend)
+        # Checked before a store exists, so nothing (not even a lock file) is created for it.
+        backend = CSV.backend()
+        if not backend.exists():
+            print(f"No ledger at {backend.path}.")
+            args.failed = True
+            continue
+        periods = _periods(args)
+        if periods is None:
+            whole = _whole_ledger()
+            periods = [] if whole is None else [whole]
+        name = os.path.splitext(os.path.basename(os.path.normpath(backend.path)))[0]
+        yield name, periods
+    CSV.close()
+
+
+# ---------- output ----------
+def write_frame(frame, path, fmt=None):
+    """Write ``frame`` to ``path`` as CSV, JSON or Parquet (from the suffix unless ``fmt`` is given)."""
+    fmt = fmt or FORMATS.get(os.path.splitext(path)[1].lower())
+    if fmt == "csv":
+        frame.to_csv(path, index=False, date_format=CSV.DATE_FORMAT)
+    elif fmt == "json":
+        frame.to_json(path, orient="records", date_format="iso", indent=1)
+    elif fmt == "parquet":
+        try:
+            frame.to_parquet(path, index=False)
+        except ImportError:
+            raise ImportError("Parquet output needs pyarrow (or fastparquet) installed.") from None
+    else:
+        raise ValueError(f"Cannot tell the format of {path}; pass --format csv, json or parquet.")
+
+
+def _show(frame, fmt):
+    if fmt == "csv":
+        frame.to_csv(sys.stdout, index=False, date_format=CSV.DATE_FORMAT)
+    elif fmt == "json":
+        print(frame.to_json(orient="records", date_format="iso", indent=1))
+    elif fmt == "parquet":
+        raise ValueError("Parquet output needs --out.")
+    else:
+        print(frame.to_string(index=False, formatters={
+            column: (lambda x: x.strftime(CSV.DATE_FORMAT)) for column in frame.columns if column == "date"
+        }))
+
+
+def _emit(results, out, fmt):
+    """
+    Output (fields, frame) results: all of them to stdout or into one file,
+    tagged with their ledger and period, or one file per distinct ``out``
+    once its placeholders are filled in.
+    """
+    import numpy as np
+    import pandas as pd
+
+    groups = {}
+    for fields, frame in results:
+        target = out.format(**fields) if out else None
+        groups.setdefault(target, []).append((fields, frame))
+    for target, parts in groups.items():
+        if len(parts) > 1:
+            frame = pd.concat([frame for _, frame in parts], ignore_index=True)
+            lengths = [len(part) for _, part in parts]
+            frame.insert(0, "period", np.repeat([fields["period"] for fields, _ in parts], lengths))
+            frame.insert(0, "ledger", np.repeat([fields["ledger"] for fields, _ in parts], lengths))
+        else:
+            frame = parts[0][1]
+        if target is None:
+            _show(frame, fmt)
+            continue
+        directory = os.path.dirname(target)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        write_frame(frame, target, fmt)
+        print(f"Wrote {len(frame)} rows to {target}.")
+
+
+def _rows(period, search=None):
+    frame = (CSV.search(search, period.start, period.end) if search
+             else CSV.transactions(period.start, period.end))
+    return frame.reset_index()
+
+
+# ---------- commands ----------
+def cmd_add(args):
+    if args.ledger:
+        CSV.use_ledger(args.ledger, args.backend)
+    elif args.backend:
+        CSV.use_ledger(CSV.backend(args.backend).path, args.backend)
+    CSV.initialize_csv()
+    date = datetime.today().strftime(CSV.DATE_FORMAT) if args.date == "today" else args.date
+    added = CSV.add_entry(date, args.amount, args.category, args.description, args.account,
+                          on_duplicate=args.duplicates)
+    CSV.close()
+    # A skipped duplicate is not a failure.
+    return added or args.duplicates == "skip"
+
+
+def cmd_query(args):
+    results = []
+    for name, periods in _ledgers(args):
+        for period in periods:
+            results.append((dict(period.fields(), ledger=name), _rows(period, args.search)))
+    _emit(results, args.out, args.format)
+
+
+def cmd_export(args):
+    cmd_query(args)
+
+
+def cmd_summary(args):
+    import pandas as pd
+
+    results = []
+    for name, periods in _ledgers(args):
+        for period in periods:
+            fields = dict(period.fields(), ledger=name)
+            if args.by:
+                frame = CSV.breakdown(period.start, period.end, by=args.by, depth=args.depth).copy()
+            else:
+                income, expense = CSV.summary(period.start, period.end)
+                frame = pd.DataFrame({"income": [income], "expense": [expense], "net": [income - expense]})
+            frame = frame.round(2)
+            # A summary row always says what it covers, even in a file of its own.
+            frame.insert(0, "end", fields["end"])
+            frame.insert(0, "start", fields["start"])
+            results.append((fields, frame))
+    _emit(results, args.out, args.format)
+
+
+def cmd_plot(args):
+    # Checked up front, before any ledger is loaded; the whole-ledger default is one range per ledger.
+    plots = len(args.ledgers or [None]) * len(_periods(args) or [None])
+    if plots > 1 and not any(placeholder in args.out for placeholder in PLACEHOLDERS):
+        print(f"Plotting {plots} ranges needs one of {', '.join(PLACEHOLDERS)} in --out to keep the files apart.")
+        return False
+    ok = True
+    for name, periods in _ledgers(args):
+        for period in periods:
+            out = args.out.format(**period.fields(), ledger=name)
+            directory = os.path.dirname(out)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            ok = plot_transactions(period.start, period.end, out=out) and ok
+    return ok
+
+
+def _add_range_options(parser):
+    parser.add_argument("ledgers", nargs="*", metavar="LEDGER",
+                        help=f"ledger files/directories (default {CSV.CSV_FILE} or the backend's path)")
+    parser.add_argument("--range", nargs=2, type=_date, action="append", metavar=("START", "END"),
+                        help=f"a date range ({CSV.DATE_FORMAT}, inclusive); repeat for several")
+    parser.add_argument("--month", type=_months, action="append", metavar="YYYY-MM[:YYYY-MM]",
+                        help="a month, or every month of a span; repeat for several")
+
+
+def _add_output_options(parser, required=False):
+    parser.add_argument("--out", required=required,
+                        help="write to this file instead of stdout; may use " + ", ".join(PLACEHOLDERS))
+    parser.add_argument("--format", choices=["table", "csv", "json", "parquet"],
+                        help="output format (default: from the --out suffix, else a table)")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Personal Finance Tracker, non-interactive.")
+    parser.add_argument("--backend", choices=sorted(CSV.PATH_SETTINGS),
+                        help=f"storage backend of the ledgers (default {CSV.BACKEND})")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    add = commands.add_parser("add", help="add one transaction")
+    add.add_argument("date", help=f"{CSV.DATE_FORMAT} or 'today'")
+    add.add_argument("amount")
+    add.add_argument("category", help="I/E or Income/Expense, optionally with subcategories (E/Food)")
+    add.add_argument("description", nargs="?", default="")
+    add.add_argument("--account")
+    add.add_argument("--ledger", help="ledger to add to (default: the configured one)")
+    add.add_argument("--duplicates", choices=["skip", "flag", "allow"],
+                     help=f"what to do if the transaction is already in the ledger (default {CSV.DUPLICATES})")
+    add.set_defaults(run=cmd_add)
+
+    query = commands.add_parser("query", help="list the transactions in each range")
+    _add_range_options(query)
+    query.add_argument("--search", help="only rows whose description matches (word prefixes, one typo allowed)")
+    _add_output_options(query)
+    query.set_defaults(run=cmd_query)
+
+    summary = commands.add_parser("summary", help="income, expense and net per range")
+    _add_range_options(summary)
+    summary.add_argument("--by", nargs="+", choices=["account", "category"],
+                         help="break the totals down by account and/or category instead")
+    summary.add_argument("--depth", type=int, help="cut categories to this many levels for --by category")
+    _add_output_options(summary)
+    summary.set_defaults(run=cmd_summary)
+
+    plot = commands.add_parser("plot", help="save an income/expense plot per range")
+    _add_range_options(plot)
+    plot.add_argument("--out", required=True, help="image file (.png, .svg, .pdf, ...); may use "
+                                                   + ", ".join(PLACEHOLDERS))
+    plot.set_defaults(run=cmd_plot)
+
+    export = commands.add_parser("export", help="write the transactions in each range to CSV, JSON or Parquet")
+    _add_range_options(export)
+    _add_output_options(export, required=True)
+    export.set_defaults(run=cmd_export, search=None)
+    return parser
+
+
+def _check_out(parser, out):
+    """Reject an --out template that uses anything but the placeholders, before any work is done."""
+    try:
+        out.format(ledger="", period="", start="", end="")
+    except KeyError as error:
+        parser.error(f"unknown placeholder {{{error.args[0]}}} in --out; use {', '.join(PLACEHOLDERS)}")
+    except (AttributeError, IndexError, ValueError) as error:
+        parser.error(f"invalid --out template {out!r} ({error}); use {', '.join(PLACEHOLDERS)}")
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if getattr(args, "out", None):
+        _check_out(parser, args.out)
+    args.failed = False
+    read_only, CSV.READ_ONLY = CSV.READ_ONLY, args.command != "add"
+    try:
+        ok = args.run(args)
+    except (OSError, ValueError, ImportError) as error:
+        print(f"{args.command} failed: {error}")
+        return 1
+    finally:
+        if CSV.READ_ONLY:
+            # Release the read-only store, so later callers in this process get a writable one.
+            CSV.close()
+            CSV._store = None
+        CSV.READ_ONLY = read_only
+    return 1 if ok is False or args.failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
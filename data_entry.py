@@ -1,50 +1,47 @@
 from datetime import datetime
 
+from validation import DEFAULT_ACCOUNT, parse_account, parse_amount, parse_category, parse_date
+
 # Date format for all date inputs
 DATE_FORMAT = "%d-%m-%Y"
-CATEGORIES = {"I": "Income", "E": "Expense"}
 
 
 def get_date(prompt, allow_default=False):
     """
-    Prompt user for a date. If allow_default is True and input is empty,
-    returns today's date.
+    Prompt user for a date until it is valid. If allow_default is True and
+    input is empty, returns today's date.
     """
-    date_str = input(prompt)
-    if allow_default and not date_str:
-        return datetime.today().strftime(DATE_FORMAT)
-
-    try:
-        valid_date = datetime.strptime(date_str, DATE_FORMAT)
-        return valid_date.strftime(DATE_FORMAT)
-    except ValueError:
-        print("Invalid date format. Please enter the date in dd-mm-yyyy format.")
-        return get_date(prompt, allow_default)
+    while True:
+        date_str = input(prompt)
+        if allow_default and not date_str:
+            return datetime.today().strftime(DATE_FORMAT)
+        try:
+            return parse_date(date_str, DATE_FORMAT).strftime(DATE_FORMAT)
+        except ValueError:
+            print("Invalid date format. Please enter the date in dd-mm-yyyy format.")
 
 
 def get_amount():
     """
     Prompt user to enter an amount. The amount must be a positive number.
     """
-    try:
-        amount = float(input("Enter the amount: "))
-        if amount <= 0:
-            raise ValueError("Amount must be a positive, non-zero value.")
-        return amount
-    except ValueError as e:
-        print(e)
-        return get_amount()
+    while True:
+        try:
+            return parse_amount(input("Enter the amount: "))
+        except ValueError as e:
+            print(e)
 
 
 def get_category():
     """
-    Prompt user to enter a category. 'I' represents Income, 'E' represents Expense.
+    Prompt user to enter a category. 'I' represents Income, 'E' represents Expense;
+    subcategories follow after slashes, e.g. 'E/Food/Groceries'.
     """
-    category = input("Enter the category ('I' for Income or 'E' for Expense): ").strip().upper()
-    if category in CATEGORIES:
-        return CATEGORIES[category]
-    print("Invalid category. Please enter 'I' for Income or 'E' for Expense.")
-    return get_category()
+    while True:
+        try:
+            return parse_category(input("Enter the category ('I' for Income or 'E' for Expense, e.g. E/Food/Groceries): "))
+        except ValueError:
+            print("Invalid category. Please enter 'I' for Income or 'E' for Expense, optionally followed by /subcategories.")
 
 
 def get_description():
@@ -52,3 +49,10 @@ def get_description():
     Prompt user to enter a description for the transaction.
     """
     return input("Enter a description (optional): ")
+
+
+def get_account():
+    """
+    Prompt user for the account; pressing enter uses the default account.
+    """
+    return parse_account(input(f"Enter the account (press enter for {DEFAULT_ACCOUNT}): "))
@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+
+
+def _key(value):
+    return np.datetime64(pd.Timestamp(value), "ns").astype("int64")
+
+
+class DateIndex:
+    """
+    Secondary index keeping row positions sorted by date.
+
+    ``keys`` holds the dates (as int64 nanoseconds) in ascending order and
+    ``order`` the ledger row position for each key, so a date range is two
+    ``searchsorted`` bisections plus a slice. Ties keep ledger order.
+
+    Positions are the store's row slots. The store calls the ``on_*`` hooks
+    after every change; they patch the two arrays in place instead of
+    re-sorting the whole ledger. Deleted slots are left in place (slots
+    never shift) and are filtered out by the store's ``_alive`` mask until
+    the next reload drops them.
+    """
+
+    def __init__(self):
+        self.keys = np.empty(0, dtype="int64")
+        self.order = np.empty(0, dtype="int64")
+
+    def rebuild(self, df):
+        dates = df["date"].to_numpy(dtype="M8[ns]").astype("int64")
+        self.order = np.argsort(dates, kind="stable")
+        self.keys = dates[self.order]
+
+    def _insert(self, position, key):
+        lo = np.searchsorted(self.keys, key, side="left")
+        hi = np.searchsorted(self.keys, key, side="right")
+        at = lo + np.searchsorted(self.order[lo:hi], position)
+        self.keys = np.insert(self.keys, at, key)
+        self.order = np.insert(self.order, at, position)
+
+    def _remove(self, position, key):
+        lo = np.searchsorted(self.keys, key, side="left")
+        hi = np.searchsorted(self.keys, key, side="right")
+        at = lo + np.flatnonzero(self.order[lo:hi] == position)[0]
+        self.keys = np.delete(self.keys, at)
+        self.order = np.delete(self.order, at)
+
+    def on_append(self, df, positions):
+        dates = df["date"].to_numpy(dtype="M8[ns]").astype("int64")
+        new_order = np.argsort(dates, kind="stable")
+        new_keys = dates[new_order]
+        at = np.searchsorted(self.keys, new_keys, side="right")
+        self.keys = np.insert(self.keys, at, new_keys)
+        self.order = np.insert(self.order, at, np.asarray(positions)[new_order])
+
+    def on_update(self, position, old, new):
+        if old.day != new.day:
+            self._remove(position, _key(old.date))
+            self._insert(position, _key(new.date))
+
+    def on_delete(self, position, old):
+        pass
+
+    def positions(self, start, end):
+        """Row positions with start <= date <= end, in date order."""
+        lo = np.searchsorted(self.keys, _key(start), side="left")
+        hi = np.searchsorted(self.keys, _key(end), side="right")
+        return self.order[lo:hi]
@@ -0,0 +1,138 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from backends import format_dates
+from hashing import HASH_FORMAT, digest, normalize_description, row_hash as _row_hash
+
+
+def row_hash(date, amount, category, description, account):
+    """Content hash of one transaction: date, amount in cents, category, normalized description, account."""
+    return _row_hash(pd.Timestamp(date), amount, category, description, account)
+
+
+def frame_hashes(df):
+    """``row_hash`` for every row of a typed ledger frame, as an int64 array."""
+    if df.empty:
+        return np.empty(0, dtype="int64")
+    codes, uniques = pd.factorize(df["description"])
+    descriptions = pd.Series([normalize_description(d) for d in uniques], dtype=object)
+    keys = (
+        format_dates(df["date"], "%Y-%m-%d").astype(object)
+        + "|" + (df["amount"] * 100).round().astype("int64").astype(str).astype(object)
+        + "|" + df["category"].astype(str).astype(object)
+        + "|" + descriptions.to_numpy()[codes]
+        + "|" + df["account"].astype(str).astype(object)
+    )
+    return np.fromiter((digest(key) for key in keys), dtype="int64", count=len(keys))
+
+
+class DedupIndex:
+    """
+    Hash index over (date, amount, category, normalized description, account).
+
+    ``hashes`` holds one content hash per store slot and
+    ``counts`` how many rows share each hash, so duplicate checks are a dict
+    lookup. ``persist()`` saves the hashes and their rows' ids next to the
+    ledger together with the ledger's file signature and next free id; on
+    the next load they are matched to the rows by id (backends need not
+    read rows back in the order they were saved, e.g. partitioned reads by
+    month) and reused only when the ledger's signature is unchanged; a
+    bigger file may be a compaction that rewrote edited rows, so anything
+    else is rebuilt. fastpath.py appends through the same files.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self.path = store.path + ".dedup.npy"
+        self.ids_path = store.path + ".dedup.ids.npy"
+        self.meta_path = store.path + ".dedup.json"
+        self.hashes = np.empty(0, dtype="int64")
+        self.counts = {}
+
+    def _saved(self, df):
+        """(ids, hashes) reusable from the sidecar for rows of ``df``, or None."""
+        try:
+            with open(self.meta_path) as f:
+                meta = json.load(f)
+            saved = np.load(self.path)
+            ids = np.load(self.ids_path)
+        except (OSError, ValueError):
+            return None
+        if meta.get("format") != HASH_FORMAT:
+            return None
+        base, log = self.store._stat_signature()
+        saved_base, saved_log = meta["signature"]
+        if (saved_base is None or len(saved) != meta["rows"] or len(ids) != len(saved) or len(saved) != len(df)
+                or base != tuple(saved_base) or log != (tuple(saved_log) if saved_log else None)):
+            return None
+        return ids, saved
+
+    def rebuild(self, df):
+        saved = self._saved(df)
+        if saved is None:
+            self.hashes = frame_hashes(df)
+        else:
+            ids, saved = saved
+            positions = pd.Index(ids).get_indexer(df.index)
+            known = positions >= 0
+            self.hashes = np.empty(len(df), dtype="int64")
+            self.hashes[known] = saved[positions[known]]
+            self.hashes[~known] = frame_hashes(df[~known])
+        values, counts = np.unique(self.hashes, return_counts=True)
+        self.counts = dict(zip(values.tolist(), counts.tolist()))
+
+    def _count(self, value, delta):
+        count = self.counts.get(value, 0) + delta
+        if count:
+            self.counts[value] = count
+        else:
+            self.counts.pop(value, None)
+
+    def on_append(self, df, positions, hashes=None):
+        """``hashes``, when the caller already has ``frame_hashes(df)``, saves hashing the rows again."""
+        new = frame_hashes(df) if hashes is None else hashes
+        self.hashes = np.concatenate([self.hashes, new])
+        values, counts = np.unique(new, return_counts=True)
+        values = values.tolist()
+        if self.counts:
+            counts = counts + np.fromiter((self.counts.get(value, 0) for value in values), dtype="int64",
+                                          count=len(values))
+        self.counts.update(zip(values, counts.tolist()))
+
+    def on_update(self, position, old, new):
+        value = _row_hash(new.date, new.amount, new.category, new.description, new.account)
+        self._count(int(self.hashes[position]), -1)
+        self._count(value, 1)
+        self.hashes[position] = value
+
+    def on_delete(self, position, old):
+        # The slot stays behind as a tombstone; persist() skips it.
+        self._count(int(self.hashes[position]), -1)
+
+    def persist(self):
+        alive = self.store._alive
+        hashes = self.hashes[alive]
+        for path, values in ((self.path, hashes), (self.ids_path, self.store._df.index.to_numpy()[alive])):
+            tmp_path = path + ".tmp.npy"
+            np.save(tmp_path, values)
+            os.replace(tmp_path, path)
+        meta = {"rows": len(hashes), "signature": self.store._stat_signature(), "next_id": self.store._next_id,
+                "format": HASH_FORMAT}
+        with open(self.meta_path + ".tmp", "w") as f:
+            json.dump(meta, f)
+        os.replace(self.meta_path + ".tmp", self.meta_path)
+
+    # ---------- queries ----------
+    def contains(self, date, amount, category, description, account):
+        return row_hash(self.store.to_datetime(date), amount, category, description, account) in self.counts
+
+    def duplicates(self, df, hashes=None):
+        """Boolean mask of rows of ``df`` that already exist in the ledger (``hashes`` as for ``on_append``)."""
+        if hashes is None:
+            hashes = frame_hashes(df)
+        if not self.counts:
+            return np.zeros(len(hashes), dtype=bool)
+        return np.isin(hashes, np.fromiter(self.counts, dtype="int64", count=len(self.counts)))
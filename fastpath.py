@@ -0,0 +1,114 @@
+"""
+Appending to a CSV ledger without loading it.
+
+Starting the CLI just to add one transaction used to import pandas and
+parse the whole ledger. These helpers use the standard library, plus
+numpy for the duplicate-index sidecar that DedupIndex saves on exit:
+the header is checked, the duplicate check reads the saved hashes and the
+row is written with the csv module. When the sidecar does not match the
+ledger on disk, ``FastAppender.load`` returns False and callers fall back
+to the full TransactionStore. Callers hold ``FastAppender.lock`` (the same
+file lock the store takes) from ``load`` through ``append``.
+"""
+import csv
+import json
+import os
+from datetime import datetime
+
+from hashing import HASH_FORMAT, row_hash
+from locking import FileLock
+import metrics
+
+
+def _stat(path):
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+
+def read_header(path):
+    """The ledger's header row ([] for an empty file), or None if it does not exist."""
+    try:
+        with open(path, newline="") as f:
+            return next(csv.reader(f), [])
+    except FileNotFoundError:
+        return None
+
+
+def create(path, columns):
+    with open(path, "w", newline="") as f:
+        csv.writer(f, lineterminator=os.linesep).writerow(columns)
+
+
+class FastAppender:
+    """Append rows to a CSV ledger, keeping DedupIndex's sidecar in step."""
+
+    def __init__(self, path, columns, date_format):
+        self.path = path
+        self.log_path = path + ".log"
+        self.hashes_path = path + ".dedup.npy"
+        self.ids_path = path + ".dedup.ids.npy"
+        self.meta_path = path + ".dedup.json"
+        self.columns = columns
+        self.date_format = date_format
+        self.lock = FileLock(path)
+        self.meta = None
+        self.hashes = None
+        self.ids = None
+
+    def _signature(self):
+        return [_stat(self.path), _stat(self.log_path)]
+
+    def load(self):
+        """Read the sidecar; False if it is missing or out of date."""
+        import numpy as np
+
+        try:
+            with open(self.meta_path) as f:
+                meta = json.load(f)
+            hashes = np.load(self.hashes_path)
+            ids = np.load(self.ids_path)
+        except (OSError, ValueError):
+            return False
+        if (meta.get("format") != HASH_FORMAT or meta["signature"] != self._signature()
+                or len(hashes) != meta["rows"] or len(ids) != len(hashes)):
+            return False
+        self.meta, self.hashes, self.ids = meta, hashes, ids
+        return True
+
+    def _day(self, date):
+        return datetime.strptime(date, self.date_format) if isinstance(date, str) else date
+
+    def contains(self, date, amount, category, description, account):
+        value = row_hash(self._day(date), amount, category, description, account)
+        return bool((self.hashes == value).any())
+
+    def append(self, date, amount, category, description, account):
+        """Append one row; returns the new transaction's id."""
+        import numpy as np
+
+        day = self._day(date)
+        transaction_id = self.meta["next_id"]
+        row = {"id": transaction_id, "date": day.strftime(self.date_format), "amount": float(amount),
+               "category": category, "description": description or "", "account": account}
+        with open(self.path, "a", newline="") as f:
+            start = f.tell()
+            csv.writer(f, lineterminator=os.linesep).writerow([row[column] for column in self.columns])
+            f.flush()
+            os.fsync(f.fileno())
+            metrics.count("rows_written")
+            metrics.count("bytes_written", f.tell() - start)
+
+        self.hashes = np.append(self.hashes, np.int64(row_hash(day, amount, category, description or "", account)))
+        self.ids = np.append(self.ids, np.int64(transaction_id))
+        for path, values in ((self.hashes_path, self.hashes), (self.ids_path, self.ids)):
+            tmp_path = path + ".tmp.npy"
+            np.save(tmp_path, values)
+            os.replace(tmp_path, path)
+        self.meta.update(rows=len(self.hashes), signature=self._signature(), next_id=transaction_id + 1)
+        with open(self.meta_path + ".tmp", "w") as f:
+            json.dump(self.meta, f)
+        os.replace(self.meta_path + ".tmp", self.meta_path)
+        return transaction_id
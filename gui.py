@@ -1,83 +1,60 @@
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, filedialog
 from datetime import datetime
-import matplotlib.pyplot as plt
-import pandas as pd
-
-# Import CSV and data_entry functions from your modules.
-# For example, if they are in main.py and data_entry.py:
-# from main import CSV
-# from data_entry import get_date, get_amount, get_category, get_description
-
-# For this example, we'll assume CSV is available as defined earlier.
-# (Make sure the CSV class and DATE_FORMAT variable are accessible.)
-
-# If not already done, initialize CSV
-# (Make sure finance_data.csv exists or is created as needed.)
-try:
-    from main import CSV
-except ImportError:
-    # Minimal CSV class for demo purposes if import fails.
-    class CSV:
-        CSV_FILE = "finance_data.csv"
-        COLUMNS = ["date", "amount", "category", "description"]
-        DATE_FORMAT = "%d-%m-%Y"
-    
-        @classmethod
-        def initialize_csv(cls):
-            try:
-                pd.read_csv(cls.CSV_FILE)
-            except FileNotFoundError:
-                df = pd.DataFrame(columns=cls.COLUMNS)
-                df.to_csv(cls.CSV_FILE, index=False)
-    
-        @classmethod
-        def add_entry(cls, date, amount, category, description):
-            new_entry = {"date": date, "amount": amount, "category": category, "description": description}
-            df = pd.read_csv(cls.CSV_FILE)
-            df = df.append(new_entry, ignore_index=True)
-            df.to_csv(cls.CSV_FILE, index=False)
-    
-        @classmethod
-        def get_all_transactions(cls):
-            return pd.read_csv(cls.CSV_FILE)
-    
-        @classmethod
-        def update_csv(cls, df):
-            df.to_csv(cls.CSV_FILE, index=False)
-    
-        @classmethod
-        def edit_entry(cls, index, date, amount, category, description):
-            df = pd.read_csv(cls.CSV_FILE)
-            if index < 0 or index >= len(df):
-                print("Invalid index")
-                return
-            df.at[index, "date"] = date
-            df.at[index, "amount"] = amount
-            df.at[index, "category"] = category
-            df.at[index, "description"] = description
-            cls.update_csv(df)
-    
-        @classmethod
-        def delete_entry(cls, index):
-            df = pd.read_csv(cls.CSV_FILE)
-            if index < 0 or index >= len(df):
-                print("Invalid index")
-                return
-            df = df.drop(index).reset_index(drop=True)
-            cls.update_csv(df)
-            
-CSV.initialize_csv()
+
+import metrics
+from jobs import JobRunner
+from main import CSV
+from records import TransactionBatch
+from validation import DEFAULT_ACCOUNT, parse_account, parse_entry
+from widgets import PlotCanvas, VirtualTable
+
+
+TABLE_COLUMNS = ("ID", "Date", "Amount", "Category", "Description", "Account")
+
+
+def table_rows(frame, positions):
+    """Display values for the ledger rows at ``positions``, one tuple per row."""
+    if frame.index.dtype == object:
+        # Scheduled occurrences (ids "r<rule>") mixed in; batches hold integer ids.
+        rows = TransactionBatch.from_frame(frame.reset_index(drop=True), positions).display_rows(CSV.DATE_FORMAT)
+        return [(transaction_id,) + row[1:] for transaction_id, row in zip(frame.index[positions].tolist(), rows)]
+    return TransactionBatch.from_frame(frame, positions).display_rows(CSV.DATE_FORMAT)
+
+
+def choices(frame, column, defaults):
+    """Combobox values: ``defaults`` plus the names used in ``column`` of the store's frame, sorted."""
+    return sorted(set(defaults) | set(frame[column].cat.categories.tolist()))
+
+
+def format_date(value):
+    """Render a ledger date for display; the store keeps dates as timestamps."""
+    if isinstance(value, str):
+        return value
+    return value.strftime(CSV.DATE_FORMAT)
 
 
 # -------------------
 # GUI Application
 # -------------------
 class FinanceTrackerGUI(tk.Tk):
+    # How often (ms) to stat the ledger for changes written by other sessions
+    WATCH_MS = 1000
+
     def __init__(self):
         super().__init__()
         self.title("Personal Finance Tracker")
         self.geometry("900x600")
+        # Offered in the category/account comboboxes; extended with the names in use once the ledger loads
+        self.category_choices = ["Income", "Expense"]
+        self.account_choices = [DEFAULT_ACCOUNT]
+        
+        # Only checks the file (see CSV.FAST_START); the ledger loads on a worker
+        CSV.initialize_csv()
+        
+        # Status bar for background jobs (storage and aggregation run off the Tk thread)
+        self.create_status_bar()
+        self.jobs = JobRunner(self, on_status=self.set_status)
         
         # Create a Notebook (tabbed interface)
         self.notebook = ttk.Notebook(self)
@@ -101,6 +78,48 @@ class FinanceTrackerGUI(tk.Tk):
         self.create_edit_tab()
         self.create_delete_tab()
         self.create_plot_tab()
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+        self._watch_id = self.after(self.WATCH_MS, self.watch_ledger)
+
+    def on_close(self):
+        self.after_cancel(self._watch_id)
+        self.jobs.shutdown()
+        CSV.close()
+        self.destroy()
+
+    # ---------- STATUS BAR ----------
+    def create_status_bar(self):
+        bar = ttk.Frame(self)
+        bar.pack(side=tk.BOTTOM, fill=tk.X)
+        self.status_text = tk.StringVar(value="Ready")
+        tk.Label(bar, textvariable=self.status_text, anchor=tk.W).pack(side=tk.LEFT, fill=tk.X, expand=True, padx=10)
+        self.button_cancel = tk.Button(bar, text="Cancel", command=lambda: self.jobs.cancel_all(), state=tk.DISABLED)
+        self.button_cancel.pack(side=tk.RIGHT, padx=5, pady=2)
+        self.progress = ttk.Progressbar(bar, mode="indeterminate", length=120)
+        self.progress.pack(side=tk.RIGHT, padx=5)
+
+    def set_status(self, text, busy):
+        self.status_text.set(text)
+        if busy:
+            self.progress.start(10)
+            self.button_cancel.configure(state=tk.NORMAL)
+        else:
+            self.progress.stop()
+            self.button_cancel.configure(state=tk.DISABLED)
+
+    def watch_ledger(self):
+        """Reload the tables only when another session changed the ledger."""
+        if not self.jobs.busy and CSV.changed_on_disk():
+            self.refresh_all_tables()
+        self._watch_id = self.after(self.WATCH_MS, self.watch_ledger)
+
+    def show_job_error(self, error):
+        messagebox.showerror("Error", str(error))
+
+    def run_job(self, fn, on_done=None, key=None, label="Working...", coalesce=True):
+        """Run ``fn()`` on a worker thread and pass its result to ``on_done`` on the Tk thread."""
+        return self.jobs.submit(lambda job: fn(), on_done=on_done, on_error=self.show_job_error, key=key, label=label,
+                                coalesce=coalesce)
 
     # ---------- ADD TAB ----------
     def create_add_tab(self):
@@ -115,8 +134,9 @@ class FinanceTrackerGUI(tk.Tk):
         self.entry_amount = tk.Entry(frm)
         self.entry_amount.grid(row=1, column=1, padx=10, pady=10)
         
+        # Editable: subcategories are typed as paths, e.g. Expense/Food/Groceries
         tk.Label(frm, text="Category:").grid(row=2, column=0, padx=10, pady=10, sticky=tk.W)
-        self.combo_category = ttk.Combobox(frm, values=["Income", "Expense"], state="readonly")
+        self.combo_category = ttk.Combobox(frm, values=self.category_choices)
         self.combo_category.grid(row=2, column=1, padx=10, pady=10)
         self.combo_category.current(0)
         
@@ -124,31 +144,74 @@ class FinanceTrackerGUI(tk.Tk):
         self.entry_description = tk.Entry(frm)
         self.entry_description.grid(row=3, column=1, padx=10, pady=10)
         
-        tk.Button(frm, text="Add Transaction", command=self.add_transaction).grid(row=4, column=0, columnspan=2, pady=20)
+        tk.Label(frm, text="Account:").grid(row=4, column=0, padx=10, pady=10, sticky=tk.W)
+        self.combo_account = ttk.Combobox(frm, values=self.account_choices)
+        self.combo_account.grid(row=4, column=1, padx=10, pady=10)
+        self.combo_account.current(0)
+        
+        tk.Button(frm, text="Add Transaction", command=self.add_transaction).grid(row=5, column=0, columnspan=2, pady=20)
+        tk.Button(frm, text="Import Statement...", command=self.import_statement).grid(row=6, column=0, columnspan=2)
+    
+    def update_choices(self, frame):
+        """Offer the categories and accounts used in the ledger in the comboboxes."""
+        self.category_choices = choices(frame, "category", ["Income", "Expense"])
+        self.account_choices = choices(frame, "account", [DEFAULT_ACCOUNT])
+        self.combo_category.configure(values=self.category_choices)
+        self.combo_account.configure(values=self.account_choices)
     
     def add_transaction(self):
         date = self.entry_date.get().strip()
         amount_str = self.entry_amount.get().strip()
         category = self.combo_category.get().strip()
         description = self.entry_description.get().strip()
+        account = parse_account(self.combo_account.get())
         
-        # Validate date
         try:
-            datetime.strptime(date, CSV.DATE_FORMAT)
-        except ValueError:
-            messagebox.showerror("Invalid Date", f"Enter date in format: {CSV.DATE_FORMAT}")
+            date, amount, category, description = parse_entry(date, amount_str, category, description, CSV.DATE_FORMAT)
+        except ValueError as error:
+            messagebox.showerror("Invalid Transaction", str(error))
             return
         
-        # Validate amount
-        try:
-            amount = float(amount_str)
-            if amount <= 0:
-                raise ValueError
-        except ValueError:
-            messagebox.showerror("Invalid Amount", "Enter a valid positive amount.")
+        # Adds share one queue that runs them in order and never drops one, so
+        # a double click's second check sees the first row.
+        self.run_job(
+            lambda: CSV.add_entry(date, amount, category, description, account, on_duplicate="skip"),
+            on_done=lambda added: self.transaction_added() if added else self.confirm_duplicate(
+                date, amount, category, description, account),
+            key="add",
+            coalesce=False,
+            label="Adding transaction...",
+        )
+
+    def confirm_duplicate(self, date, amount, category, description, account):
+        if messagebox.askyesno("Possible Duplicate", "An identical transaction already exists. Add it anyway?"):
+            self.run_job(
+                lambda: CSV.add_entry(date, amount, category, description, account, on_duplicate="allow"),
+                on_done=lambda _: self.transaction_added(),
+                key="add",
+                coalesce=False,
+                label="Adding transaction...",
+            )
+
+    def import_statement(self):
+        path = filedialog.askopenfilename(
+            title="Import bank statement",
+            filetypes=[("Statements", "*.csv *.ofx *.qfx"), ("All files", "*.*")],
+        )
+        if not path:
             return
-        
-        CSV.add_entry(date, amount, category, description)
+        self.jobs.submit(
+            lambda job: CSV.import_statement(path, on_progress=lambda rows: job.report(f"Importing... {rows} rows read")),
+            on_done=self.statement_imported,
+            on_error=self.show_job_error,
+            label="Importing statement...",
+        )
+
+    def statement_imported(self, report):
+        messagebox.showinfo("Import Finished", str(report))
+        self.refresh_all_tables()
+
+    def transaction_added(self):
         messagebox.showinfo("Success", "Transaction added successfully!")
         self.entry_amount.delete(0, tk.END)
         self.entry_description.delete(0, tk.END)
@@ -173,27 +236,29 @@ class FinanceTrackerGUI(tk.Tk):
         self.view_end_date.insert(0, datetime.today().strftime(CSV.DATE_FORMAT))
         
         tk.Button(filter_frame, text="Filter", command=self.filter_transactions).grid(row=0, column=4, padx=5)
+        tk.Button(filter_frame, text="Show All", command=self.show_all_transactions).grid(row=0, column=5, padx=5)
+        
+        # Description search, applied as you type within the current date filter
+        tk.Label(filter_frame, text="Search:").grid(row=1, column=0, padx=5, pady=(5, 0))
+        self.view_search = tk.Entry(filter_frame)
+        self.view_search.grid(row=1, column=1, columnspan=5, padx=5, pady=(5, 0), sticky=tk.EW)
+        self.view_search.bind("<KeyRelease>", lambda e: self.search_transactions())
+        self.view_range = None
         
-        # Treeview for transactions
-        self.tree_view = ttk.Treeview(frm, columns=("Index", "Date", "Amount", "Category", "Description"), show="headings")
-        self.tree_view.heading("Index", text="Index")
-        self.tree_view.heading("Date", text="Date")
-        self.tree_view.heading("Amount", text="Amount")
-        self.tree_view.heading("Category", text="Category")
-        self.tree_view.heading("Description", text="Description")
+        # Virtual table for transactions
+        self.tree_view = VirtualTable(frm, TABLE_COLUMNS, table_rows)
         self.tree_view.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
         
         self.refresh_view_table()
     
+    def view_filtered(self):
+        return self.view_range is not None or bool(self.view_search.get().strip())
+
     def refresh_view_table(self):
-        for row in self.tree_view.get_children():
-            self.tree_view.delete(row)
-        
-        df = CSV.get_all_transactions()
-        if df is None or df.empty:
-            return
-        for idx, row in df.iterrows():
-            self.tree_view.insert("", tk.END, values=(idx, row["date"], row["amount"], row["category"], row["description"]))
+        if self.view_filtered():
+            self.search_transactions()
+        else:
+            self.refresh_tables(self.tree_view)
     
     def filter_transactions(self):
         start_date = self.view_start_date.get().strip()
@@ -204,32 +269,41 @@ class FinanceTrackerGUI(tk.Tk):
         except ValueError:
             messagebox.showerror("Invalid Date", f"Please enter dates in {CSV.DATE_FORMAT} format.")
             return
-        
-        # Read and filter data
-        df = CSV.get_all_transactions()
-        if df.empty:
-            messagebox.showinfo("No Data", "No transactions available.")
-            return
-        df["date"] = pd.to_datetime(df["date"], format=CSV.DATE_FORMAT)
-        mask = (df["date"] >= start_dt) & (df["date"] <= end_dt)
-        filtered = df.loc[mask]
-        
-        for row in self.tree_view.get_children():
-            self.tree_view.delete(row)
-        for idx, row in filtered.iterrows():
-            self.tree_view.insert("", tk.END, values=(idx, row["date"].strftime(CSV.DATE_FORMAT), row["amount"], row["category"], row["description"]))
+        self.view_range = (start_dt, end_dt)
+        self.search_transactions()
+    
+    def show_all_transactions(self):
+        self.view_range = None
+        self.search_transactions()
+    
+    def search_transactions(self):
+        """
+        Show rows in the current date filter whose description matches the
+        search box, with the recurring transactions scheduled in that range.
+        """
+        query = self.view_search.get()
+        start_dt, end_dt = self.view_range or (None, None)
+        store = CSV.store()
+
+        def rows():
+            if start_dt is not None and not CSV.scheduled(start_dt, end_dt, query).empty:
+                # Occurrences are not in the store's frame, so they get a frame of their own.
+                return CSV.search(query, start_dt, end_dt), None
+            return store.slots_frame(), CSV.search_slots(query, start_dt, end_dt)
+        # Keyed job: while one search runs, further keystrokes collapse into the latest.
+        self.run_job(
+            rows,
+            on_done=lambda rows: self.tree_view.set_rows(*rows),
+            key="filter",
+            label="Searching transactions...",
+        )
     
     # ---------- EDIT TAB ----------
     def create_edit_tab(self):
         frm = self.tab_edit
         
         # Show table of transactions with indices
-        self.tree_edit = ttk.Treeview(frm, columns=("Index", "Date", "Amount", "Category", "Description"), show="headings", height=10)
-        self.tree_edit.heading("Index", text="Index")
-        self.tree_edit.heading("Date", text="Date")
-        self.tree_edit.heading("Amount", text="Amount")
-        self.tree_edit.heading("Category", text="Category")
-        self.tree_edit.heading("Description", text="Description")
+        self.tree_edit = VirtualTable(frm, TABLE_COLUMNS, table_rows)
         self.tree_edit.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
         
         btn_frame = ttk.Frame(frm)
@@ -238,35 +312,35 @@ class FinanceTrackerGUI(tk.Tk):
         tk.Button(btn_frame, text="Edit Selected", command=self.edit_selected).grid(row=0, column=1, padx=5)
     
     def refresh_edit_table(self):
-        for row in self.tree_edit.get_children():
-            self.tree_edit.delete(row)
-        
-        df = CSV.get_all_transactions()
-        if df.empty:
-            return
-        for idx, row in df.iterrows():
-            self.tree_edit.insert("", tk.END, values=(idx, row["date"], row["amount"], row["category"], row["description"]))
+        self.refresh_tables(self.tree_edit)
     
     def edit_selected(self):
-        selected = self.tree_edit.focus()
-        if not selected:
+        values = self.tree_edit.selected_values()
+        if not values:
             messagebox.showwarning("No selection", "Please select a transaction to edit.")
             return
-        values = self.tree_edit.item(selected, "values")
-        index = int(values[0])
-        # Open a new window for editing
-        EditWindow(self, index)
+        transaction_id = int(values[0])
+        store = CSV.store()
+
+        def fetch():
+            try:
+                return store.get(transaction_id)
+            except KeyError:
+                return None
+
+        def loaded(record):
+            if record is None:
+                messagebox.showerror("Error", "Transaction not found.")
+                return
+            # Open a new window for editing
+            EditWindow(self, transaction_id, record)
+        self.run_job(fetch, on_done=loaded, label="Loading transaction...")
     
     # ---------- DELETE TAB ----------
     def create_delete_tab(self):
         frm = self.tab_delete
         
-        self.tree_delete = ttk.Treeview(frm, columns=("Index", "Date", "Amount", "Category", "Description"), show="headings", height=10)
-        self.tree_delete.heading("Index", text="Index")
-        self.tree_delete.heading("Date", text="Date")
-        self.tree_delete.heading("Amount", text="Amount")
-        self.tree_delete.heading("Category", text="Category")
-        self.tree_delete.heading("Description", text="Description")
+        self.tree_delete = VirtualTable(frm, TABLE_COLUMNS, table_rows)
         self.tree_delete.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
         
         btn_frame = ttk.Frame(frm)
@@ -275,29 +349,32 @@ class FinanceTrackerGUI(tk.Tk):
         tk.Button(btn_frame, text="Delete Selected", command=self.delete_selected).grid(row=0, column=1, padx=5)
     
     def refresh_delete_table(self):
-        for row in self.tree_delete.get_children():
-            self.tree_delete.delete(row)
-        
-        df = CSV.get_all_transactions()
-        if df.empty:
-            return
-        for idx, row in df.iterrows():
-            self.tree_delete.insert("", tk.END, values=(idx, row["date"], row["amount"], row["category"], row["description"]))
+        self.refresh_tables(self.tree_delete)
     
     def delete_selected(self):
-        selected = self.tree_delete.focus()
-        if not selected:
+        values = self.tree_delete.selected_values()
+        if not values:
             messagebox.showwarning("No selection", "Please select a transaction to delete.")
             return
-        values = self.tree_delete.item(selected, "values")
-        index = int(values[0])
+        transaction_id = int(values[0])
         confirm = messagebox.askyesno("Confirm Delete", "Are you sure you want to delete the selected transaction?")
         if confirm:
-            CSV.delete_entry(index)
-            messagebox.showinfo("Deleted", "Transaction deleted successfully.")
-            self.refresh_delete_table()
-            self.refresh_view_table()
-            self.refresh_edit_table()
+            store = CSV.store()
+
+            def delete():
+                slot = store.slot_of(transaction_id)
+                return CSV.delete_entry(transaction_id), slot, store.slots_frame()
+            self.run_job(delete, on_done=self.transaction_deleted, label="Deleting transaction...")
+
+    def transaction_deleted(self, result):
+        deleted, slot, frame = result
+        if not deleted:
+            # Gone already (deleted in another window or program); show the ledger as it is now.
+            messagebox.showerror("Error", "Transaction not found.")
+            self.refresh_all_tables()
+            return
+        messagebox.showinfo("Deleted", "Transaction deleted successfully.")
+        self.update_tables(lambda table: table.remove_slot(slot), frame)
     
     # ---------- PLOT TAB ----------
     def create_plot_tab(self):
@@ -318,6 +395,11 @@ class FinanceTrackerGUI(tk.Tk):
         self.plot_end_date.insert(0, datetime.today().strftime(CSV.DATE_FORMAT))
         
         tk.Button(filter_frame, text="Plot Transactions", command=self.plot_transactions).grid(row=0, column=4, padx=5)
+        
+        # One embedded canvas, reused for every plot; built on first use so
+        # matplotlib is only imported when something is plotted
+        self.plot_canvas = None
+        self.plot_range = None
     
     def plot_transactions(self):
         start_date = self.plot_start_date.get().strip()
@@ -329,100 +411,170 @@ class FinanceTrackerGUI(tk.Tk):
             messagebox.showerror("Invalid Date", f"Enter dates in {CSV.DATE_FORMAT} format.")
             return
         
-        df = CSV.get_all_transactions()
-        if df.empty:
-            messagebox.showinfo("No Data", "No transactions available.")
-            return
-        
-        df["date"] = pd.to_datetime(df["date"], format=CSV.DATE_FORMAT)
-        df = df.sort_values("date")
-        mask = (df["date"] >= start_dt) & (df["date"] <= end_dt)
-        filtered = df.loc[mask]
-        if filtered.empty:
-            messagebox.showinfo("No Data", "No transactions in the selected range.")
+        if self.plot_canvas is None:
+            self.plot_canvas = PlotCanvas(
+                self.tab_plot, {"Income": "g", "Expense": "r"},
+                title="Income and Expenses Over Time", xlabel="Date", ylabel="Amount",
+            )
+            self.plot_canvas.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+            self.update_idletasks()
+        self.plot_range = (start_dt, end_dt)
+        self.refresh_plot(notify_empty=True)
+
+    def refresh_plot(self, notify_empty=False):
+        """Redraw the plot for the last plotted range, e.g. after the ledger changed."""
+        if self.plot_range is None:
             return
-        
-        # Resample and plot data
-        filtered.set_index("date", inplace=True)
-        income_df = filtered[filtered["category"] == "Income"].resample("D").sum().reindex(filtered.index, fill_value=0)
-        expense_df = filtered[filtered["category"] == "Expense"].resample("D").sum().reindex(filtered.index, fill_value=0)
-        
-        plt.figure(figsize=(10, 5))
-        plt.plot(income_df.index, income_df["amount"], label="Income", color="g")
-        plt.plot(expense_df.index, expense_df["amount"], label="Expense", color="r")
-        plt.xlabel("Date")
-        plt.ylabel("Amount")
-        plt.title("Income and Expenses Over Time")
-        plt.legend()
-        plt.grid(True)
-        plt.show()
+        start_dt, end_dt = self.plot_range
+        width = self.plot_canvas.pixel_width()
+        self.run_job(
+            lambda: self.plot_data(start_dt, end_dt, width),
+            on_done=lambda lines: self.show_plot(lines, notify_empty),
+            key="plot",
+            label="Preparing plot...",
+        )
+
+    def plot_data(self, start_dt, end_dt, width):
+        """Plot lines (runs on a worker thread); None if there is nothing to plot."""
+        from plotting import daily_lines
+
+        def lines():
+            # Scheduled occurrences count too; their amounts are in the daily totals.
+            if not CSV.has_transactions(start_dt, end_dt):
+                return None
+            # Daily totals come from the store's rollups, decimated to the canvas width
+            return daily_lines(CSV.daily_totals(start_dt, end_dt), width)
+        # Switching tabs back and forth over the same range reuses the series
+        return CSV.cached(("plot_lines", start_dt, end_dt, width), lines)
+
+    def show_plot(self, lines, notify_empty=False):
+        if lines is None:
+            lines = {name: ([], []) for name in self.plot_canvas.lines}
+            if notify_empty:
+                messagebox.showinfo("No Data", "No transactions in the selected range.")
+        self.plot_canvas.set_data(lines)
+
+    def refresh_tables(self, *tables):
+        """Reload the ledger off the Tk thread, then show it in ``tables``."""
+        def show(rows):
+            for table in tables:
+                table.set_rows(*rows)
+            self.update_choices(rows[0])
+        store = CSV.store()
+        key = ("refresh",) + tuple(str(table) for table in tables)
+        self.run_job(lambda: (store.slots_frame(), store.live_slots()), on_done=show, key=key,
+                     label="Loading transactions...")
 
     def refresh_all_tables(self):
+        self.refresh_tables(self.tree_edit, self.tree_delete)
         self.refresh_view_table()
-        self.refresh_edit_table()
-        self.refresh_delete_table()
+        self.refresh_plot()
+
+    def update_tables(self, patch, frame):
+        """
+        Apply ``patch(table)`` to each table showing ``frame``, the store's
+        frame as the job that changed it left it.
+
+        Slots stay valid until the store reloads (or appends, which swaps
+        its frame), so tables showing an older frame are reloaded instead.
+        A filtered View tab is always filtered again, since the changed row
+        may no longer match its date range or search.
+        """
+        stale = []
+        for table in (self.tree_view, self.tree_edit, self.tree_delete):
+            if table is self.tree_view and table.frame is not None and self.view_filtered():
+                stale.append(table)
+            elif table.frame is frame:
+                patch(table)
+            elif table.frame is not None:
+                stale.append(table)
+        if self.tree_view in stale:
+            # Reapply the view's date filter and search
+            stale.remove(self.tree_view)
+            self.refresh_view_table()
+        if stale:
+            self.refresh_tables(*stale)
+        self.refresh_plot()
 
 
 # ---------- EDIT WINDOW ----------
 class EditWindow(tk.Toplevel):
-    def __init__(self, parent, index):
+    def __init__(self, parent, transaction_id, record):
         super().__init__(parent)
-        self.index = index
+        self.parent = parent
+        self.transaction_id = transaction_id
         self.title("Edit Transaction")
         
-        df = CSV.get_all_transactions()
-        try:
-            record = df.loc[index]
-        except KeyError:
-            messagebox.showerror("Error", "Transaction not found.")
-            self.destroy()
-            return
-        
         tk.Label(self, text="Date (dd-mm-yyyy):").grid(row=0, column=0, padx=10, pady=10)
         self.entry_date = tk.Entry(self)
         self.entry_date.grid(row=0, column=1, padx=10, pady=10)
-        self.entry_date.insert(0, record["date"])
+        self.entry_date.insert(0, format_date(record.date))
         
         tk.Label(self, text="Amount:").grid(row=1, column=0, padx=10, pady=10)
         self.entry_amount = tk.Entry(self)
         self.entry_amount.grid(row=1, column=1, padx=10, pady=10)
-        self.entry_amount.insert(0, record["amount"])
+        self.entry_amount.insert(0, record.amount)
         
         tk.Label(self, text="Category:").grid(row=2, column=0, padx=10, pady=10)
-        self.combo_category = ttk.Combobox(self, values=["Income", "Expense"], state="readonly")
+        self.combo_category = ttk.Combobox(self, values=parent.category_choices)
         self.combo_category.grid(row=2, column=1, padx=10, pady=10)
-        self.combo_category.set(record["category"])
+        self.combo_category.set(record.category)
         
         tk.Label(self, text="Description:").grid(row=3, column=0, padx=10, pady=10)
         self.entry_description = tk.Entry(self)
         self.entry_description.grid(row=3, column=1, padx=10, pady=10)
-        self.entry_description.insert(0, record["description"])
+        self.entry_description.insert(0, record.description)
         
-        tk.Button(self, text="Save Changes", command=self.save_changes).grid(row=4, column=0, columnspan=2, pady=20)
+        tk.Label(self, text="Account:").grid(row=4, column=0, padx=10, pady=10)
+        self.combo_account = ttk.Combobox(self, values=parent.account_choices)
+        self.combo_account.grid(row=4, column=1, padx=10, pady=10)
+        self.combo_account.set(record.account)
+        
+        tk.Button(self, text="Save Changes", command=self.save_changes).grid(row=5, column=0, columnspan=2, pady=20)
     
     def save_changes(self):
         new_date = self.entry_date.get().strip()
         new_amount_str = self.entry_amount.get().strip()
         new_category = self.combo_category.get().strip()
         new_description = self.entry_description.get().strip()
+        new_account = parse_account(self.combo_account.get())
         
         try:
-            datetime.strptime(new_date, CSV.DATE_FORMAT)
-        except ValueError:
-            messagebox.showerror("Invalid Date", f"Enter date in format: {CSV.DATE_FORMAT}")
+            new_date, new_amount, new_category, new_description = parse_entry(
+                new_date, new_amount_str, new_category, new_description, CSV.DATE_FORMAT)
+        except ValueError as error:
+            messagebox.showerror("Invalid Transaction", str(error))
             return
         
-        try:
-            new_amount = float(new_amount_str)
-            if new_amount <= 0:
-                raise ValueError
-        except ValueError:
-            messagebox.showerror("Invalid Amount", "Enter a valid positive amount.")
+        store = CSV.store()
+
+        def save():
+            updated = CSV.edit_entry(self.transaction_id, new_date, new_amount, new_category, new_description,
+                                     new_account)
+            return updated, store.slots_frame()
+        self.parent.run_job(save, on_done=self.saved, label="Saving transaction...")
+
+    def saved(self, result):
+        updated, frame = result
+        if not updated:
+            messagebox.showerror("Error", "Transaction not found.")
+            self.destroy()
+            self.parent.refresh_all_tables()
             return
-        
-        CSV.edit_entry(self.index, new_date, new_amount, new_category, new_description)
         messagebox.showinfo("Success", "Transaction updated successfully.")
         self.destroy()
+        # The row was edited in place, so redrawing the visible rows is enough
+        # (a filtered View tab is filtered again by update_tables).
+        self.parent.update_tables(lambda table: table.refresh(), frame)
+
+
+# Times the GUI's handlers when FINANCE_METRICS is set (see metrics.py); the
+# work they hand to background jobs is timed per job label by JobRunner.
+metrics.instrument(FinanceTrackerGUI, names=[
+    "add_transaction", "import_statement", "refresh_tables", "refresh_all_tables", "refresh_view_table",
+    "filter_transactions", "search_transactions", "update_tables", "refresh_plot", "plot_transactions",
+    "show_plot", "edit_selected", "delete_selected",
+])
 
 
 if __name__ == "__main__":
@@ -0,0 +1,25 @@
+import hashlib
+
+
+def digest(key):
+    """Signed 64-bit BLAKE2b digest of a string key."""
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "little", signed=True)
+
+
+def normalize_description(description):
+    return " ".join(str(description).lower().split())
+
+
+# Changes whenever the key below does, so hashes saved under another format are not reused
+HASH_FORMAT = 2
+
+
+def row_hash(day, amount, category, description, account):
+    """
+    Content hash of one transaction: date, amount in cents, category, normalized description, account.
+
+    ``day`` is a date or datetime. This module only needs the standard
+    library, so the CSV fast path (fastpath.py) can hash without pandas.
+    """
+    key = f"{day:%Y-%m-%d}|{int(round(float(amount) * 100))}|{category}|{normalize_description(description)}|{account}"
+    return digest(key)
@@ -0,0 +1,219 @@
+import argparse
+import re
+
+import numpy as np
+import pandas as pd
+
+from dedup import frame_hashes
+from validation import parse_account, validate_frame
+
+# Header names commonly used by bank exports, per ledger column.
+DEFAULT_MAPPING = {
+    "date": ["date", "transaction date", "posted date", "posting date", "value date"],
+    "amount": ["amount", "transaction amount", "value"],
+    "category": ["category", "type"],
+    "description": ["description", "details", "memo", "narrative", "payee", "name"],
+    "account": ["account", "account name"],
+}
+OFX_DATE_FORMAT = "%Y%m%d"
+
+_OFX_TRANSACTION = re.compile(r"<STMTTRN>(.*?)</STMTTRN>", re.S | re.I)
+_OFX_FIELD = re.compile(r"<(\w+)>([^<\r\n]*)")
+_OFX_ACCOUNT = re.compile(r"<ACCTID>([^<\r\n]*)", re.I)
+
+
+class ImportReport:
+    """Outcome of one statement import."""
+
+    def __init__(self, on_duplicate="flag"):
+        self.read = 0
+        self.imported = 0
+        self.duplicates = 0
+        self.on_duplicate = on_duplicate
+        self.rejected = []
+
+    def reject(self, frame):
+        if len(frame):
+            self.rejected.append(frame)
+
+    def rejected_rows(self):
+        """Frame of rejected rows with their source line and the reason."""
+        if not self.rejected:
+            return pd.DataFrame(columns=["line", "reason", "date", "amount", "category", "description", "account"])
+        return pd.concat(self.rejected, ignore_index=True)
+
+    def __str__(self):
+        skipped = self.duplicates if self.on_duplicate == "skip" else 0
+        rejected = self.read - self.imported - skipped
+        text = f"Read {self.read} rows: imported {self.imported}, rejected {rejected}."
+        if self.duplicates and self.on_duplicate != "allow":
+            verb = "skipped" if self.on_duplicate == "skip" else "imported anyway"
+            text += f" {self.duplicates} already in the ledger ({verb})."
+        return text
+
+
+def _resolve_columns(header, mapping):
+    """Map each ledger column to a header of the statement (or None)."""
+    lookup = {name.strip().lower(): name for name in header}
+    resolved = {}
+    for column, candidates in DEFAULT_MAPPING.items():
+        wanted = mapping.get(column)
+        options = [wanted] if wanted else candidates
+        resolved[column] = next((lookup[c.lower()] for c in options if c.lower() in lookup), None)
+        if wanted and resolved[column] is None:
+            raise ValueError(f"Column {wanted!r} not found in statement header.")
+    for column in ("date", "amount"):
+        if resolved[column] is None:
+            raise ValueError(f"Could not find a {column} column; pass it explicitly.")
+    return resolved
+
+
+def read_csv_statement(path, mapping=None, chunksize=100_000):
+    """Yield raw string chunks with the ledger's column names plus a ``line`` column."""
+    line = 2  # first data row, after the header
+    resolved = None
+    for chunk in pd.read_csv(path, dtype=str, keep_default_na=False, chunksize=chunksize, skipinitialspace=True):
+        if resolved is None:
+            resolved = _resolve_columns(chunk.columns, mapping or {})
+        raw = pd.DataFrame({
+            column: chunk[source] if source else "" for column, source in resolved.items()
+        })
+        raw.insert(0, "line", range(line, line + len(chunk)))
+        line += len(chunk)
+        yield raw
+
+
+def read_ofx_statement(path, chunksize=100_000, block_size=1 << 20):
+    """
+    Yield raw chunks from the <STMTTRN> records of an OFX/QFX file.
+
+    Each record is filed under the <ACCTID> of the statement it appears in
+    (given in the statement's account block, ahead of its transactions).
+    """
+    records = []
+    line = 1  # number of the next record in the file
+    buffer = ""
+    account = ""
+    with open(path, encoding="utf-8", errors="replace") as f:
+        while True:
+            block = f.read(block_size)
+            buffer += block
+            end = 0
+            for match in _OFX_TRANSACTION.finditer(buffer):
+                accounts = _OFX_ACCOUNT.findall(buffer, end, match.start())
+                if accounts:
+                    account = accounts[-1].strip()
+                fields = {tag.upper(): value.strip() for tag, value in _OFX_FIELD.findall(match.group(1))}
+                records.append({
+                    "line": line,
+                    "date": fields.get("DTPOSTED", "")[:8],
+                    "amount": fields.get("TRNAMT", ""),
+                    "category": "",
+                    "description": fields.get("MEMO") or fields.get("NAME", ""),
+                    "account": account,
+                })
+                line += 1
+                end = match.end()
+            buffer = buffer[end:]
+            while len(records) >= chunksize:
+                yield pd.DataFrame(records[:chunksize])
+                records = records[chunksize:]
+            if not block:
+                break
+    if records:
+        yield pd.DataFrame(records)
+
+
+def validate_chunk(raw, date_format):
+    """
+    Check a raw chunk (see validation.validate_frame).
+
+    Returns (valid, rejected): ``valid`` is typed and ready for the ledger;
+    ``rejected`` keeps the raw fields, the source line and a reason. Signed
+    amounts without a category become Income (positive) or Expense
+    (negative); amounts are stored as positive values.
+    """
+    rows, errors = validate_frame(raw, date_format, signed=True)
+    bad = errors != ""
+    return rows[~bad], raw[bad].assign(reason=errors[bad])
+
+
+def import_statement(store, path, mapping=None, date_format=None, chunksize=100_000, on_progress=None,
+                     on_duplicate="flag", account=None):
+    """
+    Stream a bank statement (CSV or OFX/QFX) into ``store``.
+
+    The file is read ``chunksize`` rows at a time and validated per chunk;
+    accepted rows are appended to the ledger in a single batched write at
+    the end. ``on_progress(rows_read)`` is called after each chunk.
+
+    Rows already in the ledger (per the store's duplicate index) are counted
+    and, with ``on_duplicate="skip"``, left out; "flag" and "allow" import them.
+
+    ``account`` files every row under that account (the one the statement
+    belongs to); otherwise the statement's account column is used, if any.
+    """
+    is_ofx = path.lower().endswith((".ofx", ".qfx"))
+    if is_ofx:
+        chunks = read_ofx_statement(path, chunksize)
+        date_format = date_format or OFX_DATE_FORMAT
+    else:
+        chunks = read_csv_statement(path, mapping, chunksize)
+        date_format = date_format or store.date_format
+
+    report = ImportReport(on_duplicate)
+    accepted = []
+    accepted_hashes = []
+    for raw in chunks:
+        valid, rejected = validate_chunk(raw, date_format)
+        if account is not None:
+            valid = valid.assign(account=parse_account(account))
+        report.read += len(raw)
+        if on_duplicate != "allow":
+            # Hashed once here; append_rows reuses the hashes for the index.
+            hashes = frame_hashes(valid)
+            duplicate = store.duplicates(valid, hashes)
+            report.duplicates += int(duplicate.sum())
+            if on_duplicate == "skip":
+                valid, hashes = valid[~duplicate], hashes[~duplicate]
+            accepted_hashes.append(hashes)
+        accepted.append(valid)
+        report.reject(rejected)
+        if on_progress is not None:
+            on_progress(report.read)
+    if accepted:
+        batch = pd.concat(accepted, ignore_index=True)
+        if len(batch):
+            store.append_rows(batch, np.concatenate(accepted_hashes) if accepted_hashes else None)
+        report.imported = len(batch)
+    return report
+
+
+def main(argv=None):
+    from main import CSV
+
+    parser = argparse.ArgumentParser(description="Import a bank statement (CSV or OFX) into the ledger.")
+    parser.add_argument("path")
+    parser.add_argument("--date-col")
+    parser.add_argument("--amount-col")
+    parser.add_argument("--category-col")
+    parser.add_argument("--description-col")
+    parser.add_argument("--account-col")
+    parser.add_argument("--account", help="file every row under this account")
+    parser.add_argument("--date-format", help=f"strptime format of the statement dates (default {CSV.DATE_FORMAT})")
+    parser.add_argument("--chunksize", type=int, default=100_000)
+    parser.add_argument("--rejected", help="write rejected rows to this CSV file")
+    parser.add_argument("--duplicates", choices=["skip", "flag", "allow"],
+                        help=f"what to do with rows already in the ledger (default {CSV.DUPLICATES})")
+    args = parser.parse_args(argv)
+
+    mapping = {"date": args.date_col, "amount": args.amount_col,
+               "category": args.category_col, "description": args.description_col, "account": args.account_col}
+    CSV.initialize_csv()
+    CSV.import_statement(args.path, mapping=mapping, date_format=args.date_format,
+                         chunksize=args.chunksize, rejected_path=args.rejected, on_duplicate=args.duplicates,
+                         account=args.account)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import metrics
+
+
+class Job:
+    """
+    Handle for one unit of background work.
+
+    The work function receives its Job and may call ``report()`` to publish
+    progress text or check ``cancelled`` to stop early.
+    """
+
+    def __init__(self, fn, on_done=None, on_error=None, key=None, label="Working...", coalesce=True):
+        self.fn = fn
+        self.on_done = on_done
+        self.on_error = on_error
+        self.key = key
+        self.coalesce = coalesce
+        self.label = label
+        self.future = None
+        self._cancel = threading.Event()
+        self._runner = None
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def cancel(self):
+        self._cancel.set()
+        if self.future is not None:
+            self.future.cancel()
+
+    def report(self, text):
+        self._runner._events.put(("progress", self, text))
+
+
+class JobRunner:
+    """
+    Runs storage and aggregation work off the Tk thread.
+
+    Work goes to a thread pool; results come back through a queue that the
+    Tk mainloop drains every ``poll_ms`` via ``after()``, so callbacks always
+    run on the Tk thread. Jobs submitted with a ``key`` run one at a time
+    and are coalesced: while one job for that key is running, newer
+    submissions replace each other and only the latest one runs afterwards.
+    With ``coalesce=False`` every submission is queued and runs in order,
+    which is what writes need.
+
+    ``on_status(text, busy)`` is called whenever the status line changes.
+    """
+
+    def __init__(self, root, max_workers=2, poll_ms=50, on_status=None):
+        self.root = root
+        self.poll_ms = poll_ms
+        self.on_status = on_status
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="finance-job")
+        self._events = queue.Queue()
+        self._running = {}
+        self._pending = {}
+        self._active = set()
+        self._after_id = self.root.after(self.poll_ms, self._poll)
+
+    def submit(self, fn, on_done=None, on_error=None, key=None, label="Working...", coalesce=True):
+        job = Job(fn, on_done, on_error, key, label, coalesce)
+        job._runner = self
+        if key is not None and key in self._running:
+            queued = self._pending.setdefault(key, [])
+            if coalesce:
+                for replaced in queued:
+                    if replaced.coalesce:
+                        replaced.cancel()
+                queued[:] = [waiting for waiting in queued if not waiting.cancelled]
+            queued.append(job)
+        else:
+            self._start(job)
+        return job
+
+    def _start(self, job):
+        if job.key is not None:
+            self._running[job.key] = job
+        self._active.add(job)
+        job.future = self._executor.submit(self._run, job)
+        self._set_status(job.label)
+
+    def _run(self, job):
+        if job.cancelled:
+            self._events.put(("cancelled", job, None))
+            return
+        try:
+            with metrics.span(f"job: {job.label}"):
+                result = job.fn(job)
+        except Exception as error:
+            self._events.put(("error", job, error))
+        else:
+            self._events.put(("done", job, result))
+
+    def _poll(self):
+        try:
+            while True:
+                kind, job, payload = self._events.get_nowait()
+                if kind == "progress":
+                    if not job.cancelled:
+                        self._set_status(payload)
+                    continue
+                self._finish(job)
+                if job.cancelled:
+                    continue
+                if kind == "done" and job.on_done is not None:
+                    job.on_done(payload)
+                elif kind == "error":
+                    if job.on_error is None:
+                        raise payload
+                    job.on_error(payload)
+        except queue.Empty:
+            pass
+        finally:
+            self._after_id = self.root.after(self.poll_ms, self._poll)
+
+    def _finish(self, job):
+        self._active.discard(job)
+        if job.key is not None and self._running.get(job.key) is job:
+            del self._running[job.key]
+            queued = self._pending.get(job.key)
+            if queued:
+                self._start(queued.pop(0))
+                if not queued:
+                    del self._pending[job.key]
+        if self._active:
+            self._set_status(next(iter(self._active)).label)
+        else:
+            self._set_status("Ready", busy=False)
+
+    def _set_status(self, text, busy=True):
+        if self.on_status is not None:
+            self.on_status(text, busy)
+
+    @property
+    def busy(self):
+        return bool(self._active)
+
+    def cancel_all(self):
+        """Cancel queued jobs and discard the results of running ones."""
+        for queued in self._pending.values():
+            for job in queued:
+                job.cancel()
+        self._pending.clear()
+        for job in list(self._active):
+            job.cancel()
+            if job.future.cancelled():
+                self._finish(job)
+
+    def shutdown(self):
+        """Wait for running jobs (so writes complete) and stop polling."""
+        self.root.after_cancel(self._after_id)
+        self._executor.shutdown(wait=True, cancel_futures=True)
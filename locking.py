@@ -0,0 +1,58 @@
+import os
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+class FileLock:
+    """
+    Advisory lock on ``<path>.lock``, shared by every process using a ledger.
+
+    Held exclusively (``flock`` on POSIX, ``msvcrt.locking`` on Windows)
+    around anything that reads or writes the ledger files as a unit: loads,
+    appends, log records, rewrites and the duplicate-index sidecar. Used as
+    a context manager; nested ``with`` blocks in the same process only count
+    depth. Not thread-safe on its own: TransactionStore takes it under its
+    RLock.
+    """
+
+    def __init__(self, path):
+        self.path = path + ".lock"
+        self._fd = None
+        self._depth = 0
+
+    def __enter__(self):
+        if self._depth == 0:
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                if fcntl is not None:
+                    fcntl.flock(fd, fcntl.LOCK_EX)
+                else:
+                    while True:
+                        try:
+                            msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+                            break
+                        except OSError:  # LK_LOCK gives up after ~10 s; keep waiting
+                            pass
+            except BaseException:
+                os.close(fd)
+                raise
+            self._fd = fd
+        self._depth += 1
+        return self
+
+    def __exit__(self, *exc):
+        self._depth -= 1
+        if self._depth == 0:
+            fd, self._fd = self._fd, None
+            try:
+                if fcntl is not None:
+                    fcntl.flock(fd, fcntl.LOCK_UN)
+                else:
+                    os.lseek(fd, 0, os.SEEK_SET)
+                    msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+            finally:
+                os.close(fd)
@@ -1,56 +1,232 @@
-import pandas as pd
-import csv
 from datetime import datetime
-from data_entry import get_amount, get_category, get_date, get_description
-import matplotlib.pyplot as plt
+
+import metrics
+from categories import roll_up, truncate
+from data_entry import get_account, get_amount, get_category, get_date, get_description
+from validation import parse_account, parse_amount, parse_category, parse_date, parse_entry
+
+# pandas (through store/backends) and matplotlib are imported inside the
+# functions that need them, so the CLI reaches its first prompt quickly.
 
 
 class CSV:
     CSV_FILE = "finance_data.csv"
-    COLUMNS = ["date", "amount", "category", "description"]
+    COLUMNS = ["id", "date", "amount", "category", "description", "account"]
     DATE_FORMAT = "%d-%m-%Y"
+    # Record edits/deletes in an append log instead of rewriting the file.
+    APPEND_LOG = True
+    # "csv" keeps CSV_FILE; "columnar" stores typed binary columns under
+    # COLUMNAR_DIR, which opens much faster for large ledgers; "partitioned"
+    # keeps one CSV file per month under PARTITION_DIR; "sqlite" uses the
+    # database SQLITE_FILE, edited row by row and queried with indexed SQL.
+    BACKEND = "csv"
+    COLUMNAR_DIR = "finance_data.cols"
+    PARTITION_DIR = "finance_data.parts"
+    SQLITE_FILE = "finance_data.db"
+    # Which of the settings above holds the ledger's path, per backend.
+    PATH_SETTINGS = {"csv": "CSV_FILE", "columnar": "COLUMNAR_DIR", "partitioned": "PARTITION_DIR",
+                     "sqlite": "SQLITE_FILE"}
+    # What add_entry/import do with a transaction identical to an existing one
+    # (same date, amount, category and description): "skip", "flag" or "allow".
+    DUPLICATES = "flag"
+    # Answer queries by scanning the ledger on disk STREAM_CHUNKSIZE rows at
+    # a time instead of loading it into memory (for ledgers larger than RAM).
+    STREAMING = False
+    STREAM_CHUNKSIZE = 100_000
+    # Compute summaries and plot data in a pool of PARALLEL_WORKERS processes
+    # (default: one per core), one task per month; needs the "partitioned" backend.
+    PARALLEL = False
+    PARALLEL_WORKERS = None
+    # Check only the CSV header on start-up and append new rows with the csv
+    # module when the duplicate index saved on the last exit is current; the
+    # ledger is parsed only once a query needs it.
+    FAST_START = True
+    # Memory (bytes) for remembering query results (ranges, summaries, plot
+    # series) until the ledger changes; 0 turns the cache off.
+    CACHE_BYTES = 64 * 1024 * 1024
+    # Recurrence rules are kept in the ledger's path plus RULES_SUFFIX. Their
+    # occurrences show up in range queries, summaries and plots without
+    # being stored until write_recurring appends the due ones.
+    RULES_SUFFIX = ".rules.json"
+    # Open ledgers for reading only: nothing is migrated, compacted or saved
+    # on close (for reports run against ledgers other programs maintain).
+    READ_ONLY = False
+    _store = None
+    _query = None
+    _cache = None
+    _rules = None
+
+    @classmethod
+    def backend(cls, kind=None):
+        from backends import open_backend
+
+        kind = kind or cls.BACKEND
+        path = getattr(cls, cls.PATH_SETTINGS.get(kind, "CSV_FILE"))
+        return open_backend(kind, path, cls.COLUMNS, cls.DATE_FORMAT)
+
+    @classmethod
+    def use_ledger(cls, path, kind=None):
+        """
+        Switch to the ledger at ``path`` (of backend ``kind``, default
+        BACKEND), closing the current one first; lets one process work
+        through several ledgers.
+        """
+        kind = kind or cls.BACKEND
+        cls.close()
+        cls._store = None
+        cls.BACKEND = kind
+        setattr(cls, cls.PATH_SETTINGS[kind], path)
+
+    @classmethod
+    def store(cls):
+        """Return the shared in-memory store for the configured ledger, creating it on first use."""
+        from store import TransactionStore
+
+        backend = cls.backend()
+        if cls._store is None or cls._store.path != backend.path:
+            cls._store = TransactionStore(
+                backend.path, cls.COLUMNS, cls.DATE_FORMAT, use_log=cls.APPEND_LOG, backend=backend,
+                read_only=cls.READ_ONLY,
+            )
+        return cls._store
+
+    @classmethod
+    def query(cls):
+        """Return the shared parallel query engine for the partitioned ledger."""
+        from parallel import PartitionQuery
+
+        store = cls.store()
+        if cls._query is None or cls._query.store is not store:
+            if cls._query is not None:
+                cls._query.close()
+            cls._query = PartitionQuery(store, max_workers=cls.PARALLEL_WORKERS)
+        return cls._query
+
+    @classmethod
+    def recurring(cls):
+        """Return the recurrence rules of the configured ledger."""
+        from recurring import RecurringRules
+
+        path = cls.backend().path + cls.RULES_SUFFIX
+        if cls._rules is None or cls._rules.path != path:
+            cls._rules = RecurringRules(path, cls.DATE_FORMAT)
+        return cls._rules
+
+    @classmethod
+    def cached(cls, key, compute):
+        """
+        ``compute()``, remembered under ``key`` until the ledger changes.
+
+        Results are shared between callers, which must not modify them.
+        """
+        from query_cache import QueryCache
+
+        store = cls.store()
+        if cls._cache is None or cls._cache.max_bytes != cls.CACHE_BYTES:
+            cls._cache = QueryCache(cls.CACHE_BYTES)
+        version = (store.path, store.data_version(), cls.recurring().version())
+        return cls._cache.get(version, key, compute)
+
+    @classmethod
+    def _range_key(cls, operation, start_date, end_date, *args):
+        store = cls.store()
+        return (operation, store.to_datetime(start_date), store.to_datetime(end_date)) + args
 
     @classmethod
     def initialize_csv(cls):
+        if cls.FAST_START and cls.BACKEND == "csv":
+            from fastpath import create, read_header
+
+            header = read_header(cls.CSV_FILE)
+            if header is None:
+                create(cls.CSV_FILE, cls.COLUMNS)
+                return
+            if header == cls.COLUMNS:
+                return
+            # An older layout (e.g. no id column) is migrated by a full load.
+        backend = cls.store().backend
+        if not backend.exists():
+            backend.create()
+        # Backends that answer queries themselves (SQLite) are loaded only when something needs the rows.
+        if not cls.STREAMING and not hasattr(backend, "summary"):
+            cls.store().frame()
+
+    @classmethod
+    def _fast_appender(cls):
+        """A FastAppender when the ledger may be appended to without loading it, else None."""
+        # Once a store exists it owns the file (it may be loading it right now).
+        if not cls.FAST_START or cls.BACKEND != "csv" or cls._store is not None:
+            return None
+        from fastpath import FastAppender
+
+        return FastAppender(cls.CSV_FILE, cls.COLUMNS, cls.DATE_FORMAT)
+
+    @classmethod
+    def changed_on_disk(cls):
+        """True if the loaded ledger was changed by another process (a stat, never a read)."""
+        return cls._store is not None and cls._store.changed_on_disk()
+
+    @classmethod
+    def is_duplicate(cls, date, amount, category, description, account=None):
+        return cls.store().contains(date, amount, category, description, parse_account(account))
+
+    @classmethod
+    def add_entry(cls, date, amount, category, description, account=None, on_duplicate=None):
         try:
-            pd.read_csv(cls.CSV_FILE)
-        except FileNotFoundError:
-            df = pd.DataFrame(columns=cls.COLUMNS)
-            df.to_csv(cls.CSV_FILE, index=False)
-
-    @classmethod
-    def add_entry(cls, date, amount, category, description):
-        new_entry = {
-            "date": date,
-            "amount": amount,
-            "category": category,
-            "description": description,
-        }
-        with open(cls.CSV_FILE, "a", newline="") as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=cls.COLUMNS)
-            writer.writerow(new_entry)
+            date, amount, category, description = parse_entry(date, amount, category, description, cls.DATE_FORMAT)
+        except ValueError as error:
+            print(error)
+            return False
+        account = parse_account(account)
+        on_duplicate = on_duplicate or cls.DUPLICATES
+        # The duplicate check and the append happen under one file lock, so
+        # another session cannot add the same row (or take the id) in between.
+        fast = cls._fast_appender()
+        if fast is not None:
+            with fast.lock:
+                if fast.load():
+                    return cls._add(fast, fast, date, amount, category, description, account, on_duplicate)
+        store = cls.store()
+        with store.locked():
+            return cls._add(store, store, date, amount, category, description, account, on_duplicate)
+
+    @classmethod
+    def _add(cls, target, index, date, amount, category, description, account, on_duplicate):
+        if on_duplicate != "allow" and index.contains(date, amount, category, description, account):
+            if on_duplicate == "skip":
+                print("Duplicate transaction skipped.")
+                return False
+            print("Warning: an identical transaction already exists.")
+        target.append(date, amount, category, description, account)
         print("Entry added successfully.")
+        return True
 
     @classmethod
     def get_all_transactions(cls):
-        df = pd.read_csv(cls.CSV_FILE)
+        df = cls.store().frame().copy()
         if df.empty:
             print("No transactions found.")
         return df
 
     @classmethod
-    def get_transactions(cls, start_date, end_date):
-        df = pd.read_csv(cls.CSV_FILE)
-        if df.empty:
+    def get_transactions(cls, start_date, end_date, stream=False):
+        """
+        Print and return the transactions between two dates, with a summary.
+
+        With ``stream=True`` this returns a generator instead: it scans the
+        ledger in chunks, printing and yielding the matching rows of each
+        chunk, and prints the summary once the scan is done.
+        """
+        if stream:
+            return cls._stream_transactions(start_date, end_date)
+        store = cls.store()
+        if len(store) == 0 and not cls.recurring().rules():
             print("No transactions found in the CSV file.")
-            return df
+            return store.frame().copy()
 
-        df["date"] = pd.to_datetime(df["date"], format=cls.DATE_FORMAT)
         start_date_dt = datetime.strptime(start_date, cls.DATE_FORMAT)
         end_date_dt = datetime.strptime(end_date, cls.DATE_FORMAT)
-
-        mask = (df["date"] >= start_date_dt) & (df["date"] <= end_date_dt)
-        filtered_df = df.loc[mask]
+        filtered_df = cls.transactions(start_date_dt, end_date_dt)
 
         if filtered_df.empty:
             print("No transactions found in the given date range.")
@@ -65,54 +241,363 @@ class CSV:
                 )
             )
 
-            total_income = filtered_df[filtered_df["category"] == "Income"]["amount"].sum()
-            total_expense = filtered_df[filtered_df["category"] == "Expense"]["amount"].sum()
+            total_income, total_expense = cls.summary(start_date_dt, end_date_dt)
             print("\nSummary:")
             print(f"Total Income: ${total_income:.2f}")
             print(f"Total Expense: ${total_expense:.2f}")
             print(f"Net Savings: ${(total_income - total_expense):.2f}")
+            cls._print_breakdown(cls.breakdown(start_date_dt, end_date_dt))
 
         return filtered_df
 
+    @classmethod
+    def transactions(cls, start_date, end_date):
+        """The rows between two dates, scheduled occurrences included, without printing (cached)."""
+        return cls.cached(
+            cls._range_key("range", start_date, end_date), lambda: cls._range(start_date, end_date)
+        ).copy()
+
+    @classmethod
+    def has_transactions(cls, start_date, end_date):
+        """True if any stored or scheduled transaction falls between two dates."""
+        if not cls.STREAMING:
+            return len(cls.transactions(start_date, end_date)) > 0
+        import streaming
+
+        return (any(len(chunk) for chunk in streaming.iter_range(cls.store(), start_date, end_date,
+                                                                  cls.STREAM_CHUNKSIZE))
+                or len(cls.recurring().occurrences(start_date, end_date)) > 0)
+
+    @classmethod
+    def date_span(cls):
+        """
+        (first, last) date of the stored transactions and of the scheduled
+        occurrences due by today, as Timestamps; None if there are neither.
+        """
+        spans = [span for span in (cls.store().date_span(), cls.recurring().span(datetime.today())) if span]
+        if not spans:
+            return None
+        return min(first for first, _ in spans), max(last for _, last in spans)
+
+    @classmethod
+    def _print_breakdown(cls, breakdown):
+        print("\nBy account and category:")
+        print(breakdown.to_string(index=False, formatters={"amount": lambda x: f"${x:.2f}"}))
+
+    @classmethod
+    def _range(cls, start_date, end_date):
+        """Stored rows in the range plus the scheduled occurrences not written yet (ids ``r<rule>``)."""
+        import pandas as pd
+
+        rows = cls.store().range(start_date, end_date)
+        scheduled = cls.recurring().occurrences(start_date, end_date)
+        if scheduled.empty:
+            return rows
+        return pd.concat([rows, scheduled]).sort_values("date", kind="stable")
+
+    @classmethod
+    def search(cls, query, start_date=None, end_date=None):
+        """
+        Rows whose description matches ``query`` (word prefixes, one typo
+        allowed), optionally within a date range; like ``transactions``, a
+        range also brings in the scheduled occurrences that match.
+        """
+        import pandas as pd
+
+        store = cls.store()
+        rows = store.slots_frame().iloc[cls.search_slots(query, start_date, end_date)].copy()
+        if start_date is None:
+            return rows
+        scheduled = cls.scheduled(start_date, end_date, query)
+        if scheduled.empty:
+            return rows
+        return pd.concat([rows, scheduled]).sort_values("date", kind="stable")
+
+    @classmethod
+    def scheduled(cls, start_date, end_date, query=None):
+        """Occurrences of the recurrence rules between two dates, optionally only those matching ``query``."""
+        from text_index import description_matches
+
+        rows = cls.recurring().occurrences(start_date, end_date)
+        if query and len(rows):
+            rows = rows[[description_matches(query, description) for description in rows["description"]]]
+        return rows
+
+    @classmethod
+    def search_slots(cls, query, start_date=None, end_date=None):
+        """Store slots of the rows ``search`` returns (cached)."""
+        store = cls.store()
+        key = ("search", query) if start_date is None else cls._range_key("search", start_date, end_date, query)
+        return cls.cached(key, lambda: store.search_slots(query, start_date, end_date))
+
+    @classmethod
+    def _stream_transactions(cls, start_date, end_date):
+        import streaming
+
+        start_date_dt = datetime.strptime(start_date, cls.DATE_FORMAT)
+        end_date_dt = datetime.strptime(end_date, cls.DATE_FORMAT)
+        totals = {}
+        found = False
+        for chunk in streaming.iter_range(cls.store(), start_date_dt, end_date_dt, cls.STREAM_CHUNKSIZE):
+            if not found:
+                print(
+                    f"Transactions from {start_date_dt.strftime(cls.DATE_FORMAT)} to {end_date_dt.strftime(cls.DATE_FORMAT)}"
+                )
+            print(
+                chunk.to_string(
+                    index=True,
+                    header=not found,
+                    formatters={"date": lambda x: x.strftime(cls.DATE_FORMAT)}
+                )
+            )
+            found = True
+            for category, amount in chunk.groupby("category")["amount"].sum().items():
+                totals[category] = totals.get(category, 0.0) + float(amount)
+            yield chunk
+
+        # Scheduled occurrences come after the scan, as one last chunk.
+        scheduled = cls.recurring().occurrences(start_date_dt, end_date_dt)
+        if len(scheduled):
+            if not found:
+                print(
+                    f"Transactions from {start_date_dt.strftime(cls.DATE_FORMAT)} to {end_date_dt.strftime(cls.DATE_FORMAT)}"
+                )
+            print(
+                scheduled.to_string(
+                    index=True,
+                    header=not found,
+                    formatters={"date": lambda x: x.strftime(cls.DATE_FORMAT)}
+                )
+            )
+            found = True
+            for category, amount in scheduled.groupby("category")["amount"].sum().items():
+                totals[category] = totals.get(category, 0.0) + float(amount)
+            yield scheduled
+
+        if not found:
+            print("No transactions found in the given date range.")
+            return
+        totals = roll_up(totals, ["Income", "Expense"])
+        total_income, total_expense = totals["Income"], totals["Expense"]
+        print("\nSummary:")
+        print(f"Total Income: ${total_income:.2f}")
+        print(f"Total Expense: ${total_expense:.2f}")
+        print(f"Net Savings: ${(total_income - total_expense):.2f}")
+        cls._print_breakdown(cls.breakdown(start_date_dt, end_date_dt, stream=True))
+
+    @classmethod
+    def summary(cls, start_date, end_date, stream=False):
+        """Total income and expense between two dates, from the daily rollups (or a chunked/parallel scan)."""
+        return cls.cached(cls._range_key("summary", start_date, end_date),
+                          lambda: cls._summary(start_date, end_date, stream))
+
+    @classmethod
+    def _summary(cls, start_date, end_date, stream):
+        if cls.PARALLEL:
+            totals = cls.query().summary(start_date, end_date)
+        elif stream:
+            import streaming
+
+            totals = streaming.summary(cls.store(), start_date, end_date, cls.STREAM_CHUNKSIZE)
+        else:
+            totals = cls.store().summary(start_date, end_date)
+        totals = dict(totals)
+        for category, amount in cls.recurring().totals(start_date, end_date).items():
+            totals[category] = totals.get(category, 0.0) + amount
+        # Rows may sit anywhere under Income or Expense (e.g. Expense/Food/Groceries).
+        totals = roll_up(totals, ["Income", "Expense"])
+        return totals["Income"], totals["Expense"]
+
+    @classmethod
+    def breakdown(cls, start_date, end_date, by=("account", "category"), depth=None, stream=False):
+        """
+        Totals between two dates per account and category (or whichever of
+        the two ``by`` names), as a frame with an ``amount`` column. With
+        ``depth``, categories are cut to that many levels first, e.g. depth=2
+        adds Expense/Food/Groceries into Expense/Food.
+        """
+        return cls.cached(cls._range_key("breakdown", start_date, end_date, tuple(by), depth, stream),
+                          lambda: cls._breakdown(start_date, end_date, list(by), depth, stream))
+
+    @classmethod
+    def _breakdown(cls, start_date, end_date, by, depth, stream):
+        import pandas as pd
+
+        if stream:
+            import streaming
+
+            totals = streaming.totals_by(cls.store(), by, start_date, end_date, cls.STREAM_CHUNKSIZE)
+        else:
+            totals = cls.store().totals_by(by, start_date, end_date)
+        frame = totals.reset_index()
+        scheduled = cls.recurring().occurrences(start_date, end_date)
+        if len(scheduled):
+            frame = pd.concat([frame, scheduled[by + ["amount"]]], ignore_index=True)
+        if depth is not None and "category" in by:
+            frame["category"] = frame["category"].map(lambda category: truncate(category, depth))
+        return frame.groupby(by, as_index=False)["amount"].sum()
+
+    @classmethod
+    def daily_totals(cls, start_date, end_date, stream=False):
+        """Income and Expense per calendar day between two dates (zero-filled)."""
+        return cls.cached(cls._range_key("daily_totals", start_date, end_date),
+                          lambda: cls._daily_totals(start_date, end_date, stream))
+
+    @classmethod
+    def _daily_totals(cls, start_date, end_date, stream):
+        if cls.PARALLEL:
+            daily = cls.query().daily_totals(["Income", "Expense"], start_date, end_date)
+        elif stream:
+            import streaming
+
+            daily = streaming.daily_totals(cls.store(), ["Income", "Expense"], start_date, end_date,
+                                           cls.STREAM_CHUNKSIZE)
+        else:
+            daily = cls.store().daily_totals(["Income", "Expense"], start_date, end_date)
+        return cls.recurring().add_daily(daily, start_date, end_date)
+
     @classmethod
     def update_csv(cls, df):
         """Overwrite CSV file with DataFrame data."""
-        df.to_csv(cls.CSV_FILE, index=False)
+        cls.store().write(df)
     
     @classmethod
-    def edit_entry(cls, index, date, amount, category, description):
-        df = pd.read_csv(cls.CSV_FILE)
-        if index not in df.index:
-            print("Invalid transaction index.")
-            return
-        df.at[index, "date"] = date
-        df.at[index, "amount"] = amount
-        df.at[index, "category"] = category
-        df.at[index, "description"] = description
-        cls.update_csv(df)
+    def edit_entry(cls, transaction_id, date, amount, category, description, account=None):
+        """Returns whether the transaction was updated."""
+        store = cls.store()
+        if transaction_id not in store:
+            print("Invalid transaction ID.")
+            return False
+        try:
+            date, amount, category, description = parse_entry(date, amount, category, description, cls.DATE_FORMAT)
+        except ValueError as error:
+            print(error)
+            return False
+        try:
+            store.update(transaction_id, date, amount, category, description, account and parse_account(account))
+        except KeyError:
+            # Deleted by another session since the check above
+            print("Invalid transaction ID.")
+            return False
         print("Transaction updated successfully.")
+        return True
 
     @classmethod
-    def delete_entry(cls, index):
-        df = pd.read_csv(cls.CSV_FILE)
-        if index not in df.index:
-            print("Invalid transaction index.")
-            return
-        df = df.drop(index)
-        df.reset_index(drop=True, inplace=True)
-        cls.update_csv(df)
+    def delete_entry(cls, transaction_id):
+        """Returns whether the transaction was deleted."""
+        store = cls.store()
+        try:
+            store.delete(transaction_id)
+        except KeyError:
+            print("Invalid transaction ID.")
+            return False
         print("Transaction deleted successfully.")
+        return True
+
+    @classmethod
+    def add_recurring(cls, start_date, frequency, amount, category, description, end_date=None, interval=1,
+                      account=None):
+        """Add a recurrence rule; dates use DATE_FORMAT, ``end_date`` None for no end."""
+        try:
+            start_date, amount, category, description = parse_entry(
+                start_date, amount, category, description, cls.DATE_FORMAT
+            )
+            end_date = None if end_date is None else parse_date(end_date, cls.DATE_FORMAT)
+            if end_date is not None and end_date < start_date:
+                raise ValueError("The end date must not be before the start date.")
+            rule = cls.recurring().add(start_date, frequency, amount, category, description, end_date, interval,
+                                       parse_account(account))
+        except ValueError as error:
+            print(error)
+            return None
+        print(f"Recurring rule #{rule.id} added.")
+        return rule
+
+    @classmethod
+    def delete_recurring(cls, rule_id):
+        """Remove a rule; occurrences already written to the ledger stay."""
+        if cls.recurring().remove(rule_id):
+            print("Recurring rule deleted.")
+            return True
+        print("Invalid rule ID.")
+        return False
+
+    @classmethod
+    def write_recurring(cls, through=None):
+        """Append every scheduled occurrence up to ``through`` (default today) to the ledger in one batch."""
+        try:
+            through = datetime.today() if through is None else parse_date(through, cls.DATE_FORMAT)
+        except ValueError as error:
+            print(error)
+            return 0
+        count = cls.recurring().write_out(cls.store(), through)
+        print(f"Wrote {count} scheduled transactions up to {through.strftime(cls.DATE_FORMAT)}.")
+        return count
+
+    @classmethod
+    def import_statement(cls, path, mapping=None, date_format=None, chunksize=100_000,
+                         rejected_path=None, on_progress=None, on_duplicate=None, account=None):
+        """Bulk-import a bank statement (CSV or OFX) in one batched append."""
+        from importer import import_statement
+
+        report = import_statement(cls.store(), path, mapping=mapping, date_format=date_format,
+                                  chunksize=chunksize, on_progress=on_progress,
+                                  on_duplicate=on_duplicate or cls.DUPLICATES, account=account)
+        print(report)
+        rejected = report.rejected_rows()
+        if rejected_path and len(rejected):
+            rejected.to_csv(rejected_path, index=False)
+            print(f"Rejected rows written to {rejected_path}.")
+        return report
+
+    @classmethod
+    def compact(cls):
+        """Fold pending edits/deletes from the append log into the CSV file."""
+        cls.store().compact()
+
+    @classmethod
+    def close(cls):
+        """Compact the log and save the duplicate index; call before exiting."""
+        if cls._query is not None:
+            cls._query.close()
+            cls._query = None
+        if cls._store is not None:
+            cls._store.close()
+
+    @classmethod
+    def export_to(cls, kind):
+        """Copy the current ledger into the given backend ("csv", "columnar", "partitioned" or "sqlite")."""
+        from store import convert
+
+        count = convert(cls.store().backend, cls.backend(kind))
+        print(f"Exported {count} transactions to the {kind} backend.")
+
+    @classmethod
+    def import_from(cls, kind):
+        """Replace the current ledger with the contents of the given backend."""
+        from store import convert
+
+        count = convert(cls.backend(kind), cls.store().backend)
+        cls.store().load()
+        print(f"Imported {count} transactions from the {kind} backend.")
+
 
+# Times every CSV classmethod when FINANCE_METRICS is set (see metrics.py).
+metrics.instrument(CSV)
 
+
+@metrics.timed("cli.add")
 def add():
     CSV.initialize_csv()
     date = get_date("Enter the date of the transaction (dd-mm-yyyy) or press enter for today's date: ", allow_default=True)
     amount = get_amount()
     category = get_category()
     description = get_description()
-    CSV.add_entry(date, amount, category, description)
+    account = get_account()
+    CSV.add_entry(date, amount, category, description, account)
 
 
+@metrics.timed("cli.edit_transaction")
 def edit_transaction():
     CSV.initialize_csv()
     df = CSV.get_all_transactions()
@@ -120,29 +605,39 @@ def edit_transaction():
         return
 
     print("Existing Transactions:")
-    df.index = df.index  # Ensure index is shown
-    print(df.to_string(index=True))
+    print(df.to_string(index=True, formatters={"date": lambda x: x.strftime(CSV.DATE_FORMAT)}))
     try:
-        index = int(input("Enter the index of the transaction to edit: "))
+        transaction_id = int(input("Enter the ID of the transaction to edit: "))
     except ValueError:
-        print("Invalid input. Please enter a valid integer index.")
+        print("Invalid input. Please enter a valid integer ID.")
         return
 
     # Prompt user for new details (press enter to skip editing a field)
-    current_row = df.loc[index]
-    new_date = input(f"Enter new date (dd-mm-yyyy) [{current_row['date']}]: ") or current_row["date"]
-    new_amount_input = input(f"Enter new amount [{current_row['amount']}]: ")
-    new_amount = float(new_amount_input) if new_amount_input else current_row["amount"]
-    new_category_input = input(f"Enter new category ('I' for Income or 'E' for Expense) [{current_row['category']}]: ")
-    if new_category_input:
-        new_category = {"I": "Income", "E": "Expense"}.get(new_category_input.upper(), current_row["category"])
-    else:
-        new_category = current_row["category"]
-    new_description = input(f"Enter new description [{current_row['description']}]: ") or current_row["description"]
+    if transaction_id not in df.index:
+        print("Invalid transaction ID.")
+        return
+    current = CSV.store().get(transaction_id)
+    current_date = current.date.strftime(CSV.DATE_FORMAT)
+    new_date = input(f"Enter new date (dd-mm-yyyy) [{current_date}]: ") or current_date
+    new_amount_input = input(f"Enter new amount [{current.amount}]: ")
+    try:
+        new_amount = parse_amount(new_amount_input) if new_amount_input else current.amount
+    except ValueError as e:
+        print(e)
+        return
+    new_category_input = input(f"Enter new category ('I' for Income or 'E' for Expense, e.g. E/Food) [{current.category}]: ")
+    try:
+        new_category = parse_category(new_category_input) if new_category_input else current.category
+    except ValueError as e:
+        print(e)
+        return
+    new_description = input(f"Enter new description [{current.description}]: ") or current.description
+    new_account = input(f"Enter new account [{current.account}]: ") or current.account
 
-    CSV.edit_entry(index, new_date, new_amount, new_category, new_description)
+    CSV.edit_entry(transaction_id, new_date, new_amount, new_category, new_description, new_account)
 
 
+@metrics.timed("cli.delete_transaction")
 def delete_transaction():
     CSV.initialize_csv()
     df = CSV.get_all_transactions()
@@ -150,52 +645,123 @@ def delete_transaction():
         return
 
     print("Existing Transactions:")
-    print(df.to_string(index=True))
+    print(df.to_string(index=True, formatters={"date": lambda x: x.strftime(CSV.DATE_FORMAT)}))
     try:
-        index = int(input("Enter the index of the transaction to delete: "))
+        transaction_id = int(input("Enter the ID of the transaction to delete: "))
     except ValueError:
-        print("Invalid input. Please enter a valid integer index.")
+        print("Invalid input. Please enter a valid integer ID.")
         return
 
     confirm = input("Are you sure you want to delete this transaction? (y/n): ")
     if confirm.lower() == "y":
-        CSV.delete_entry(index)
+        CSV.delete_entry(transaction_id)
     else:
         print("Deletion cancelled.")
 
 
-def plot_transactions(df):
-    if df.empty:
-        print("No data to plot.")
+@metrics.timed("cli.import_transactions")
+def import_transactions():
+    CSV.initialize_csv()
+    path = input("Enter the path of the statement file (.csv or .ofx): ").strip()
+    date_format = input(f"Enter the statement's date format [{CSV.DATE_FORMAT}]: ").strip() or None
+    account = input("Enter the account the statement belongs to (press enter to use its account column): ")
+    try:
+        report = CSV.import_statement(path, date_format=date_format, account=account.strip() or None)
+    except (OSError, ValueError) as e:
+        print(f"Import failed: {e}")
         return
+    rejected = report.rejected_rows()
+    if len(rejected):
+        print("Rejected rows:")
+        print(rejected.head(20).to_string(index=False))
+
+
+@metrics.timed("cli.manage_recurring")
+def manage_recurring():
+    CSV.initialize_csv()
+    rules = CSV.recurring().rules()
+    if rules:
+        print("Recurring rules:")
+        for rule in rules:
+            print(rule.describe(CSV.DATE_FORMAT))
+    else:
+        print("No recurring rules.")
+    action = input("(a)dd a rule, (d)elete a rule, (w)rite out due transactions, or press enter to go back: ")
+    action = action.strip().lower()
+    if action == "a":
+        start_date = get_date("Enter the first date (dd-mm-yyyy) or press enter for today's date: ", allow_default=True)
+        frequency = input("Repeat daily, weekly, monthly or yearly? ").strip().lower()
+        interval = input("Every how many periods? [1]: ").strip() or 1
+        try:
+            interval = int(interval)
+        except ValueError:
+            print("Invalid input. Please enter a valid integer.")
+            return
+        end_date = input("Enter the last date (dd-mm-yyyy) or press enter for no end: ").strip() or None
+        amount = get_amount()
+        category = get_category()
+        description = get_description()
+        account = get_account()
+        CSV.add_recurring(start_date, frequency, amount, category, description, end_date, interval, account)
+    elif action == "d":
+        try:
+            rule_id = int(input("Enter the ID of the rule to delete: "))
+        except ValueError:
+            print("Invalid input. Please enter a valid integer ID.")
+            return
+        CSV.delete_recurring(rule_id)
+    elif action == "w":
+        through = input("Write out transactions up to (dd-mm-yyyy) or press enter for today: ").strip() or None
+        CSV.write_recurring(through)
+
+
+def draw_plot(figure, daily):
+    """Draw the Income and Expense lines of ``daily`` (per-day totals) on ``figure``."""
+    from plotting import daily_lines
+
+    ax = figure.add_subplot()
+    # Decimate to the figure width; a decade of days is more points than pixels.
+    lines = daily_lines(daily, int(figure.get_figwidth() * figure.dpi))
+    ax.plot(*lines["Income"], label="Income", color="g")
+    ax.plot(*lines["Expense"], label="Expense", color="r")
+    ax.xaxis_date()
+    ax.set_xlabel("Date")
+    ax.set_ylabel("Amount")
+    ax.set_title("Income and Expenses Over Time")
+    ax.legend()
+    ax.grid(True)
+
+
+@metrics.timed("cli.plot_transactions")
+def plot_transactions(start_date, end_date, out=None):
+    """
+    Plot income and expenses between two dates in a window, or save the
+    plot to the image file ``out``; False if there is nothing to plot.
+    """
+    # Daily totals are zero-filled, so an empty range still has a (flat) series to draw.
+    if not CSV.has_transactions(start_date, end_date):
+        print("No data to plot.")
+        return False
+    daily = CSV.daily_totals(start_date, end_date, stream=CSV.STREAMING)
+
+    if out is None:
+        import matplotlib.pyplot as plt
+
+        with metrics.span("plot.build"):
+            draw_plot(plt.figure(figsize=(10, 5)), daily)
+        plt.show()
+        return True
+
+    # A bare Figure (no pyplot) renders through Agg: no display or GUI toolkit is needed.
+    from matplotlib.figure import Figure
 
-    # Ensure date column is datetime and sorted
-    df["date"] = pd.to_datetime(df["date"], format=CSV.DATE_FORMAT)
-    df = df.sort_values("date")
-    df.set_index("date", inplace=True)
-
-    income_df = (
-        df[df["category"] == "Income"]
-        .resample("D")
-        .sum()
-        .reindex(df.index, fill_value=0)
-    )
-    expense_df = (
-        df[df["category"] == "Expense"]
-        .resample("D")
-        .sum()
-        .reindex(df.index, fill_value=0)
-    )
-
-    plt.figure(figsize=(10, 5))
-    plt.plot(income_df.index, income_df["amount"], label="Income", color="g")
-    plt.plot(expense_df.index, expense_df["amount"], label="Expense", color="r")
-    plt.xlabel("Date")
-    plt.ylabel("Amount")
-    plt.title("Income and Expenses Over Time")
-    plt.legend()
-    plt.grid(True)
-    plt.show()
+    with metrics.span("plot.build"):
+        figure = Figure(figsize=(10, 5))
+        draw_plot(figure, daily)
+    with metrics.span("plot.save"):
+        figure.savefig(out)
+    print(f"Plot saved to {out}.")
+    return True
 
 
 def main():
@@ -206,26 +772,37 @@ def main():
         print("2. View transactions and summary within a date range")
         print("3. Edit an existing transaction")
         print("4. Delete a transaction")
-        print("5. Exit")
-        choice = input("Enter your choice (1-5): ")
+        print("5. Import a bank statement (CSV/OFX)")
+        print("6. Manage recurring transactions")
+        print("7. Exit")
+        choice = input("Enter your choice (1-7): ")
 
         if choice == "1":
             add()
         elif choice == "2":
             start_date = get_date("Enter the start date (dd-mm-yyyy): ")
             end_date = get_date("Enter the end date (dd-mm-yyyy): ")
-            df = CSV.get_transactions(start_date, end_date)
-            if not df.empty and input("Do you want to see a plot? (y/n): ").lower() == "y":
-                plot_transactions(df)
+            with metrics.span("cli.view_transactions"):
+                if CSV.STREAMING:
+                    found = sum(len(chunk) for chunk in CSV.get_transactions(start_date, end_date, stream=True))
+                else:
+                    found = len(CSV.get_transactions(start_date, end_date))
+            if found and input("Do you want to see a plot? (y/n): ").lower() == "y":
+                plot_transactions(start_date, end_date)
         elif choice == "3":
             edit_transaction()
         elif choice == "4":
             delete_transaction()
         elif choice == "5":
+            import_transactions()
+        elif choice == "6":
+            manage_recurring()
+        elif choice == "7":
             print("Exiting...")
+            CSV.close()
             break
         else:
-            print("Invalid choice. Please enter a number between 1 and 5.")
+            print("Invalid choice. Please enter a number between 1 and 7.")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,140 @@
+"""
+Opt-in timing spans and I/O counters.
+
+Set ``FINANCE_METRICS=<file>.json`` to record how often and how long each
+instrumented operation runs (spans are inclusive: a span's time contains
+that of the spans it calls) plus counters such as rows and bytes read and
+written; the totals are written to the file on exit. ``FINANCE_PROFILE=
+<file>.pstats`` runs the whole process under cProfile and saves the stats
+on exit, for ``python -m pstats``.
+
+Both are read once at import. When metrics are off, ``timed`` and
+``instrument`` hand back the original functions, ``span`` returns a shared
+no-op context manager and ``count`` returns at once, so instrumented code
+runs as before. Only the standard library is used, to keep the CLI's fast
+start path free of heavy imports.
+"""
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+
+METRICS_PATH = os.environ.get("FINANCE_METRICS")
+PROFILE_PATH = os.environ.get("FINANCE_PROFILE")
+ENABLED = bool(METRICS_PATH)
+
+_lock = threading.Lock()
+_spans = {}
+_counters = {}
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        record(self.name, time.perf_counter() - self.start)
+        return False
+
+
+def record(name, seconds):
+    """Add one call of ``seconds`` to span ``name``."""
+    with _lock:
+        stats = _spans.get(name)
+        if stats is None:
+            stats = _spans[name] = [0, 0.0, 0.0]
+        stats[0] += 1
+        stats[1] += seconds
+        stats[2] = max(stats[2], seconds)
+
+
+def span(name):
+    """Context manager timing the block under ``name``."""
+    return _Span(name) if ENABLED else _NULL_SPAN
+
+
+def count(name, n=1):
+    """Add ``n`` to counter ``name``."""
+    if ENABLED:
+        with _lock:
+            _counters[name] = _counters.get(name, 0) + n
+
+
+def timed(name):
+    """Decorator timing every call of the function under ``name``."""
+    def decorate(fn):
+        if not ENABLED:
+            return fn
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                record(name, time.perf_counter() - start)
+        return wrapper
+    return decorate
+
+
+def instrument(cls, names=None):
+    """
+    Time methods of ``cls`` as ``<class>.<method>``: the given ``names``, or
+    every classmethod and staticmethod defined on it.
+    """
+    if not ENABLED:
+        return cls
+    for name, attr in list(vars(cls).items()):
+        label = f"{cls.__name__}.{name}"
+        if isinstance(attr, (classmethod, staticmethod)) and (names is None or name in names):
+            setattr(cls, name, type(attr)(timed(label)(attr.__func__)))
+        elif names is not None and name in names and callable(attr):
+            setattr(cls, name, timed(label)(attr))
+    return cls
+
+
+def snapshot():
+    """Current spans and counters as plain data."""
+    with _lock:
+        spans = {
+            name: {"calls": calls, "total_ms": total * 1e3, "mean_ms": total * 1e3 / calls, "max_ms": longest * 1e3}
+            for name, (calls, total, longest) in sorted(_spans.items(), key=lambda item: -item[1][1])
+        }
+        return {"spans": spans, "counters": dict(sorted(_counters.items()))}
+
+
+def dump(path):
+    with open(path, "w") as f:
+        json.dump(snapshot(), f, indent=2)
+
+
+if ENABLED:
+    atexit.register(dump, METRICS_PATH)
+
+if PROFILE_PATH:
+    import cProfile
+
+    _profiler = cProfile.Profile()
+    _profiler.enable()
+    atexit.register(lambda: (_profiler.disable(), _profiler.dump_stats(PROFILE_PATH)))
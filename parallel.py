@@ -0,0 +1,77 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from categories import roll_up_frame
+
+
+def _daily_sums(df, start, end):
+    """Per-day (rows) and per-category (columns) amount totals of ``df`` within start..end."""
+    df = df[(df["date"] >= start) & (df["date"] <= end)]
+    return df.groupby([df["date"].dt.normalize(), "category"])["amount"].sum().unstack(fill_value=0.0)
+
+
+def partition_daily_sums(backend, key, manifest, start, end, excluded):
+    """Worker task: ``_daily_sums`` of one partition, leaving out the ``excluded`` ids."""
+    df = backend.read_partition(key, manifest)
+    return _daily_sums(df[~df["id"].isin(excluded)], start, end)
+
+
+class PartitionQuery:
+    """
+    Range summaries and per-day totals over a PartitionedBackend, in parallel.
+
+    Only the monthly partitions overlapping the requested range are read.
+    Each one is aggregated to per-day, per-category totals in a worker
+    process and the partial tables are summed here. Pending append-log
+    changes are folded in: edited and deleted ids are skipped by the
+    workers and the edited rows are added back from the log.
+
+    The pool is started on first use and kept until ``close()``.
+    """
+
+    def __init__(self, store, max_workers=None):
+        if not hasattr(store.backend, "partitions"):
+            raise ValueError("Parallel queries need the partitioned storage backend.")
+        self.store = store
+        self.max_workers = max_workers
+        self._pool = None
+
+    def _executor(self):
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._pool
+
+    def _daily(self, start, end):
+        start, end = self.store.to_datetime(start), self.store.to_datetime(end)
+        backend = self.store.backend
+        updates, deleted = self.store.log_changes()
+        excluded = np.union1d(updates.index.to_numpy(dtype="int64"), np.array(sorted(deleted), dtype="int64"))
+        manifest = backend.manifest()
+        keys = backend.partitions(start, end, manifest)
+        if len(keys) > 1:
+            pool = self._executor()
+            futures = [pool.submit(partition_daily_sums, backend, key, manifest, start, end, excluded) for key in keys]
+            parts = [future.result() for future in futures]
+        else:
+            parts = [partition_daily_sums(backend, key, manifest, start, end, excluded) for key in keys]
+        parts.append(_daily_sums(updates, start, end))
+        return pd.concat(parts).groupby(level=0).sum()
+
+    def summary(self, start, end):
+        """Per-category amount totals for start <= date <= end."""
+        return {category: float(total) for category, total in self._daily(start, end).sum().items()}
+
+    def daily_totals(self, categories, start, end):
+        """Frame of per-day totals (one column per category, including its subcategories), zero-filled."""
+        start, end = self.store.to_datetime(start), self.store.to_datetime(end)
+        index = pd.date_range(start.normalize(), end.normalize(), freq="D")
+        daily = roll_up_frame(self._daily(start, end), categories)
+        daily = daily.reindex(index=index, fill_value=0.0).astype("float64")
+        return daily.rename_axis(index=None, columns=None)
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
@@ -0,0 +1,36 @@
+import matplotlib.dates as mdates
+import numpy as np
+
+
+def min_max(x, y, buckets):
+    """
+    Downsample ``y`` (against ``x``) to at most two points per bucket.
+
+    The series is cut into ``buckets`` runs of consecutive points and only
+    each run's minimum and maximum are kept, in their original order, so
+    spikes survive while a line drawn at one bucket per pixel looks the same
+    as the full series. Short series are returned unchanged.
+    """
+    x, y = np.asarray(x), np.asarray(y, dtype="float64")
+    n = len(y)
+    if buckets < 1 or n <= 2 * buckets:
+        return x, y
+    size = -(-n // buckets)
+    rows = -(-n // size)
+    padded = np.full(rows * size, np.nan)
+    padded[:n] = y
+    padded = padded.reshape(rows, size)
+    offsets = np.arange(rows) * size
+    keep = np.sort(np.stack([offsets + np.nanargmin(padded, axis=1), offsets + np.nanargmax(padded, axis=1)], axis=1), axis=1)
+    keep = np.unique(np.concatenate(([0], keep.ravel(), [n - 1])))
+    return x[keep], y[keep]
+
+
+def daily_lines(daily, width):
+    """
+    ``{column: (x, y)}`` for a frame of per-day totals, decimated to ``width`` pixels.
+
+    ``x`` is in matplotlib date numbers.
+    """
+    days = mdates.date2num(daily.index.to_numpy(dtype="M8[D]"))
+    return {column: min_max(days, daily[column].to_numpy(), width) for column in daily.columns}
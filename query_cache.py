@@ -0,0 +1,79 @@
+import sys
+import threading
+from collections import OrderedDict
+
+
+def _sizeof(value):
+    """Approximate bytes held by a query result."""
+    if hasattr(value, "memory_usage"):
+        # Shallow: object columns point at strings the ledger frame already holds.
+        usage = value.memory_usage(index=True)
+        return int(usage.sum()) if hasattr(usage, "sum") else int(usage)
+    if hasattr(value, "nbytes"):
+        return int(value.nbytes)
+    if isinstance(value, (tuple, list)):
+        return sys.getsizeof(value) + sum(_sizeof(item) for item in value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(_sizeof(k) + _sizeof(v) for k, v in value.items())
+    return sys.getsizeof(value)
+
+
+class QueryCache:
+    """
+    LRU cache of query results, bounded by an approximate size in bytes.
+
+    Results are stored under (operation, arguments) for one data version
+    (see ``TransactionStore.data_version``). A lookup with a different
+    version empties the cache first, so nothing computed before a change
+    is ever served. Within a version, the least recently used results are
+    evicted once the total passes ``max_bytes``; a result larger than that
+    is returned but not kept. Cached results are shared, so callers must
+    not modify them.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.version = None
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, version, key, compute):
+        """The cached result for ``key`` at ``version``, else ``compute()`` (and cache it)."""
+        with self._lock:
+            if version != self.version:
+                self._clear()
+                self.version = version
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+        value = compute()
+        size = _sizeof(value)
+        with self._lock:
+            if version == self.version and size <= self.max_bytes and key not in self._entries:
+                self._entries[key] = (value, size)
+                self._bytes += size
+                while self._bytes > self.max_bytes:
+                    _, (_, evicted) = self._entries.popitem(last=False)
+                    self._bytes -= evicted
+        return value
+
+    def _clear(self):
+        self._entries.clear()
+        self._bytes = 0
+
+    def clear(self):
+        with self._lock:
+            self._clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def nbytes(self):
+        return self._bytes
@@ -0,0 +1,144 @@
+"""
+Compact row types for code that handles transactions outside a DataFrame.
+
+Pulling single rows out of the store as pandas Series (or dicts) costs a
+few kilobytes and tens of microseconds each. ``Transaction`` is a plain
+``__slots__`` record, and ``TransactionBatch`` holds a block of rows as
+NumPy columns (int64 ids, int32 day numbers, float64 amounts, category and
+account codes) taken straight from the store's frame by position. Dates
+are day numbers (days since 1970-01-01); ``date`` turns them back into a
+datetime.
+"""
+from datetime import date as _date, datetime
+
+import numpy as np
+
+from validation import DEFAULT_ACCOUNT
+
+_EPOCH = _date(1970, 1, 1).toordinal()
+
+
+def day_number(value):
+    """Days since 1970-01-01 for a date, datetime, Timestamp or datetime64."""
+    if isinstance(value, np.datetime64):
+        return int(value.astype("M8[D]").astype("int64"))
+    return value.toordinal() - _EPOCH
+
+
+def from_day(day):
+    """The datetime (midnight) for a day number."""
+    return datetime.fromordinal(int(day) + _EPOCH)
+
+
+class Transaction:
+    """One ledger row."""
+
+    __slots__ = ("id", "day", "amount", "category", "description", "account")
+
+    def __init__(self, id, day, amount, category, description="", account=DEFAULT_ACCOUNT):
+        self.id = id
+        self.day = day
+        self.amount = amount
+        self.category = category
+        self.description = description
+        self.account = account
+
+    @classmethod
+    def from_frame(cls, df, position):
+        """The row of a ledger frame (indexed by id) at ``position``."""
+        return cls(int(df.index[position]), day_number(df["date"].array[position]),
+                   float(df["amount"].array[position]), df["category"].array[position],
+                   df["description"].array[position], df["account"].array[position])
+
+    @property
+    def date(self):
+        return from_day(self.day)
+
+    def __repr__(self):
+        return (f"Transaction(id={self.id}, date={self.date:%Y-%m-%d}, amount={self.amount}, "
+                f"category={self.category!r}, description={self.description!r}, account={self.account!r})")
+
+
+class TransactionBatch:
+    """
+    A block of rows as parallel columns.
+
+    ``codes`` index into ``categories`` and ``account_codes`` into
+    ``accounts``; descriptions stay an object array. Indexing gives a
+    Transaction, iterating yields them in order.
+    """
+
+    __slots__ = ("ids", "days", "amounts", "codes", "categories", "descriptions", "account_codes", "accounts")
+
+    def __init__(self, ids, days, amounts, codes, categories, descriptions, account_codes, accounts):
+        self.ids = ids
+        self.days = days
+        self.amounts = amounts
+        self.codes = codes
+        self.categories = categories
+        self.descriptions = descriptions
+        self.account_codes = account_codes
+        self.accounts = accounts
+
+    @classmethod
+    def from_frame(cls, df, positions=None):
+        """The rows of a ledger frame (indexed by id) at ``positions``, or all rows."""
+        def column(values):
+            # Slice the pandas array before converting, so only these rows are copied.
+            return np.asarray(values if positions is None else values[positions])
+
+        def encoded(values):
+            if hasattr(values, "codes"):
+                # Dictionary-encoded already (the store's frame): take the codes as they are.
+                return values.categories.tolist(), column(values.codes)
+            names, codes = np.unique(column(values).astype(str), return_inverse=True)
+            return names.tolist(), codes
+
+        def narrow(codes, names):
+            return codes.astype("uint8" if len(names) <= 256 else "uint16")
+
+        days = column(df["date"].array).astype("M8[D]").astype("int32")
+        categories, codes = encoded(df["category"].array)
+        accounts, account_codes = encoded(df["account"].array)
+        return cls(
+            column(df.index.array).astype("int64"),
+            days,
+            column(df["amount"].array).astype("float64"),
+            narrow(codes, categories),
+            categories,
+            column(df["description"].array).astype(object),
+            narrow(account_codes, accounts),
+            accounts,
+        )
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getitem__(self, i):
+        return Transaction(int(self.ids[i]), int(self.days[i]), float(self.amounts[i]),
+                           self.categories[self.codes[i]], self.descriptions[i],
+                           self.accounts[self.account_codes[i]])
+
+    def __iter__(self):
+        return map(self.__getitem__, range(len(self)))
+
+    @property
+    def nbytes(self):
+        """Bytes held by the numeric columns (descriptions are shared Python strings)."""
+        return (self.ids.nbytes + self.days.nbytes + self.amounts.nbytes + self.codes.nbytes
+                + self.account_codes.nbytes)
+
+    def display_rows(self, date_format):
+        """(id, date, amount, category, description, account) tuples, formatting each distinct day once."""
+        days, inverse = np.unique(self.days, return_inverse=True)
+        labels = [from_day(day).strftime(date_format) for day in days.tolist()]
+        categories = self.categories
+        accounts = self.accounts
+        return list(zip(
+            self.ids.tolist(),
+            [labels[i] for i in inverse.tolist()],
+            self.amounts.tolist(),
+            [categories[code] for code in self.codes.tolist()],
+            self.descriptions.tolist(),
+            [accounts[code] for code in self.account_codes.tolist()],
+        ))
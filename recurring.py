@@ -0,0 +1,249 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from categories import roll_up_frame
+from dedup import frame_hashes
+from locking import FileLock
+from validation import DEFAULT_ACCOUNT
+
+FREQUENCIES = ("daily", "weekly", "monthly", "yearly")
+
+
+def _day(value, date_format=None):
+    if isinstance(value, str) and date_format:
+        value = pd.to_datetime(value, format=date_format)
+    return np.datetime64(pd.Timestamp(value).normalize(), "D")
+
+
+class Rule:
+    """
+    One schedule: ``amount`` of ``category`` (in ``account``) every ``interval`` days, weeks,
+    months or years from ``start`` until ``until`` (inclusive; None for no
+    end). Monthly and yearly rules keep the start's day of the month,
+    falling back to the month's last day when it is shorter.
+
+    ``written_through`` is the last day whose occurrences were written to
+    the ledger; only later ones are projected.
+    """
+
+    __slots__ = ("id", "start", "until", "frequency", "interval", "amount", "category", "description",
+                 "account", "written_through")
+
+    def __init__(self, id, start, frequency, amount, category, description="", until=None, interval=1,
+                 account=DEFAULT_ACCOUNT, written_through=None):
+        if frequency not in FREQUENCIES:
+            raise ValueError(f"Unknown frequency {frequency!r}; use one of {', '.join(FREQUENCIES)}.")
+        if int(interval) < 1:
+            raise ValueError("The interval must be at least 1.")
+        self.id = id
+        self.start = _day(start)
+        self.until = None if until is None else _day(until)
+        self.frequency = frequency
+        self.interval = int(interval)
+        self.amount = float(amount)
+        self.category = category
+        self.description = description or ""
+        self.account = account or DEFAULT_ACCOUNT
+        self.written_through = None if written_through is None else _day(written_through)
+
+    @classmethod
+    def from_json(cls, data):
+        return cls(**data)
+
+    def to_json(self):
+        def iso(day):
+            return None if day is None else str(day)
+        return {
+            "id": self.id, "start": iso(self.start), "until": iso(self.until), "frequency": self.frequency,
+            "interval": self.interval, "amount": self.amount, "category": self.category,
+            "description": self.description, "account": self.account, "written_through": iso(self.written_through),
+        }
+
+    def describe(self, date_format):
+        every = self.frequency if self.interval == 1 else f"every {self.interval} {self.frequency}"
+        until = "" if self.until is None else f" until {pd.Timestamp(self.until).strftime(date_format)}"
+        return (f"#{self.id}: {self.amount:.2f} {self.category} '{self.description}' ({self.account}) {every} "
+                f"from {pd.Timestamp(self.start).strftime(date_format)}{until}")
+
+    def days(self, first, last):
+        """Occurrence days (datetime64[D]) within first..last that are not written out yet."""
+        lo = max(first, self.start)
+        if self.written_through is not None:
+            lo = max(lo, self.written_through + 1)
+        hi = last if self.until is None else min(last, self.until)
+        if lo > hi:
+            return np.empty(0, dtype="M8[D]")
+        if self.frequency in ("daily", "weekly"):
+            step = self.interval * (7 if self.frequency == "weekly" else 1)
+            k0 = -(-int((lo - self.start).astype("int64")) // step)
+            k1 = int((hi - self.start).astype("int64")) // step
+            return self.start + np.arange(k0, k1 + 1) * np.timedelta64(step, "D")
+        step = self.interval * (12 if self.frequency == "yearly" else 1)
+        start_month = self.start.astype("M8[M]")
+        k0 = int((lo.astype("M8[M]") - start_month).astype("int64")) // step
+        k1 = int((hi.astype("M8[M]") - start_month).astype("int64")) // step
+        months = start_month + np.arange(k0, k1 + 1) * np.timedelta64(step, "M")
+        lengths = ((months + 1).astype("M8[D]") - months.astype("M8[D]")).astype("int64")
+        day = int((self.start - start_month.astype("M8[D]")).astype("int64"))
+        days = months.astype("M8[D]") + np.minimum(day, lengths - 1).astype("m8[D]")
+        return days[(days >= lo) & (days <= hi)]
+
+
+class RecurringRules:
+    """
+    Recurrence rules kept next to the ledger in ``<ledger>.rules.json``.
+
+    Occurrences are never stored ahead of time. Queries ask for the
+    occurrences inside their window (``occurrences``) and get them as
+    ledger-shaped rows, computed with a few vectorized date operations per
+    rule, so years of schedules cost nothing until they are looked at.
+    ``write_out`` appends every occurrence due up to a date to the ledger
+    in one batched append and moves each rule's ``written_through``
+    forward, after which those occurrences are ordinary transactions.
+
+    The file is re-read when it changes on disk and replaced atomically
+    under a file lock, like the ledger. Dates given as strings are parsed
+    with ``date_format`` (the ledger's), falling back to pandas' guess.
+    """
+
+    def __init__(self, path, date_format=None):
+        self.path = path
+        self.date_format = date_format
+        self.lock = FileLock(path)
+        self._rules = []
+        self._next_id = 1
+        self._signature = None
+
+    def _stat(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def version(self):
+        """Changes whenever the rules file does."""
+        return self._stat()
+
+    def _load(self):
+        signature = self._stat()
+        if signature == self._signature and signature is not None:
+            return
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            data = {"next_id": 1, "rules": []}
+        self._rules = [Rule.from_json(rule) for rule in data["rules"]]
+        self._next_id = data["next_id"]
+        self._signature = signature
+
+    def _save(self):
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"next_id": self._next_id, "rules": [rule.to_json() for rule in self._rules]}, f, indent=1)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        self._signature = self._stat()
+
+    def rules(self):
+        self._load()
+        return list(self._rules)
+
+    def span(self, through):
+        """(first, last) date of the occurrences up to ``through`` not written out yet, or None."""
+        self._load()
+        if not self._rules:
+            return None
+        dates = self.occurrences(min(rule.start for rule in self._rules), through)["date"]
+        if dates.empty:
+            return None
+        return dates.min(), dates.max()
+
+    def add(self, start, frequency, amount, category, description="", until=None, interval=1,
+            account=DEFAULT_ACCOUNT):
+        """Add a rule; returns it."""
+        with self.lock:
+            self._load()
+            rule = Rule(self._next_id, start, frequency, amount, category, description, until, interval, account)
+            self._rules.append(rule)
+            self._next_id += 1
+            self._save()
+        return rule
+
+    def remove(self, rule_id):
+        """Delete a rule (occurrences already written stay); False if there is none with that id."""
+        with self.lock:
+            self._load()
+            kept = [rule for rule in self._rules if rule.id != rule_id]
+            if len(kept) == len(self._rules):
+                return False
+            self._rules = kept
+            self._save()
+        return True
+
+    def occurrences(self, start, end):
+        """
+        Projected rows with start <= date <= end, in date order. They are
+        indexed like the ledger, but by ``r<rule id>`` instead of an id.
+        """
+        self._load()
+        first, last = _day(start, self.date_format), _day(end, self.date_format)
+        parts = []
+        for rule in self._rules:
+            days = rule.days(first, last)
+            if len(days):
+                parts.append(pd.DataFrame({
+                    "id": f"r{rule.id}", "date": days.astype("M8[ns]"), "amount": rule.amount,
+                    "category": rule.category, "description": rule.description, "account": rule.account,
+                }))
+        if not parts:
+            return pd.DataFrame({"date": pd.Series(dtype="M8[ns]"), "amount": pd.Series(dtype="float64"),
+                                 "category": pd.Series(dtype=object), "description": pd.Series(dtype=object),
+                                 "account": pd.Series(dtype=object)},
+                                index=pd.Index([], dtype=object, name="id"))
+        rows = pd.concat(parts, ignore_index=True).sort_values("date", kind="stable")
+        return rows.set_index("id").astype({"category": object, "description": object, "account": object})
+
+    def totals(self, start, end):
+        """Per-category (full path) totals of the projected occurrences."""
+        self._load()
+        if not self._rules:
+            return {}
+        rows = self.occurrences(start, end)
+        return {category: float(total) for category, total in rows.groupby("category")["amount"].sum().items()}
+
+    def add_daily(self, daily, start, end):
+        """``daily`` (per-day totals, one column per category node) with the projected occurrences added."""
+        rows = self.occurrences(start, end)
+        if rows.empty:
+            return daily
+        extra = roll_up_frame(rows.groupby(["date", "category"])["amount"].sum().unstack(fill_value=0.0), daily.columns)
+        return daily.add(extra.reindex(index=daily.index, columns=daily.columns, fill_value=0.0), fill_value=0.0)
+
+    def write_out(self, store, through):
+        """
+        Append every occurrence up to ``through`` to ``store`` in one batch;
+        returns how many were written. Rows the ledger already holds (per
+        its duplicate index) are skipped, so a write-out interrupted after
+        the append can simply be repeated.
+        """
+        through = _day(through, self.date_format)
+        with store.locked(), self.lock:
+            self._load()
+            first = min((rule.start for rule in self._rules), default=through)
+            rows = self.occurrences(first, through).reset_index(drop=True)
+            hashes = frame_hashes(rows)
+            new = ~store.duplicates(rows, hashes)
+            rows, hashes = rows[new], hashes[new]
+            if len(rows):
+                store.append_rows(rows, hashes)
+            for rule in self._rules:
+                if rule.written_through is None or rule.written_through < through:
+                    rule.written_through = through
+            self._save()
+        return len(rows)
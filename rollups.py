@@ -0,0 +1,128 @@
+import numpy as np
+import pandas as pd
+
+from categories import is_under
+
+
+def _day(value):
+    return int(np.datetime64(pd.Timestamp(value), "D").astype("int64"))
+
+
+class Rollups:
+    """
+    Per-day amount totals for each category, maintained incrementally.
+
+    ``daily[category]`` is a float array with one slot per calendar day from
+    ``origin`` (days since the epoch). Changes adjust single slots; a
+    cumulative-sum array is rebuilt lazily the first time a category is
+    queried after a change, after which any date range (and any calendar
+    month) totals in constant time as the difference of two prefix sums.
+
+    Arrays are kept per full category path; queries for a node of the
+    category tree (e.g. "Expense") add up the paths under it.
+    """
+
+    def __init__(self):
+        self.origin = 0
+        self.span = 0
+        self.daily = {}
+        self._prefix = {}
+
+    def rebuild(self, df):
+        self.daily = {}
+        self._prefix = {}
+        self.span = 0
+        if df.empty:
+            return
+        days = df["date"].to_numpy(dtype="M8[D]").astype("int64")
+        self.origin = int(days.min())
+        self.span = int(days.max()) - self.origin + 1
+        amounts = df["amount"].to_numpy()
+        codes, categories = pd.factorize(df["category"])
+        for code, category in enumerate(categories.tolist()):
+            mask = codes == code
+            self.daily[category] = np.bincount(days[mask] - self.origin, weights=amounts[mask], minlength=self.span)
+
+    def _cover(self, first, last):
+        """Grow every daily array so days ``first``..``last`` have a slot."""
+        if not self.span:
+            self.origin = first
+        before = max(self.origin - first, 0)
+        after = max(last - (self.origin + self.span - 1), 0)
+        if before or after:
+            for category, values in self.daily.items():
+                self.daily[category] = np.pad(values, (before, after))
+            self.origin -= before
+            self.span += before + after
+            self._prefix = {}
+
+    def _add(self, days, categories, amounts):
+        days = np.asarray(days, dtype="int64")
+        if not len(days):
+            return
+        self._cover(int(days.min()), int(days.max()))
+        categories = np.asarray(categories, dtype=object)
+        for category in pd.unique(categories):
+            if category not in self.daily:
+                self.daily[category] = np.zeros(self.span)
+            mask = categories == category
+            np.add.at(self.daily[category], days[mask] - self.origin, np.asarray(amounts)[mask])
+            self._prefix.pop(category, None)
+
+    def on_append(self, df, positions):
+        days = df["date"].to_numpy(dtype="M8[D]").astype("int64")
+        self._add(days, df["category"].to_numpy(), df["amount"].to_numpy())
+
+    def on_update(self, position, old, new):
+        self._add([old.day, new.day], [old.category, new.category], [-old.amount, new.amount])
+
+    def on_delete(self, position, old):
+        self._add([old.day], [old.category], [-old.amount])
+
+    # ---------- queries ----------
+    def _prefix_sums(self, category):
+        if category not in self._prefix:
+            self._prefix[category] = np.concatenate(([0.0], np.cumsum(self.daily[category])))
+        return self._prefix[category]
+
+    def _slots(self, start, end):
+        lo = min(max(_day(start) - self.origin, 0), self.span)
+        hi = min(max(_day(end) - self.origin + 1, 0), self.span)
+        return lo, max(hi, lo)
+
+    def _under(self, node):
+        return [category for category in self.daily if is_under(category, node)]
+
+    def _path_total(self, path, lo, hi):
+        prefix = self._prefix_sums(path)
+        return float(prefix[hi] - prefix[lo])
+
+    def total(self, category, start, end):
+        """Sum of the amounts under ``category`` with start <= date <= end."""
+        lo, hi = self._slots(start, end)
+        return sum(self._path_total(path, lo, hi) for path in self._under(category))
+
+    def summary(self, start, end):
+        """Totals for every category path (rows filed exactly there) over the range."""
+        lo, hi = self._slots(start, end)
+        return {category: self._path_total(category, lo, hi) for category in self.daily}
+
+    def daily_series(self, category, start, end):
+        """Per-day totals under ``category`` over the range, zero on days without transactions."""
+        index = pd.date_range(pd.Timestamp(start).normalize(), pd.Timestamp(end).normalize(), freq="D")
+        values = np.zeros(len(index))
+        if len(index):
+            lo, hi = self._slots(start, end)
+            offset = self.origin + lo - _day(index[0])
+            for path in self._under(category):
+                values[offset:offset + hi - lo] += self.daily[path][lo:hi]
+        return pd.Series(values, index=index, name=category)
+
+    def monthly_series(self, category, start, end):
+        """Per-month totals over the range, read from the prefix sums."""
+        months = pd.period_range(pd.Timestamp(start), pd.Timestamp(end), freq="M")
+        totals = [
+            self.total(category, max(month.start_time, pd.Timestamp(start)), min(month.end_time, pd.Timestamp(end)))
+            for month in months
+        ]
+        return pd.Series(totals, index=months.to_timestamp(), name=category)
@@ -0,0 +1,734 @@
+import contextlib
+import csv
+import functools
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+import metrics
+from backends import CSVBackend, typed_frame
+from date_index import DateIndex
+from dedup import DedupIndex, frame_hashes, row_hash
+from locking import FileLock
+from records import Transaction, TransactionBatch, day_number
+from rollups import Rollups
+from text_index import TextIndex
+from validation import DEFAULT_ACCOUNT
+
+LOG_VERSION = 2
+LOG_HEADER = f"# finance-tracker log v{LOG_VERSION}"
+# Held in memory as pandas Categoricals: a small integer code per row
+# against one copy of each distinct name, instead of a string per row.
+DICTIONARY_COLUMNS = ("category", "account")
+
+
+def _synchronized(method):
+    """Run a store method under the store's lock (GUI jobs use worker threads)."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+def _locked(method):
+    """Like ``_synchronized``, but also hold the ledger's inter-process file lock."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.lock, self.file_lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+def _stat(path):
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+class TransactionStore:
+    """
+    Long-lived, in-memory copy of the ledger.
+
+    The ledger is read once through its storage backend (see backends.py)
+    into a typed DataFrame (datetime64 dates, float amounts, categories and
+    accounts dictionary-encoded as Categoricals). Reads are served
+    from memory, every change is written through to disk, and the file's
+    mtime/size are checked before each operation so that edits made by
+    another program trigger a reload.
+
+    Every transaction carries a persistent integer ``id`` (the frame's index).
+    In memory each row lives in a fixed slot: ``_slot_of`` maps id -> slot,
+    and deleting only clears the slot's ``_alive`` flag, so lookups, edits
+    and deletes never shift other rows. Dead slots are dropped on reload.
+    Ids are never handed out twice: when the highest id leaves the ledger,
+    the next free id is saved in ``<path>.ids.json``, and ids named by
+    pending log records count as taken.
+    Ledgers written before ids existed get ids assigned on first load;
+    backends whose ``outdated()`` reports an older layout (e.g. without the
+    account column) are rewritten in the current one.
+
+    With ``use_log`` enabled, edits and deletes are not applied to the base
+    ledger. They are appended as update/tombstone records (keyed by id) to
+    ``<path>.log`` and merged on load; ``compact()`` folds the log back into
+    the base file with an atomic rename. New rows are always appended to the
+    base ledger directly.
+
+    Backends that change rows in place (SQLite; they have ``update`` and
+    ``delete`` methods) take edits and deletes directly and never use the
+    log. If they also answer queries (``get``, ``range``, ``summary``,
+    ``daily_totals``), those, and appends, edits, deletes and duplicate
+    checks, go to the backend whenever the in-memory copy is not loaded or
+    out of date, instead of loading it.
+
+    Secondary indexes (``self.indexes``) are rebuilt when the ledger is
+    (re)loaded and afterwards kept current through their ``on_append``,
+    ``on_update`` and ``on_delete`` hooks, which receive slots (and the old
+    and new rows as ``records.Transaction``). Indexes with
+    a ``persist()`` method are saved by ``close()``.
+
+    Several processes may share a ledger. Loads and writes hold an advisory
+    lock on ``<path>.lock`` (see locking.py), and reload first under it if
+    the files changed, so appends, log records and rewrites never interleave
+    and ids are never handed out twice. ``generation`` counts the changes
+    this store has made or loaded; ``changed_on_disk()`` is a cheap stat for
+    watchers that want to reload only when another process wrote.
+
+    A ``read_only`` store never writes: loading leaves outdated layouts and
+    leftover logs as they are (they are merged in memory), and ``close()``
+    neither compacts nor saves indexes.
+    """
+
+    def __init__(self, path, columns, date_format, use_log=False, compact_threshold=1000, backend=None,
+                 read_only=False):
+        self.path = path
+        self.log_path = path + ".log"
+        self.ids_path = path + ".ids.json"
+        self.columns = columns
+        self.data_columns = [column for column in columns if column != "id"]
+        self.date_format = date_format
+        self.backend = backend or CSVBackend(path, columns, date_format)
+        self.use_log = use_log and not hasattr(self.backend, "update")
+        self.compact_threshold = compact_threshold
+        self.read_only = read_only
+        self.lock = threading.RLock()
+        self.file_lock = FileLock(path)
+        self.generation = 0
+        self._df = None
+        self._alive = np.empty(0, dtype=bool)
+        self._slot_of = {}
+        self._next_id = 1
+        self._live = None
+        self._signature = None
+        self._log_records = 0
+        self.date_index = DateIndex()
+        self.rollups = Rollups()
+        self.dedup = DedupIndex(self)
+        self.text_index = TextIndex(self)
+        self.indexes = [self.date_index, self.rollups, self.dedup, self.text_index]
+
+    # ---------- loading ----------
+    def _stat_signature(self):
+        if hasattr(self.backend, "signature"):
+            return (self.backend.signature(), _stat(self.log_path))
+        return (_stat(self.backend.commit_path), _stat(self.log_path))
+
+    def is_stale(self):
+        """True if nothing is loaded yet or the file changed on disk."""
+        return self._df is None or self._stat_signature() != self._signature
+
+    def data_version(self):
+        """Differs after every change to the ledger, made here or by another process."""
+        return self.generation, self._stat_signature()
+
+    def changed_on_disk(self):
+        """
+        True if a loaded ledger was changed by another process.
+
+        Meant for polling from a UI thread: it never loads anything and
+        returns False instead of waiting while the store is busy.
+        """
+        if not self.lock.acquire(blocking=False):
+            return False
+        try:
+            return self._df is not None and self._stat_signature() != self._signature
+        finally:
+            self.lock.release()
+
+    @contextlib.contextmanager
+    def locked(self):
+        """
+        Hold both locks across several calls, e.g. a duplicate check and the
+        append it guards; the ledger is current on entry (loaded, unless the
+        backend answers queries itself).
+        """
+        with self.lock, self.file_lock:
+            if not hasattr(self.backend, "summary"):
+                self._ensure_loaded()
+            yield self
+
+    def _disk_bytes(self):
+        """Size of the ledger on disk (all files of a directory backend)."""
+        path = self.backend.path
+        if os.path.isdir(path):
+            return sum(entry.stat().st_size for entry in os.scandir(path) if entry.is_file())
+        return os.path.getsize(path) if os.path.exists(path) else 0
+
+    @_locked
+    def load(self):
+        """Read the ledger (and any pending log) from scratch."""
+        with metrics.span("backend.read"):
+            df = self.backend.read()
+        if metrics.ENABLED:
+            metrics.count("rows_read", len(df))
+            metrics.count("bytes_read", self._disk_bytes())
+        version, records = self._read_log()
+        if version == 1:
+            df = self._replay_positional(df, records)
+        df, assigned = self._with_ids(df)
+        # Ids of rows the log deletes are still taken.
+        taken = int(df.index.max()) + 1 if len(df) else 1
+        if version == LOG_VERSION and records:
+            taken = max(taken, max(int(rec[1]) for rec in records) + 1)
+            df = self._replay(df, records)
+        self._set_frame(df)
+        self._next_id = max(self._next_id, taken)
+        self._log_records = len(records) if version == LOG_VERSION else 0
+        self._signature = self._stat_signature()
+        outdated = hasattr(self.backend, "outdated") and self.backend.outdated()
+        if (assigned or version == 1 or outdated) and not self.read_only:
+            # Persist the new ids (and fold an old positional log, or move to the current layout) right away.
+            self._rewrite(self._df)
+
+    def _with_ids(self, df):
+        """Index ``df`` by id, numbering rows that have no (or a repeated) id."""
+        ids = pd.to_numeric(df["id"], errors="coerce") if "id" in df else pd.Series(np.nan, index=df.index)
+        missing = ids.isna() | ids.duplicated()
+        if missing.any():
+            start = int(ids[~missing].max()) + 1 if (~missing).any() else 1
+            ids = ids.copy()
+            ids[missing] = np.arange(start, start + int(missing.sum()))
+        df = df[self.data_columns].set_axis(pd.Index(ids.astype("int64"), name="id"))
+        return df, bool(missing.any())
+
+    def _set_frame(self, df):
+        for column in DICTIONARY_COLUMNS:
+            df[column] = df[column].astype("category")
+        self._df = df
+        self._alive = np.ones(len(df), dtype=bool)
+        self._slot_of = dict(zip(df.index.tolist(), range(len(df))))
+        self._next_id = max(int(df.index.max()) + 1 if len(df) else 1, self._saved_next_id())
+        self._live = None
+        self.generation += 1
+        for index in self.indexes:
+            index.rebuild(df)
+
+    def _ensure_loaded(self):
+        if self.is_stale():
+            self.load()
+
+    def _saved_next_id(self):
+        try:
+            with open(self.ids_path) as f:
+                return int(json.load(f)["next_id"])
+        except (OSError, ValueError, KeyError):
+            return 1
+
+    def _save_next_id(self, next_id=None):
+        """Remember the next free id (default ``_next_id``), once the ledger itself no longer shows it."""
+        tmp_path = self.ids_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"next_id": next_id or self._next_id}, f)
+        os.replace(tmp_path, self.ids_path)
+
+    def to_datetime(self, value):
+        if isinstance(value, str):
+            return pd.to_datetime(value, format=self.date_format)
+        return pd.Timestamp(value)
+
+    # ---------- append log ----------
+    def _read_log(self):
+        """
+        Return (version, records) for the log records that still apply.
+
+        A ``C`` record is written just before a compaction renames its temp
+        file over the base file. If the base file now carries the stat of
+        that temp file, the rename happened and everything up to the marker
+        is already folded in, so the leftover log is dropped.
+        """
+        try:
+            with open(self.log_path, newline="") as logfile:
+                records = [rec for rec in csv.reader(logfile) if rec]
+        except FileNotFoundError:
+            return LOG_VERSION, []
+        version = LOG_VERSION
+        if records and records[0][0].startswith("# finance-tracker log v"):
+            version = int(records.pop(0)[0].rsplit("v", 1)[1])
+        for pos in range(len(records) - 1, -1, -1):
+            if records[pos][0] == "C":
+                if _stat(self.backend.commit_path) == (int(records[pos][1]), int(records[pos][2])):
+                    if not self.read_only:
+                        os.remove(self.log_path)
+                    return LOG_VERSION, []
+                records = records[:pos] + records[pos + 1:]
+                break
+        return version, records
+
+    def _changes(self, records):
+        """Fold id-keyed log records into (updated rows indexed by id, deleted ids)."""
+        updates = {}
+        deleted = set()
+        for rec in records:
+            transaction_id = int(rec[1])
+            if rec[0] == "U":
+                # Records written before accounts existed end at the description.
+                updates[transaction_id] = rec[2:] + [DEFAULT_ACCOUNT] * (len(self.data_columns) - len(rec[2:]))
+            elif rec[0] == "D":
+                deleted.add(transaction_id)
+        rows = pd.DataFrame(list(updates.values()), columns=self.data_columns)
+        rows = typed_frame(rows.assign(id=list(updates)), self.columns, self.date_format)
+        return rows.set_index("id"), deleted
+
+    def _replay(self, df, records):
+        """Apply id-keyed update/delete records to a freshly read ledger."""
+        updates, deleted = self._changes(records)
+        hit = updates.index.intersection(df.index)
+        if len(hit):
+            df.loc[hit, self.data_columns] = updates.loc[hit, self.data_columns]
+        if deleted:
+            df = df[~df.index.isin(list(deleted))]
+        return df
+
+    @_synchronized
+    def log_changes(self):
+        """
+        Pending append-log changes as (updated rows indexed by id, deleted ids).
+
+        For readers that scan the base ledger on disk instead of loading it
+        (see streaming.py); the in-memory copy is left alone.
+        """
+        version, records = self._read_log()
+        if version != LOG_VERSION:
+            raise ValueError("The append log predates transaction IDs; open the ledger once to migrate it.")
+        return self._changes(records)
+
+    def _replay_positional(self, df, records):
+        """Apply a version 1 log, whose records address rows by position."""
+        # Track which base row sits at each live position so deletes only
+        # shift an integer array; updates are applied once at the end.
+        positions = np.arange(len(df))
+        updates = {}
+        for rec in records:
+            index = int(rec[1])
+            if rec[0] == "U":
+                updates[positions[index]] = rec[2:]
+            elif rec[0] == "D":
+                positions = np.delete(positions, index)
+        for base_row, (date, amount, category, description) in updates.items():
+            df.loc[base_row, ["date", "amount", "category", "description"]] = [
+                self.to_datetime(date), float(amount), category, description
+            ]
+        return df.iloc[positions].reset_index(drop=True)
+
+    def _append_log(self, *record):
+        new_file = not os.path.exists(self.log_path)
+        with open(self.log_path, "a", newline="") as logfile:
+            if new_file:
+                logfile.write(LOG_HEADER + "\n")
+            csv.writer(logfile).writerow(record)
+            logfile.flush()
+            os.fsync(logfile.fileno())
+        self._log_records += 1
+        metrics.count("log_records_written")
+
+    @_synchronized
+    def pending_log_records(self):
+        self._ensure_loaded()
+        return self._log_records
+
+    @_locked
+    def compact(self):
+        """Fold the append log into the base file."""
+        self._ensure_loaded()
+        if os.path.exists(self.log_path):
+            self._rewrite(self.frame())
+
+    def close(self):
+        """Compact the log and save persistent indexes; call on exit."""
+        if self._df is None or self.read_only:
+            return
+        with self.lock, self.file_lock:
+            self.compact()
+            for index in self.indexes:
+                if hasattr(index, "persist"):
+                    index.persist()
+
+    # ---------- reads ----------
+    @_synchronized
+    def frame(self):
+        """The live ledger, indexed by transaction id. Callers must not modify it."""
+        self._ensure_loaded()
+        if self._live is None:
+            self._live = self._df if self._alive.all() else self._df[self._alive]
+        return self._live
+
+    def _sql(self):
+        """The backend, when it answers queries itself and nothing current is in memory."""
+        if hasattr(self.backend, "summary") and self.is_stale():
+            return self.backend
+        return None
+
+    @_synchronized
+    def __len__(self):
+        sql = self._sql()
+        return sql.count() if sql else len(self.frame())
+
+    @_synchronized
+    def __contains__(self, transaction_id):
+        sql = self._sql()
+        if sql:
+            return not sql.get(transaction_id).empty
+        self._ensure_loaded()
+        return transaction_id in self._slot_of
+
+    @_synchronized
+    def contains(self, date, amount, category, description, account):
+        """True if an identical row is in the ledger (see dedup.py); ``id in store`` checks ids."""
+        sql = self._sql()
+        if sql:
+            day = self.to_datetime(date)
+            same_day = frame_hashes(sql.range(day, day)).tolist()
+            return row_hash(day, amount, category, description, account) in same_day
+        self._ensure_loaded()
+        return self.dedup.contains(date, amount, category, description, account)
+
+    @_synchronized
+    def duplicates(self, df, hashes=None):
+        """Boolean mask of rows of ``df`` already in the ledger; ``hashes`` are their ``frame_hashes`` if known."""
+        if hashes is None:
+            hashes = frame_hashes(df)
+        sql = self._sql()
+        if sql:
+            if df.empty:
+                return np.zeros(0, dtype=bool)
+            # Only the rows in the batch's date span can match.
+            return np.isin(hashes, frame_hashes(sql.range(df["date"].min(), df["date"].max())))
+        self._ensure_loaded()
+        return self.dedup.duplicates(df, hashes)
+
+    def _transaction(self, slot):
+        return Transaction.from_frame(self._df, slot)
+
+    @_synchronized
+    def get(self, transaction_id):
+        """The row for one transaction id as a ``records.Transaction``."""
+        sql = self._sql()
+        if sql:
+            row = sql.get(transaction_id)
+            if row.empty:
+                raise KeyError(transaction_id)
+            return Transaction.from_frame(row, 0)
+        self._ensure_loaded()
+        return self._transaction(self._slot_of[transaction_id])
+
+    @_synchronized
+    def batch(self, slots):
+        """The rows at ``slots`` as a ``records.TransactionBatch``."""
+        self._ensure_loaded()
+        return TransactionBatch.from_frame(self._df, slots)
+
+    @_synchronized
+    def slots_frame(self):
+        """
+        The slot-ordered frame, including deleted slots.
+
+        Together with ``live_slots``/``range_slots`` this lets views address
+        rows by slot; slots stay valid until the next reload.
+        """
+        self._ensure_loaded()
+        return self._df
+
+    def slot_of(self, transaction_id):
+        return self._slot_of.get(transaction_id)
+
+    @_synchronized
+    def live_slots(self):
+        """Slots of all live rows, in ledger order."""
+        self._ensure_loaded()
+        return np.flatnonzero(self._alive)
+
+    @_synchronized
+    def range_slots(self, start, end):
+        """Slots of live rows with start <= date <= end, in date order."""
+        self._ensure_loaded()
+        slots = self.date_index.positions(self.to_datetime(start), self.to_datetime(end))
+        return slots[self._alive[slots]]
+
+    @_synchronized
+    def search_slots(self, query, start=None, end=None, fuzzy=True):
+        """
+        Slots of live rows whose description matches ``query`` (see
+        text_index.py); within start..end and in date order when a range
+        is given, else in ledger order.
+        """
+        self._ensure_loaded()
+        slots = self.live_slots() if start is None else self.range_slots(start, end)
+        return self.text_index.filter(slots, query, fuzzy)
+
+    @_synchronized
+    def date_span(self):
+        """(first, last) date of the live rows, or None if the ledger is empty."""
+        sql = self._sql()
+        if sql:
+            return sql.date_span()
+        dates = self.frame()["date"]
+        if dates.empty:
+            return None
+        return dates.min(), dates.max()
+
+    @_synchronized
+    def range(self, start, end):
+        """Rows with start <= date <= end (inclusive), in date order."""
+        sql = self._sql()
+        if sql:
+            return sql.range(self.to_datetime(start), self.to_datetime(end))
+        slots = self.range_slots(start, end)
+        return self._df.iloc[slots]
+
+    @_synchronized
+    def summary(self, start, end):
+        """Per-category amount totals for start <= date <= end."""
+        sql = self._sql()
+        if sql:
+            return sql.summary(self.to_datetime(start), self.to_datetime(end))
+        self._ensure_loaded()
+        return self.rollups.summary(self.to_datetime(start), self.to_datetime(end))
+
+    @_synchronized
+    def daily_totals(self, categories, start, end):
+        """Frame of per-day totals (one column per category), zero-filled."""
+        start, end = self.to_datetime(start), self.to_datetime(end)
+        sql = self._sql()
+        if sql:
+            return sql.daily_totals(categories, start, end)
+        self._ensure_loaded()
+        return pd.DataFrame({category: self.rollups.daily_series(category, start, end) for category in categories})
+
+    @_synchronized
+    def monthly_totals(self, categories, start, end):
+        """Frame of per-month totals (one column per category)."""
+        self._ensure_loaded()
+        start, end = self.to_datetime(start), self.to_datetime(end)
+        return pd.DataFrame({category: self.rollups.monthly_series(category, start, end) for category in categories})
+
+    @_synchronized
+    def totals_by(self, columns, start, end):
+        """Amount totals for start <= date <= end grouped by ``columns`` ("account", "category"), as a Series."""
+        columns = list(columns)
+        sql = self._sql()
+        if sql:
+            return sql.totals_by(columns, self.to_datetime(start), self.to_datetime(end))
+        slots = self.range_slots(start, end)
+        totals = self._df.iloc[slots].groupby(columns, observed=True)["amount"].sum()
+        # Back to plain names, so results from every source combine alike.
+        levels = [totals.index.get_level_values(i).astype(object) for i in range(len(columns))]
+        if len(columns) == 1:
+            return totals.set_axis(pd.Index(levels[0], name=columns[0]))
+        return totals.set_axis(pd.MultiIndex.from_arrays(levels, names=columns))
+
+    # ---------- writes ----------
+    def _row(self, date, amount, category, description, account=DEFAULT_ACCOUNT):
+        return {
+            "date": self.to_datetime(date),
+            "amount": float(amount),
+            "category": category,
+            "description": description or "",
+            "account": account or DEFAULT_ACCOUNT,
+        }
+
+    def _add_names(self, column, names):
+        """Extend the dictionary of a Categorical column with ``names`` it does not know yet."""
+        known = self._df[column].cat.categories
+        new = pd.Index(pd.unique(pd.Index(names, dtype=object))).difference(known)
+        if len(new):
+            self._df[column] = self._df[column].cat.add_categories(new)
+
+    def _after_log_write(self):
+        self._signature = self._stat_signature()
+        if self._log_records >= self.compact_threshold:
+            self.compact()
+
+    def _to_disk(self, df):
+        return df.reset_index()[self.columns]
+
+    def append(self, date, amount, category, description, account=DEFAULT_ACCOUNT):
+        """Append one row; returns the new transaction's id."""
+        new = pd.DataFrame([self._row(date, amount, category, description, account)], columns=self.data_columns)
+        return int(self.append_rows(new)[0])
+
+    @_locked
+    def append_rows(self, new, hashes=None):
+        """
+        Append a frame of rows in one write; returns their new ids.
+
+        ``hashes`` are the rows' ``dedup.frame_hashes`` if the caller already
+        computed them for a duplicate check.
+        """
+        sql = self._sql()
+        if sql:
+            next_id = max(sql.max_id() + 1, self._saved_next_id())
+        else:
+            self._ensure_loaded()
+            next_id = self._next_id
+        ids = np.arange(next_id, next_id + len(new))
+        new = typed_frame(new.reset_index(drop=True).assign(id=ids), self.columns, self.date_format)
+        before = self._disk_bytes() if metrics.ENABLED else 0
+        with metrics.span("backend.append"):
+            self.backend.append(new)
+        if metrics.ENABLED:
+            metrics.count("rows_written", len(new))
+            metrics.count("bytes_written", self._disk_bytes() - before)
+        if sql:
+            # Nothing in memory to keep current; the indexes are built on the next load.
+            self.generation += 1
+            return ids
+        new = new.set_index("id")
+        for column in DICTIONARY_COLUMNS:
+            self._add_names(column, new[column])
+            new[column] = pd.Categorical(new[column], categories=self._df[column].cat.categories)
+        start = len(self._df)
+        self._df = new if self._df.empty else pd.concat([self._df, new])
+        slots = np.arange(start, len(self._df))
+        self._alive = np.concatenate([self._alive, np.ones(len(new), dtype=bool)])
+        self._slot_of.update(zip(ids.tolist(), slots.tolist()))
+        self._next_id += len(new)
+        self._live = None
+        self.generation += 1
+        for index in self.indexes:
+            if index is self.dedup:
+                index.on_append(new, slots, hashes)
+            else:
+                index.on_append(new, slots)
+        self._signature = self._stat_signature()
+        return ids
+
+    @_locked
+    def update(self, transaction_id, date, amount, category, description, account=None):
+        """Change one row; ``account`` None keeps its account."""
+        sql = self._sql()
+        if sql:
+            # Nothing in memory to keep current; the indexes are built on the next load.
+            old = self.get(transaction_id)
+            row = self._row(date, amount, category, description, account or old.account)
+            sql.update(transaction_id, Transaction(transaction_id, day_number(row["date"]), row["amount"],
+                                                   category, row["description"], row["account"]))
+            self.generation += 1
+            return
+        self._ensure_loaded()
+        slot = self._slot_of[transaction_id]
+        old = self._transaction(slot)
+        row = self._row(date, amount, category, description, account or old.account)
+        for column in DICTIONARY_COLUMNS:
+            self._add_names(column, [row[column]])
+        for column, value in row.items():
+            self._df.iat[slot, self._df.columns.get_loc(column)] = value
+        new = Transaction(transaction_id, day_number(row["date"]), row["amount"], category, row["description"],
+                          row["account"])
+        self._live = None
+        self.generation += 1
+        for index in self.indexes:
+            index.on_update(slot, old, new)
+        if hasattr(self.backend, "update"):
+            self.backend.update(transaction_id, new)
+            self._signature = self._stat_signature()
+        elif self.use_log:
+            self._append_log("U", transaction_id, new.date.strftime(self.date_format), new.amount, category,
+                             new.description, new.account)
+            self._after_log_write()
+        else:
+            self._rewrite(self.frame())
+
+    @_locked
+    def delete(self, transaction_id):
+        sql = self._sql()
+        if sql:
+            if sql.get(transaction_id).empty:
+                raise KeyError(transaction_id)
+            if transaction_id >= sql.max_id():
+                self._save_next_id(max(transaction_id + 1, self._saved_next_id()))
+            sql.delete(transaction_id)
+            self.generation += 1
+            return
+        self._ensure_loaded()
+        slot = self._slot_of.pop(transaction_id)
+        old = self._transaction(slot)
+        self._alive[slot] = False
+        self._live = None
+        self.generation += 1
+        for index in self.indexes:
+            index.on_delete(slot, old)
+        if hasattr(self.backend, "delete"):
+            if transaction_id == self._next_id - 1:
+                self._save_next_id()
+            self.backend.delete(transaction_id)
+            self._signature = self._stat_signature()
+        elif self.use_log:
+            self._append_log("D", transaction_id)
+            self._after_log_write()
+        else:
+            self._rewrite(self.frame())
+
+    @_locked
+    def write(self, df):
+        """
+        Overwrite the ledger with ``df`` and make it the in-memory copy.
+
+        ``df`` may carry ids as an ``id`` column or index; rows without one
+        are numbered.
+        """
+        if df.index.name == "id":
+            df = df.reset_index()
+        df, _ = self._with_ids(typed_frame(df, self.columns, self.date_format))
+        self._rewrite(df)
+        self._set_frame(df)
+
+    def _rewrite(self, df):
+        """
+        Persist ``df`` as the whole ledger.
+
+        The backend writes the new contents aside and renames them into
+        place, so a crash leaves either the old or the new ledger, never a
+        half-written one. Any append log is folded in and removed.
+        """
+        if (int(df.index.max()) + 1 if len(df) else 1) < self._next_id:
+            self._save_next_id()
+        with metrics.span("backend.write"):
+            tmp_path = self.backend.prepare_write(self._to_disk(df))
+            if os.path.exists(self.log_path):
+                self._append_log("C", *_stat(tmp_path))
+            self.backend.commit_write(tmp_path)
+        if metrics.ENABLED:
+            metrics.count("rows_written", len(df))
+            metrics.count("bytes_written", self._disk_bytes())
+        if os.path.exists(self.log_path):
+            os.remove(self.log_path)
+        self._log_records = 0
+        self._signature = self._stat_signature()
+
+
+def convert(source, target):
+    """
+    Copy a ledger between backends, e.g. CSV to columnar or back.
+
+    Pending append-log records of ``source`` are merged on the way.
+    """
+    df = TransactionStore(source.path, source.columns, source.date_format, backend=source).frame()
+    if not target.exists():
+        target.create()
+    TransactionStore(target.path, target.columns, target.date_format, backend=target).write(df)
+    return len(df)
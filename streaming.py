@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+
+import metrics
+from categories import mask_under
+
+DEFAULT_CHUNKSIZE = 100_000
+
+
+def iter_ledger(store, chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Yield the ledger from disk in chunks of at most ``chunksize`` rows.
+
+    Chunks are typed frames indexed by id, in ledger order, with pending
+    append-log edits and deletes applied. Nothing is loaded into the
+    store's in-memory copy, so peak memory follows the chunk size rather
+    than the ledger size.
+    """
+    updates, deleted = store.log_changes()
+    deleted = list(deleted)
+    for chunk in store.backend.iter_chunks(chunksize):
+        metrics.count("rows_read", len(chunk))
+        chunk = chunk.set_index("id")[store.data_columns]
+        if len(updates):
+            hit = updates.index.intersection(chunk.index)
+            if len(hit):
+                chunk.loc[hit, store.data_columns] = updates.loc[hit, store.data_columns]
+        if deleted:
+            chunk = chunk[~chunk.index.isin(deleted)]
+        yield chunk
+
+
+def _in_range(store, start, end, chunksize):
+    start, end = store.to_datetime(start), store.to_datetime(end)
+    for chunk in iter_ledger(store, chunksize):
+        dates = chunk["date"]
+        hit = chunk[(dates >= start) & (dates <= end)]
+        if len(hit):
+            yield hit
+
+
+def iter_range(store, start, end, chunksize=DEFAULT_CHUNKSIZE):
+    """Yield rows with start <= date <= end chunk by chunk, each chunk in date order."""
+    for chunk in _in_range(store, start, end, chunksize):
+        yield chunk.sort_values("date", kind="stable")
+
+
+def summary(store, start, end, chunksize=DEFAULT_CHUNKSIZE):
+    """Per-category amount totals for start <= date <= end, one chunk at a time."""
+    totals = {}
+    for chunk in _in_range(store, start, end, chunksize):
+        for category, amount in chunk.groupby("category")["amount"].sum().items():
+            totals[category] = totals.get(category, 0.0) + float(amount)
+    return totals
+
+
+def daily_totals(store, categories, start, end, chunksize=DEFAULT_CHUNKSIZE):
+    """Frame of per-day totals (one column per category), zero-filled; see TransactionStore.daily_totals."""
+    start, end = store.to_datetime(start), store.to_datetime(end)
+    index = pd.date_range(start.normalize(), end.normalize(), freq="D")
+    totals = {category: np.zeros(len(index)) for category in categories}
+    origin = np.datetime64(index[0], "D") if len(index) else None
+    for chunk in _in_range(store, start, end, chunksize):
+        days = (chunk["date"].to_numpy(dtype="M8[D]") - origin).astype("int64")
+        amounts = chunk["amount"].to_numpy()
+        for category in categories:
+            mask = mask_under(chunk["category"], category).to_numpy()
+            np.add.at(totals[category], days[mask], amounts[mask])
+    return pd.DataFrame(totals, index=index)
+
+
+def totals_by(store, columns, start, end, chunksize=DEFAULT_CHUNKSIZE):
+    """Amount totals grouped by ``columns``, one chunk at a time; see TransactionStore.totals_by."""
+    columns = list(columns)
+    parts = [chunk.groupby(columns)["amount"].sum() for chunk in _in_range(store, start, end, chunksize)]
+    if not parts:
+        empty = pd.DataFrame({column: pd.Series(dtype=object) for column in columns + ["amount"]})
+        return empty.astype({"amount": "float64"}).set_index(columns)["amount"]
+    return pd.concat(parts).groupby(level=columns).sum()
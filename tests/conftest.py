@@ -0,0 +1,40 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backends import BACKENDS  # noqa: E402
+from main import CSV  # noqa: E402
+from store import TransactionStore  # noqa: E402
+
+DATE_FORMAT = "%d-%m-%Y"
+BACKEND_KINDS = ["csv", "columnar", "partitioned", "sqlite"]
+
+
+def open_store(path, kind="csv", use_log=True, **kwargs):
+    """A store over a ledger of backend ``kind`` at ``path``, created if missing."""
+    backend = BACKENDS[kind](str(path), CSV.COLUMNS, DATE_FORMAT)
+    if not backend.exists():
+        backend.create()
+    return TransactionStore(str(path), CSV.COLUMNS, DATE_FORMAT, use_log=use_log, backend=backend, **kwargs)
+
+
+@pytest.fixture(params=BACKEND_KINDS)
+def kind(request):
+    return request.param
+
+
+@pytest.fixture
+def ledger_csv(tmp_path, monkeypatch):
+    """Point the CSV facade at a fresh CSV ledger under tmp_path and close it afterwards."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(CSV, "BACKEND", "csv")
+    monkeypatch.setattr(CSV, "CSV_FILE", str(tmp_path / "ledger.csv"))
+    monkeypatch.setattr(CSV, "_store", None)
+    monkeypatch.setattr(CSV, "_query", None)
+    monkeypatch.setattr(CSV, "_cache", None)
+    monkeypatch.setattr(CSV, "_rules", None)
+    yield CSV
+    CSV.close()
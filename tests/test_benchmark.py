@@ -0,0 +1,34 @@
+import json
+
+import pytest
+
+import benchmark
+from main import CSV
+
+
+def test_generated_ledger_is_reproducible_and_well_formed():
+    ledger = benchmark.generate_ledger(500, seed=3)
+    assert ledger.equals(benchmark.generate_ledger(500, seed=3))
+    assert list(ledger.columns) == CSV.COLUMNS
+    assert ledger["id"].tolist() == list(range(1, 501))
+    assert ledger["date"].is_monotonic_increasing
+    assert (ledger["amount"] > 0).all()
+    assert set(ledger["category"]) <= set(benchmark.EXPENSE_CATEGORIES) | {"Income/Salary"}
+    assert set(ledger["account"]) <= set(benchmark.ACCOUNTS)
+
+
+@pytest.mark.parametrize("backend", ["csv", "partitioned"])
+def test_run_writes_a_timing_for_every_operation(tmp_path, monkeypatch, backend):
+    for name in ("CSV_FILE", "COLUMNAR_DIR", "PARTITION_DIR", "SQLITE_FILE", "BACKEND",
+                 "_store", "_query", "_cache", "_rules"):
+        monkeypatch.setattr(CSV, name, getattr(CSV, name))
+    out = tmp_path / "bench.json"
+    benchmark.main(["--sizes", "300", "--repeat", "1", "--backend", backend, "--out", str(out)])
+
+    (result,) = json.loads(out.read_text())["results"]
+    assert (result["rows"], result["backend"]) == (300, backend)
+    seconds = result["seconds"]
+    for operation in ("initialize_csv (startup)", "cold load (full parse)", "add_entry", "edit_entry",
+                      "delete_entry", "compact", "cli add (new process)"):
+        assert seconds[operation] >= 0
+    assert ("summary (parallel, full range)" in seconds) == (backend == "partitioned")
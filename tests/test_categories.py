@@ -0,0 +1,90 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from categories import ancestors, is_under, roll_up, truncate
+from conftest import open_store
+
+
+def test_tree_helpers():
+    assert is_under("Expense/Food/Lunch", "Expense/Food")
+    assert is_under("Expense", "Expense")
+    assert not is_under("Expenses", "Expense")
+    assert not is_under("Expense/Food", "Expense/Food/Lunch")
+    assert truncate("Expense/Food/Lunch", 2) == "Expense/Food"
+    assert truncate("Income", 2) == "Income"
+    assert ancestors("Expense/Food/Lunch") == ["Expense", "Expense/Food", "Expense/Food/Lunch"]
+    assert roll_up({"Expense/Food": 2.0, "Expense/Rent": 3.0, "Income": 1.0}, ["Expense", "Income"]) == {
+        "Expense": 5.0, "Income": 1.0}
+
+
+@pytest.mark.parametrize("reopen", [False, True])
+def test_totals_by_account_and_category(tmp_path, kind, reopen):
+    store = open_store(tmp_path / "ledger", kind)
+    for i in range(30):
+        store.append(f"{i % 28 + 1:02d}-01-2024", float(i + 1), ["Income", "Expense/Food", "Expense/Rent"][i % 3],
+                     "", ["Main", "Card", "Savings"][i % 4 % 3])
+    store.update(4, "04-01-2024", 50.0, "Expense/Food/Lunch", "", "Card")
+    if reopen:
+        store = open_store(tmp_path / "ledger", kind)
+    totals = store.totals_by(["account", "category"], "01-01-2024", "15-01-2024")
+    rows = store.frame()
+    rows = rows[rows["date"] <= pd.Timestamp("2024-01-15")].astype({"category": str, "account": str})
+    expected = rows.groupby(["account", "category"])["amount"].sum()
+    assert totals.sort_index().to_dict() == pytest.approx(expected.to_dict())
+
+
+def test_breakdown_by_depth_includes_scheduled_rows(ledger_csv):
+    ledger_csv.initialize_csv()
+    ledger_csv.add_entry("02-01-2024", "10", "E/Food/Lunch", "", "Card")
+    ledger_csv.add_entry("03-01-2024", "5", "E/Food/Coffee", "", "Card")
+    ledger_csv.add_entry("04-01-2024", "100", "I", "")
+    ledger_csv.add_recurring("01-01-2024", "monthly", "700", "E/Rent", "rent")
+    breakdown = ledger_csv.breakdown("01-01-2024", "31-01-2024", depth=2)
+    assert breakdown.values.tolist() == [["Card", "Expense/Food", 15.0], ["Main", "Expense/Rent", 700.0],
+                                         ["Main", "Income", 100.0]]
+    by_account = ledger_csv.breakdown("01-01-2024", "31-01-2024", by=["account"])
+    assert by_account.values.tolist() == [["Card", 15.0], ["Main", 800.0]]
+
+
+def test_names_are_stored_once(tmp_path):
+    store = open_store(tmp_path / "ledger", "columnar")
+    for i in range(50):
+        store.append("01-01-2024", 1.0, ["Expense/Food", "Income"][i % 2], "", ["Main", "Card"][i % 2])
+    assert store.frame()["category"].dtype == "category"
+    store.compact()
+    meta = store.backend.meta()
+    assert sorted(meta["categories"]) == ["Expense/Food", "Income"]
+    assert sorted(meta["accounts"]) == ["Card", "Main"]
+
+
+def test_partitions_without_accounts_are_migrated(tmp_path):
+    path = tmp_path / "ledger"
+    path.mkdir()
+    data = b"id,date,amount,category,description\n1,05-01-2024,2.0,Expense,a\n"
+    (path / "2024-01.0.csv").write_bytes(data)
+    (path / "manifest.json").write_text(json.dumps({"version": 1, "generation": 0, "partitions": {
+        "2024-01": {"file": "2024-01.0.csv", "bytes": len(data), "rows": 1}}}))
+    store = open_store(path, "partitioned")
+    assert store.frame()["account"].tolist() == ["Main"]
+    assert store.backend.manifest()["version"] == 2
+    assert not store.backend.outdated()
+
+
+def test_columnar_without_accounts_is_migrated(tmp_path):
+    path = tmp_path / "ledger"
+    path.mkdir()
+    columns = {"id": np.array([1, 2], dtype="int64"), "date": np.array(["2024-01-05", "2024-01-06"], dtype="M8[ns]"),
+               "amount": np.array([2.0, 3.0]), "category": np.array([0, 1], dtype="uint8")}
+    for column, values in columns.items():
+        (path / f"{column}.0.bin").write_bytes(values.tobytes())
+    (path / "description.0.bin").write_bytes(b"a\0b\0")
+    (path / "meta.json").write_text(json.dumps({"version": 2, "generation": 0, "rows": 2, "description_bytes": 4,
+                                                "categories": ["Expense", "Income"]}))
+    store = open_store(path, "columnar")
+    rows = store.frame()
+    assert rows["category"].astype(str).tolist() == ["Expense", "Income"]
+    assert rows["account"].astype(str).tolist() == ["Main", "Main"]
+    assert store.backend.meta()["version"] == 3
@@ -0,0 +1,127 @@
+import json
+import os
+
+import pandas as pd
+import pytest
+
+import cli
+from conftest import open_store
+from main import CSV
+
+
+@pytest.fixture
+def ledgers(tmp_path, monkeypatch):
+    """Two CSV ledgers with a pending (uncompacted) edit each."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(CSV, "_store", None)
+    monkeypatch.setattr(CSV, "_cache", None)
+    monkeypatch.setattr(CSV, "_rules", None)
+    monkeypatch.setattr(CSV, "BACKEND", "csv")
+    monkeypatch.setattr(CSV, "CSV_FILE", str(tmp_path / "finance_data.csv"))
+    paths = []
+    for name, pay in (("alice", 1000.0), ("bob", 2000.0)):
+        path = tmp_path / f"{name}.csv"
+        store = open_store(path)
+        store.append("05-01-2024", pay, "Income", "salary")
+        store.append("06-01-2024", 10.0, "Expense/Food", "lunch", "Card")
+        store.append("07-02-2024", 20.0, "Expense", "fuel")
+        store.update(2, "06-01-2024", 12.0, "Expense/Food", "lunch", "Card")
+        paths.append(str(path))
+    return paths
+
+
+def _files(tmp_path):
+    return sorted(os.listdir(tmp_path))
+
+
+def test_summary_per_ledger_and_month(ledgers, tmp_path):
+    assert cli.main(["summary", *ledgers, "--month", "2024-01:2024-02", "--out", "report.csv"]) == 0
+    report = pd.read_csv(tmp_path / "report.csv")
+    assert report[["ledger", "period"]].values.tolist() == [
+        ["alice", "2024-01"], ["alice", "2024-02"], ["bob", "2024-01"], ["bob", "2024-02"]]
+    assert report["income"].tolist() == [1000.0, 0.0, 2000.0, 0.0]
+    assert report["expense"].tolist() == [12.0, 20.0, 12.0, 20.0]
+    assert report.loc[0, ["start", "end"]].tolist() == ["01-01-2024", "31-01-2024"]
+
+
+def test_breakdown_as_json(ledgers, capsys):
+    assert cli.main(["summary", ledgers[0], "--range", "01-01-2024", "29-02-2024",
+                     "--by", "account", "category", "--depth", "1", "--format", "json"]) == 0
+    rows = json.loads(capsys.readouterr().out)
+    assert [(row["account"], row["category"], row["amount"]) for row in rows] == [
+        ("Card", "Expense", 12.0), ("Main", "Expense", 20.0), ("Main", "Income", 1000.0)]
+
+
+def test_export_one_file_per_placeholder(ledgers, tmp_path):
+    assert cli.main(["export", *ledgers, "--month", "2024-01", "--out", "out/{ledger}-{period}.csv"]) == 0
+    alice = pd.read_csv(tmp_path / "out" / "alice-2024-01.csv")
+    assert alice["id"].tolist() == [1, 2]
+    assert alice["date"].tolist() == ["05-01-2024", "06-01-2024"]
+    assert os.path.exists(tmp_path / "out" / "bob-2024-01.csv")
+
+
+def test_query_search(ledgers, capsys):
+    assert cli.main(["query", ledgers[0], "--search", "lnch", "--format", "csv"]) == 0
+    out = capsys.readouterr().out.splitlines()
+    assert out[0] == "id,date,amount,category,description,account"
+    assert out[1:] == ["2,06-01-2024,12.0,Expense/Food,lunch,Card"]
+
+
+def test_read_only_commands_write_nothing(ledgers, tmp_path):
+    before = {name: (tmp_path / name).read_bytes() for name in _files(tmp_path)}
+    assert cli.main(["summary", *ledgers]) == 0
+    assert cli.main(["export", *ledgers, "--out", "all.json"]) == 0
+    # The logs stay uncompacted and no sidecars are saved.
+    assert set(_files(tmp_path)) - {"all.json"} == set(before)
+    assert {"alice.csv.log", "bob.csv.log"} <= set(before)
+    assert all((tmp_path / name).read_bytes() == data for name, data in before.items())
+
+
+def test_missing_ledger_fails_without_creating_files(ledgers, tmp_path, capsys):
+    before = _files(tmp_path)
+    assert cli.main(["summary", "missing.csv"]) == 1
+    assert "No ledger at missing.csv." in capsys.readouterr().out
+    assert _files(tmp_path) == before
+
+
+def test_plot_writes_png_and_fails_on_empty_range(ledgers, tmp_path, capsys):
+    assert cli.main(["plot", ledgers[0], "--month", "2024-01", "--out", "jan.png"]) == 0
+    assert (tmp_path / "jan.png").read_bytes()[:4] == b"\x89PNG"
+    assert cli.main(["plot", ledgers[0], "--month", "2030-01", "--out", "empty.png"]) == 1
+    assert "No data to plot." in capsys.readouterr().out
+    assert not (tmp_path / "empty.png").exists()
+
+
+def test_plot_needs_placeholders_for_several_ranges(ledgers, tmp_path):
+    assert cli.main(["plot", *ledgers, "--month", "2024-01", "--out", "same.png"]) == 1
+    assert not (tmp_path / "same.png").exists()
+
+
+def test_add(ledgers, tmp_path):
+    assert cli.main(["add", "08-02-2024", "5", "E/Food", "snack", "--account", "Card",
+                     "--ledger", ledgers[0]]) == 0
+    assert cli.main(["add", "08-02-2024", "5", "E/Food", "snack", "--account", "Card",
+                     "--ledger", ledgers[0], "--duplicates", "skip"]) == 0
+    assert cli.main(["add", "31-02-2024", "5", "E", "bad date", "--ledger", ledgers[0]]) == 1
+    rows = open_store(ledgers[0]).frame()
+    assert rows["description"].tolist().count("snack") == 1
+    assert rows.loc[rows["description"] == "snack", "category"].tolist() == ["Expense/Food"]
+
+
+def test_whole_ledger_includes_recurring_transactions(ledgers, capsys):
+    CSV.use_ledger(ledgers[0], "csv")
+    CSV.add_recurring("01-03-2024", "monthly", "5", "E/Rent", "rent", end_date="01-04-2024")
+    CSV.close()
+    capsys.readouterr()
+    assert cli.main(["query", ledgers[0], "--format", "csv"]) == 0
+    out = capsys.readouterr().out.splitlines()
+    assert [line.split(",")[0] for line in out[1:]] == ["1", "2", "3", "r1", "r1"]
+    assert out[-1] == "r1,01-04-2024,5.0,Expense/Rent,rent,Main"
+
+
+def test_unknown_out_placeholder_is_a_usage_error(ledgers, tmp_path, capsys):
+    with pytest.raises(SystemExit) as exit_info:
+        cli.main(["export", *ledgers, "--out", "{user}-{period}.csv"])
+    assert exit_info.value.code == 2
+    assert "unknown placeholder {user} in --out" in capsys.readouterr().err
+    assert not list(tmp_path.glob("*-*.csv"))
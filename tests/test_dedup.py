@@ -0,0 +1,107 @@
+import numpy as np
+import pandas as pd
+
+from conftest import open_store
+from dedup import frame_hashes
+
+
+def test_sidecar_follows_ids_when_backend_reads_in_another_order(tmp_path):
+    # Partitioned ledgers read back month by month, not in the order rows were added.
+    path = tmp_path / "ledger"
+    store = open_store(path, "partitioned")
+    march = store.append("15-03-2024", 10.0, "Expense", "march")
+    store.append("15-01-2024", 20.0, "Expense", "january")
+    store.close()
+
+    reopened = open_store(path, "partitioned")
+    reopened.update(march, "16-03-2024", 11.0, "Expense", "march edited")
+    assert not reopened.dedup.contains("15-03-2024", 10.0, "Expense", "march", "Main")
+    assert reopened.dedup.contains("16-03-2024", 11.0, "Expense", "march edited", "Main")
+    assert reopened.dedup.contains("15-01-2024", 20.0, "Expense", "january", "Main")
+
+
+def test_sidecar_is_reused_after_close(tmp_path, kind):
+    path = tmp_path / "ledger"
+    store = open_store(path, kind)
+    # Loaded, so that SQLite appends keep the index current too.
+    store.frame()
+    for day in range(1, 6):
+        store.append(f"{day:02d}-0{6 - day}-2024", float(day), "Expense", f"row {day}")
+    expected = sorted(store.dedup.counts.items())
+    store.close()
+
+    reopened = open_store(path, kind)
+    reopened.frame()
+    assert sorted(reopened.dedup.counts.items()) == expected
+    # Each slot's hash belongs to the row in that slot.
+    assert np.array_equal(reopened.dedup.hashes, frame_hashes(reopened.frame()))
+
+
+def test_sidecar_covers_rows_appended_after_close(tmp_path):
+    path = tmp_path / "ledger"
+    store = open_store(path, "csv", use_log=False)
+    store.append("01-01-2024", 1.0, "Expense", "a")
+    store.close()
+    other = open_store(path, "csv", use_log=False)
+    other.append("02-01-2024", 2.0, "Income", "b")
+
+    reopened = open_store(path, "csv", use_log=False)
+    reopened.frame()
+    assert reopened.dedup.contains("01-01-2024", 1.0, "Expense", "a", "Main")
+    assert reopened.dedup.contains("02-01-2024", 2.0, "Income", "b", "Main")
+
+
+def test_sidecar_is_not_reused_after_a_compaction_grew_the_file(tmp_path):
+    path = tmp_path / "ledger.csv"
+    store = open_store(path)
+    first = store.append("01-01-2024", 1.0, "Expense", "old")
+    store.append("02-01-2024", 2.0, "Income", "b")
+    store.close()
+    other = open_store(path)
+    other.update(first, "01-01-2024", 1.0, "Expense", "a much longer description")
+    other.compact()
+
+    reopened = open_store(path)
+    reopened.frame()
+    assert reopened.dedup.contains("01-01-2024", 1.0, "Expense", "a much longer description", "Main")
+    assert not reopened.dedup.contains("01-01-2024", 1.0, "Expense", "old", "Main")
+
+
+def test_descriptions_match_ignoring_case_and_spacing(tmp_path):
+    store = open_store(tmp_path / "ledger.csv")
+    store.append("01-01-2024", 9.99, "Expense/Food", "  Corner   SHOP ", "Card")
+    assert store.dedup.contains("01-01-2024", 9.99, "Expense/Food", "corner shop", "Card")
+    assert not store.dedup.contains("01-01-2024", 9.99, "Expense/Food", "corner shop", "Main")
+    assert not store.dedup.contains("01-01-2024", 9.98, "Expense/Food", "corner shop", "Card")
+    assert not store.dedup.contains("02-01-2024", 9.99, "Expense/Food", "corner shop", "Card")
+
+
+def test_counts_follow_edits_and_deletes(tmp_path):
+    store = open_store(tmp_path / "ledger.csv")
+    first = store.append("01-01-2024", 5.0, "Expense", "twin")
+    second = store.append("01-01-2024", 5.0, "Expense", "twin")
+    store.update(first, "01-01-2024", 6.0, "Expense", "twin")
+    assert store.dedup.contains("01-01-2024", 5.0, "Expense", "twin", "Main")
+    store.delete(second)
+    assert not store.dedup.contains("01-01-2024", 5.0, "Expense", "twin", "Main")
+    assert store.dedup.contains("01-01-2024", 6.0, "Expense", "twin", "Main")
+
+
+def test_add_entry_duplicate_modes(ledger_csv, capsys):
+    ledger_csv.initialize_csv()
+    assert ledger_csv.add_entry("01-01-2024", "5", "E", "lunch")
+    assert not ledger_csv.add_entry("01-01-2024", "5.00", "e", "Lunch", on_duplicate="skip")
+    assert "Duplicate transaction skipped." in capsys.readouterr().out
+    assert ledger_csv.add_entry("01-01-2024", "5", "E", "lunch", on_duplicate="flag")
+    assert "an identical transaction already exists" in capsys.readouterr().out
+    assert ledger_csv.add_entry("01-01-2024", "5", "E", "lunch", on_duplicate="allow")
+    assert len(ledger_csv.store().frame()) == 3
+
+
+def test_duplicates_mask_for_a_batch(tmp_path):
+    store = open_store(tmp_path / "ledger.csv")
+    store.append("01-01-2024", 5.0, "Expense", "lunch")
+    batch = pd.DataFrame({"date": pd.to_datetime(["2024-01-01", "2024-01-02"]), "amount": [5.0, 5.0],
+                          "category": ["Expense", "Expense"], "description": ["LUNCH", "lunch"],
+                          "account": ["Main", "Main"]})
+    assert store.dedup.duplicates(batch).tolist() == [True, False]
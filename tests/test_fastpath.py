@@ -0,0 +1,57 @@
+import os
+import subprocess
+import sys
+
+import numpy as np
+
+from conftest import open_store
+from dedup import frame_hashes
+
+
+def test_entry_points_import_without_heavy_modules():
+    script = ("import sys, main, cli\n"
+              "print(sorted(m for m in ('pandas', 'numpy', 'matplotlib', 'tkinter') if m in sys.modules))")
+    out = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True,
+                         cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))).stdout
+    assert out.strip() == "[]"
+
+
+def test_startup_checks_only_the_header(ledger_csv):
+    ledger_csv.initialize_csv()
+    assert ledger_csv._store is None
+    with open(ledger_csv.CSV_FILE) as f:
+        assert f.read().strip() == ",".join(ledger_csv.COLUMNS)
+    ledger_csv.initialize_csv()
+    assert ledger_csv._store is None
+
+
+def test_add_without_loading_keeps_ids_and_sidecar_in_step(ledger_csv, capsys):
+    ledger_csv.initialize_csv()
+    ledger_csv.add_entry("01-01-2024", "5", "E", "lunch")
+    ledger_csv.close()
+    ledger_csv._store = None
+
+    assert ledger_csv.add_entry("02-01-2024", "7", "I", "refund", "Card")
+    assert not ledger_csv.add_entry("01-01-2024", "5", "E", "lunch", on_duplicate="skip")
+    assert ledger_csv._store is None
+    assert "Duplicate transaction skipped." in capsys.readouterr().out
+
+    store = open_store(ledger_csv.CSV_FILE)
+    rows = store.frame()
+    assert rows.index.tolist() == [1, 2]
+    assert rows.loc[2, "account"] == "Card"
+    assert np.array_equal(store.dedup.hashes, frame_hashes(rows))
+    assert store.append("03-01-2024", 1.0, "Expense", "next") == 3
+
+
+def test_falls_back_to_the_store_when_the_sidecar_is_stale(ledger_csv):
+    ledger_csv.initialize_csv()
+    ledger_csv.add_entry("01-01-2024", "5", "E", "lunch")
+    ledger_csv.close()
+    # An edit in another session leaves a log the sidecar does not know about.
+    open_store(ledger_csv.CSV_FILE).update(1, "01-01-2024", 6.0, "Expense", "lunch")
+    ledger_csv._store = None
+
+    assert ledger_csv.add_entry("02-01-2024", "5", "E", "lunch")
+    assert ledger_csv._store is not None
+    assert ledger_csv.store().frame()["amount"].tolist() == [6.0, 5.0]
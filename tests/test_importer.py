@@ -0,0 +1,88 @@
+import pytest
+
+from conftest import open_store
+from importer import import_statement, read_ofx_statement
+
+STATEMENT = """Posted Date,Details,Transaction Amount,Type
+05-01-2024,Salary,2500.00,
+06-01-2024,Coffee,-3.50,
+31-02-2024,Bad date,-1.00,
+07-01-2024,Bad amount,abc,
+08-01-2024,Rent,-900,Expense/Rent
+"""
+
+OFX = """OFXHEADER:100
+<OFX><BANKMSGSRSV1><STMTTRNRS><STMTRS><BANKACCTFROM><ACCTID>12345</BANKACCTFROM>
+<BANKTRANLIST>
+<STMTTRN><TRNTYPE>DEBIT<DTPOSTED>20240110120000<TRNAMT>-12.30<NAME>Grocer<MEMO>Weekly shop</STMTTRN>
+<STMTTRN><TRNTYPE>CREDIT<DTPOSTED>20240111<TRNAMT>100.00<NAME>Refund</STMTTRN>
+<STMTTRN><TRNTYPE>DEBIT<DTPOSTED>2024<TRNAMT>-1<NAME>Broken</STMTTRN>
+</BANKTRANLIST></STMTRS></STMTTRNRS></BANKMSGSRSV1></OFX>
+"""
+
+
+@pytest.fixture
+def statement(tmp_path):
+    path = tmp_path / "statement.csv"
+    path.write_text(STATEMENT)
+    return str(path)
+
+
+def test_csv_statement_maps_headers_and_signs(tmp_path, statement):
+    store = open_store(tmp_path / "ledger.csv")
+    report = import_statement(store, statement, chunksize=2, account="Checking")
+    assert (report.read, report.imported) == (5, 3)
+    rows = store.frame()
+    assert rows["description"].tolist() == ["Salary", "Coffee", "Rent"]
+    assert rows["amount"].tolist() == [2500.0, 3.5, 900.0]
+    assert rows["category"].astype(str).tolist() == ["Income", "Expense", "Expense/Rent"]
+    assert set(rows["account"].astype(str)) == {"Checking"}
+    rejected = report.rejected_rows()
+    assert rejected["line"].tolist() == [4, 5]
+    assert all(rejected["reason"] != "")
+
+
+@pytest.mark.parametrize("on_duplicate, imported", [("skip", 0), ("flag", 3), ("allow", 3)])
+def test_reimport_finds_duplicates(tmp_path, statement, on_duplicate, imported):
+    store = open_store(tmp_path / "ledger.csv")
+    import_statement(store, statement)
+    report = import_statement(open_store(tmp_path / "ledger.csv"), statement, on_duplicate=on_duplicate)
+    assert report.imported == imported
+    assert report.duplicates == (0 if on_duplicate == "allow" else 3)
+    assert len(open_store(tmp_path / "ledger.csv").frame()) == 3 + imported
+
+
+def test_explicit_mapping_must_exist(tmp_path, statement):
+    with pytest.raises(ValueError):
+        import_statement(open_store(tmp_path / "ledger.csv"), statement, mapping={"date": "Booked"})
+
+
+def test_ofx_records_survive_block_boundaries(tmp_path):
+    path = tmp_path / "statement.ofx"
+    path.write_text(OFX)
+    chunks = list(read_ofx_statement(str(path), chunksize=2, block_size=16))
+    assert [len(chunk) for chunk in chunks] == [2, 1]
+    assert chunks[0]["description"].tolist() == ["Weekly shop", "Refund"]
+    assert [chunk["line"].tolist() for chunk in chunks] == [[1, 2], [3]]
+
+    store = open_store(tmp_path / "ledger.csv")
+    report = import_statement(store, str(path))
+    assert (report.read, report.imported, len(report.rejected_rows())) == (3, 2, 1)
+    rows = store.frame()
+    assert rows["date"].dt.strftime("%Y-%m-%d").tolist() == ["2024-01-10", "2024-01-11"]
+    assert rows["amount"].tolist() == [12.3, 100.0]
+
+
+def test_ofx_rows_take_their_statement_account(tmp_path):
+    second = OFX.replace("12345", "67890").replace("Grocer", "Bakery").split("\n", 1)[1]
+    path = tmp_path / "statement.ofx"
+    path.write_text(OFX + second)
+    for block_size in (7, 1 << 20):
+        chunks = list(read_ofx_statement(str(path), block_size=block_size))
+        assert chunks[0]["account"].tolist() == ["12345"] * 3 + ["67890"] * 3
+
+    store = open_store(tmp_path / "ledger.csv")
+    import_statement(store, str(path))
+    assert store.frame()["account"].astype(str).tolist() == ["12345", "12345", "67890", "67890"]
+    import_statement(store, str(path), account="Joint", on_duplicate="allow")
+    assert store.frame()["account"].astype(str).tolist()[4:] == ["Joint"] * 4
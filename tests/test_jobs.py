@@ -0,0 +1,97 @@
+import threading
+
+import pytest
+
+from jobs import JobRunner
+
+
+class FakeRoot:
+    """Stands in for Tk: ``after`` only records the callback, tests poll by hand."""
+
+    def after(self, ms, callback):
+        return "after#1"
+
+    def after_cancel(self, after_id):
+        pass
+
+
+@pytest.fixture
+def runner():
+    statuses = []
+    runner = JobRunner(FakeRoot(), on_status=lambda text, busy: statuses.append((text, busy)))
+    runner.statuses = statuses
+    yield runner
+    runner.shutdown()
+
+
+def _drain(runner):
+    """Deliver finished jobs' callbacks until nothing is running."""
+    while runner.busy:
+        for job in list(runner._active):
+            job.future.exception()
+        runner._poll()
+
+
+def test_callbacks_run_on_poll(runner):
+    results = []
+    runner.submit(lambda job: 6 * 7, on_done=results.append, label="Adding")
+    assert runner.statuses[-1] == ("Adding", True)
+    assert results == []
+    _drain(runner)
+    assert results == [42]
+    assert runner.statuses[-1] == ("Ready", False)
+
+
+def test_errors_go_to_on_error(runner):
+    errors = []
+
+    def fail(job):
+        raise ValueError("bad")
+
+    runner.submit(fail, on_error=errors.append)
+    _drain(runner)
+    assert [str(error) for error in errors] == ["bad"]
+
+
+def test_keyed_jobs_coalesce_to_the_latest(runner):
+    gate = threading.Event()
+    ran = []
+    runner.submit(lambda job: gate.wait(5) and ran.append("first"), key="plot")
+    for name in ("second", "third", "fourth"):
+        runner.submit(lambda job, name=name: ran.append(name), key="plot")
+    gate.set()
+    _drain(runner)
+    assert ran == ["first", "fourth"]
+
+
+def test_uncoalesced_jobs_all_run_in_order(runner):
+    gate = threading.Event()
+    ran = []
+    runner.submit(lambda job: gate.wait(5) and ran.append("A"), key="add", coalesce=False)
+    for name in ("B", "C"):
+        runner.submit(lambda job, name=name: ran.append(name), key="add", coalesce=False)
+    gate.set()
+    _drain(runner)
+    assert ran == ["A", "B", "C"]
+
+
+def test_cancelled_results_are_dropped(runner):
+    gate = threading.Event()
+    results = []
+    runner.submit(lambda job: gate.wait(5), on_done=results.append)
+    runner.cancel_all()
+    gate.set()
+    _drain(runner)
+    assert results == []
+    assert not runner.busy
+
+
+def test_progress_reports_update_the_status(runner):
+    def work(job):
+        job.report("Halfway")
+        return None
+
+    job = runner.submit(work)
+    job.future.result()
+    runner._poll()
+    assert ("Halfway", True) in runner.statuses
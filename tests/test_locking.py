@@ -0,0 +1,52 @@
+import multiprocessing
+
+import pytest
+
+from conftest import open_store
+
+
+def _append_many(path, kind, worker, count):
+    store = open_store(path, kind)
+    for i in range(count):
+        transaction_id = store.append("01-01-2024", float(i), "Expense", f"worker {worker} row {i}")
+        if i % 5 == 0:
+            store.update(transaction_id, "02-01-2024", float(i), "Expense", f"worker {worker} row {i}")
+    store.close()
+
+
+@pytest.mark.parametrize("kind", ["csv", "sqlite"])
+def test_processes_appending_at_once_never_share_an_id(tmp_path, kind):
+    try:
+        context = multiprocessing.get_context("fork")
+    except ValueError:
+        pytest.skip("needs fork")
+    path = tmp_path / "ledger"
+    open_store(path, kind)
+    workers = [context.Process(target=_append_many, args=(path, kind, worker, 20)) for worker in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(60)
+        assert worker.exitcode == 0
+
+    rows = open_store(path, kind).frame()
+    assert sorted(rows.index) == list(range(1, 81))
+    assert rows["description"].nunique() == 80
+    assert (rows["date"].dt.day == 2).sum() == 16
+
+
+def test_a_loaded_store_sees_another_sessions_writes(tmp_path, kind):
+    path = tmp_path / "ledger"
+    mine = open_store(path, kind)
+    mine.frame()
+    mine.append("01-01-2024", 1.0, "Expense", "mine")
+    assert not mine.changed_on_disk()
+
+    other = open_store(path, kind)
+    assert other.append("02-01-2024", 2.0, "Income", "theirs") == 2
+    other.update(1, "01-01-2024", 10.0, "Expense", "mine, edited")
+
+    assert mine.changed_on_disk()
+    assert mine.get(1).amount == 10.0
+    assert mine.append("03-01-2024", 3.0, "Expense", "mine again") == 3
+    assert sorted(open_store(path, kind).frame().index) == [1, 2, 3]
@@ -0,0 +1,40 @@
+import pandas as pd
+
+
+def test_writes_go_through_to_the_file(ledger_csv):
+    ledger_csv.initialize_csv()
+    ledger_csv.add_entry("05-01-2024", "12.5", "E", "lunch")
+    ledger_csv.add_entry("06-01-2024", "100", "I", "pay")
+    on_disk = pd.read_csv(ledger_csv.CSV_FILE)
+    assert on_disk["description"].tolist() == ["lunch", "pay"]
+    assert on_disk.columns.tolist() == ledger_csv.COLUMNS
+
+
+def test_get_transactions_prints_rows_and_summary(ledger_csv, capsys):
+    ledger_csv.initialize_csv()
+    ledger_csv.add_entry("05-01-2024", "12.5", "E", "lunch")
+    ledger_csv.add_entry("06-01-2024", "100", "I", "pay")
+    ledger_csv.add_entry("06-02-2024", "7", "E", "later")
+    capsys.readouterr()
+
+    rows = ledger_csv.get_transactions("01-01-2024", "31-01-2024")
+    out = capsys.readouterr().out
+    assert rows["description"].tolist() == ["lunch", "pay"]
+    assert "Total Income: $100.00" in out
+    assert "Total Expense: $12.50" in out
+    assert "Net Savings: $87.50" in out
+
+    ledger_csv.get_transactions("01-01-2030", "31-01-2030")
+    assert "No transactions found in the given date range." in capsys.readouterr().out
+
+
+def test_file_edited_by_hand_is_reloaded(ledger_csv):
+    ledger_csv.initialize_csv()
+    ledger_csv.add_entry("05-01-2024", "12.5", "E", "lunch")
+    assert len(ledger_csv.get_all_transactions()) == 1
+    with open(ledger_csv.CSV_FILE, "a") as f:
+        f.write("9,07-01-2024,3.0,Expense,typed in,Main\n")
+    rows = ledger_csv.get_all_transactions()
+    assert rows.index.tolist() == [1, 9]
+    ledger_csv.add_entry("08-01-2024", "1", "E", "next")
+    assert ledger_csv.get_all_transactions().index.tolist() == [1, 9, 10]
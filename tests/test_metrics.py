@@ -0,0 +1,42 @@
+import json
+import os
+import subprocess
+import sys
+
+import metrics
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_disabled_metrics_leave_functions_alone():
+    assert not metrics.ENABLED
+
+    def work():
+        return 1
+
+    assert metrics.timed("work")(work) is work
+    assert isinstance(metrics.span("work"), type(metrics.span("other")))
+    metrics.count("rows_read", 5)
+    assert metrics.snapshot()["counters"] == {}
+
+
+def test_enabled_metrics_are_written_on_exit(tmp_path):
+    script = "\n".join([
+        "from main import CSV",
+        "CSV.initialize_csv()",
+        "for day in range(1, 4):",
+        "    CSV.add_entry(f'0{day}-01-2024', day, 'E', 'row')",
+        "CSV.store().frame()",
+        "CSV.edit_entry(1, '01-01-2024', 9, 'E', 'edited')",
+        "CSV.close()",
+    ])
+    out = tmp_path / "metrics.json"
+    env = dict(os.environ, FINANCE_METRICS=str(out), PYTHONPATH=ROOT)
+    subprocess.run([sys.executable, "-c", script], cwd=tmp_path, env=env, check=True, capture_output=True)
+
+    report = json.loads(out.read_text())
+    assert report["spans"]["backend.read"]["calls"] >= 1
+    assert report["spans"]["backend.write"]["calls"] == 1
+    assert all(stats["max_ms"] <= stats["total_ms"] for stats in report["spans"].values())
+    assert report["counters"]["rows_written"] >= 3
+    assert report["counters"]["log_records_written"] >= 1
@@ -0,0 +1,55 @@
+import os
+
+import pytest
+
+from conftest import open_store
+from parallel import PartitionQuery
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = open_store(tmp_path / "ledger", "partitioned")
+    for i in range(60):
+        store.append(f"{i % 28 + 1:02d}-{i % 4 + 1:02d}-2024", float(i + 1),
+                     ["Income", "Expense/Food", "Expense/Rent"][i % 3], f"row {i}")
+    store.compact()
+    store.update(2, "10-06-2024", 500.0, "Income", "moved to June")
+    store.delete(5)
+    return store
+
+
+@pytest.fixture
+def query(store):
+    query = PartitionQuery(store, max_workers=2)
+    yield query
+    query.close()
+
+
+def test_one_file_per_month(store, tmp_path):
+    assert store.backend.partitions() == ["2024-01", "2024-02", "2024-03", "2024-04"]
+    start, end = store.to_datetime("15-02-2024"), store.to_datetime("10-03-2024")
+    assert store.backend.partitions(start, end) == ["2024-02", "2024-03"]
+    store.compact()
+    assert store.backend.partitions()[-1] == "2024-06"
+    assert sorted(name for name in os.listdir(tmp_path / "ledger") if name.endswith(".csv")) == [
+        f"2024-0{month}.{store.backend.manifest()['generation']}.csv" for month in (1, 2, 3, 4, 6)]
+
+
+@pytest.mark.parametrize("start, end", [("01-01-2024", "30-06-2024"), ("15-02-2024", "15-02-2024"),
+                                        ("01-05-2024", "31-05-2024")])
+def test_parallel_totals_match_the_store(store, query, start, end):
+    expected = {category: total for category, total in store.summary(start, end).items() if total}
+    assert query.summary(start, end) == pytest.approx(expected)
+    categories = ["Income", "Expense", "Expense/Food"]
+    assert query.daily_totals(categories, start, end).to_numpy() == pytest.approx(
+        store.daily_totals(categories, start, end).to_numpy())
+
+
+def test_parallel_totals_see_pending_log_changes(store, query):
+    assert store.pending_log_records() == 2
+    assert query.summary("01-06-2024", "30-06-2024") == {"Income": 500.0}
+
+
+def test_needs_the_partitioned_backend(tmp_path):
+    with pytest.raises(ValueError):
+        PartitionQuery(open_store(tmp_path / "ledger.csv"))
@@ -0,0 +1,33 @@
+import numpy as np
+import pandas as pd
+
+from plotting import daily_lines, min_max
+
+
+def test_short_series_are_unchanged():
+    x, y = np.arange(10), np.arange(10.0)
+    assert min_max(x, y, 5)[1].tolist() == y.tolist()
+    assert min_max(x, y, 0)[1].tolist() == y.tolist()
+
+
+def test_min_max_keeps_spikes_order_and_ends():
+    rng = np.random.default_rng(0)
+    y = rng.normal(size=10_001)
+    y[1234], y[7777] = 50.0, -50.0
+    x = np.arange(len(y))
+    xs, ys = min_max(x, y, 100)
+    assert len(ys) <= 2 * 100 + 2
+    assert (np.diff(xs) > 0).all()
+    assert np.array_equal(ys, y[xs])
+    assert xs[0] == 0 and xs[-1] == len(y) - 1
+    assert {1234, 7777} <= set(xs.tolist())
+
+
+def test_daily_lines_decimates_every_column():
+    index = pd.date_range("2020-01-01", periods=3000, freq="D")
+    daily = pd.DataFrame({"Income": np.arange(3000.0), "Expense": np.zeros(3000)}, index=index)
+    lines = daily_lines(daily, 200)
+    assert set(lines) == {"Income", "Expense"}
+    x, y = lines["Income"]
+    assert len(x) <= 402
+    assert (y[0], y[-1]) == (0.0, 2999.0)
@@ -0,0 +1,111 @@
+import random
+
+import pandas as pd
+import pytest
+
+from conftest import open_store
+
+CATEGORIES = ["Income", "Expense", "Expense/Food", "Expense/Food/Lunch", "Expense/Rent"]
+
+
+def _day(rng, days):
+    return (pd.Timestamp("2024-01-01") + pd.Timedelta(days=rng.randrange(days))).strftime("%d-%m-%Y")
+
+
+@pytest.fixture(params=["live", "reopened"])
+def store(request, tmp_path, kind):
+    """
+    A ledger with rows appended out of date order, then edited and thinned
+    out; either the store that made the changes (indexes kept current
+    incrementally) or a fresh one over the files (SQLite answers from SQL).
+    """
+    rng = random.Random(7)
+    store = open_store(tmp_path / "ledger", kind)
+    store.append_rows(pd.DataFrame({
+        "date": [_day(rng, 120) for _ in range(200)],
+        "amount": [round(rng.uniform(1, 100), 2) for _ in range(200)],
+        "category": [rng.choice(CATEGORIES) for _ in range(200)],
+        "description": "row",
+        "account": "Main",
+    }))
+    for _ in range(5):
+        store.append(_day(rng, 120), 10.0, rng.choice(CATEGORIES), "single")
+    for transaction_id in rng.sample(range(1, 206), 10):
+        store.update(transaction_id, _day(rng, 150), 5.0, rng.choice(CATEGORIES), "moved")
+    for transaction_id in rng.sample(range(1, 206), 10):
+        store.delete(transaction_id)
+    return store if request.param == "live" else open_store(tmp_path / "ledger", kind)
+
+
+def _between(store, start, end):
+    df = store.frame()
+    return df[(df["date"] >= pd.Timestamp(start)) & (df["date"] <= pd.Timestamp(end))]
+
+
+RANGES = [
+    ("15-01-2024", "20-02-2024"),
+    ("01-01-2024", "01-01-2024"),
+    ("01-01-2023", "31-12-2025"),
+    ("01-06-2025", "30-06-2025"),
+    ("20-02-2024", "15-01-2024"),
+]
+
+
+@pytest.mark.parametrize("start, end", RANGES)
+def test_range_matches_a_scan(store, start, end):
+    rows = store.range(start, end)
+    expected = _between(store, store.to_datetime(start), store.to_datetime(end))
+    assert rows["date"].is_monotonic_increasing
+    assert sorted(rows.index) == sorted(expected.index)
+
+
+def test_range_is_inclusive_and_follows_edits(store):
+    day = store.range("01-01-2024", "31-12-2025")["date"].max()
+    label = day.strftime("%d-%m-%Y")
+    assert len(store.range(label, label)) >= 1
+    transaction_id = store.append("31-12-2030", 1.0, "Income", "late")
+    assert store.range("31-12-2030", "31-12-2030").index.tolist() == [transaction_id]
+    store.update(transaction_id, "01-01-2031", 1.0, "Income", "later")
+    assert store.range("31-12-2030", "31-12-2030").empty
+    store.delete(transaction_id)
+    assert store.range("01-01-2031", "01-01-2031").empty
+
+
+def _nonzero(totals):
+    return {category: round(total, 6) for category, total in totals.items() if round(total, 6)}
+
+
+@pytest.mark.parametrize("start, end", RANGES)
+def test_summary_matches_a_scan(store, start, end):
+    summary = store.summary(start, end)
+    rows = _between(store, store.to_datetime(start), store.to_datetime(end))
+    expected = rows.groupby(rows["category"].astype(str))["amount"].sum()
+    assert _nonzero(summary) == _nonzero(expected)
+
+
+def test_daily_and_monthly_totals_roll_up_subcategories(store):
+    start, end = "10-01-2024", "25-03-2024"
+    rows = _between(store, store.to_datetime(start), store.to_datetime(end))
+    expense = rows[rows["category"].astype(str).str.startswith("Expense")]
+    food = rows[rows["category"].astype(str).str.startswith("Expense/Food")]
+
+    daily = store.daily_totals(["Expense", "Expense/Food"], start, end)
+    assert daily.index.tolist() == pd.date_range("2024-01-10", "2024-03-25").tolist()
+    for column, subset in (("Expense", expense), ("Expense/Food", food)):
+        expected = subset.groupby("date")["amount"].sum().reindex(daily.index, fill_value=0.0)
+        assert daily[column].to_numpy() == pytest.approx(expected.to_numpy())
+
+    monthly = store.monthly_totals(["Expense"], start, end)
+    expected = expense.groupby(expense["date"].dt.to_period("M"))["amount"].sum()
+    assert monthly["Expense"].tolist() == pytest.approx(expected.tolist())
+
+
+def test_totals_follow_edits(store):
+    before = store.summary("01-01-2030", "31-12-2030").get("Income", 0.0)
+    transaction_id = store.append("15-06-2030", 40.0, "Income", "bonus")
+    assert store.summary("01-01-2030", "31-12-2030")["Income"] == pytest.approx(before + 40.0)
+    store.update(transaction_id, "15-06-2030", 25.0, "Expense/Food", "bonus")
+    daily = store.daily_totals(["Expense"], "15-06-2030", "15-06-2030")
+    assert daily["Expense"].tolist() == [25.0]
+    store.delete(transaction_id)
+    assert _nonzero(store.summary("01-01-2030", "31-12-2030")) == {}
@@ -0,0 +1,51 @@
+import numpy as np
+
+from conftest import open_store
+from query_cache import QueryCache
+
+
+def test_hits_within_a_version_and_cleared_on_a_new_one():
+    cache = QueryCache(1 << 20)
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return np.zeros(10)
+
+    cache.get(1, "a", compute)
+    cache.get(1, "a", compute)
+    assert (cache.hits, cache.misses, len(calls)) == (1, 1, 1)
+    cache.get(2, "a", compute)
+    assert len(calls) == 2
+    assert len(cache) == 1
+
+
+def test_least_recently_used_results_are_evicted_by_size():
+    cache = QueryCache(250)
+    for key in "abc":
+        cache.get(1, key, lambda: np.zeros(10))  # 80 bytes each
+    cache.get(1, "a", lambda: None)
+    cache.get(1, "d", lambda: np.zeros(10))
+    assert cache.nbytes <= 250
+    assert "b" not in cache._entries and "a" in cache._entries
+    big = cache.get(1, "big", lambda: np.zeros(100))
+    assert len(big) == 100 and "big" not in cache._entries
+
+
+def test_facade_results_follow_changes_here_and_elsewhere(ledger_csv):
+    ledger_csv.initialize_csv()
+    ledger_csv.add_entry("05-01-2024", "100", "I", "pay")
+    assert ledger_csv.summary("01-01-2024", "31-01-2024") == (100.0, 0.0)
+    assert ledger_csv.summary("01-01-2024", "31-01-2024") == (100.0, 0.0)
+    assert ledger_csv._cache.hits == 1
+
+    ledger_csv.add_entry("06-01-2024", "30", "E/Food", "lunch")
+    assert ledger_csv.summary("01-01-2024", "31-01-2024") == (100.0, 30.0)
+    assert len(ledger_csv.transactions("01-01-2024", "31-01-2024")) == 2
+
+    # Another session edits the ledger file.
+    open_store(ledger_csv.CSV_FILE).update(2, "06-01-2024", 45.0, "Expense/Food", "lunch")
+    assert ledger_csv.summary("01-01-2024", "31-01-2024") == (100.0, 45.0)
+    rows = ledger_csv.transactions("01-01-2024", "31-01-2024")
+    rows["amount"] = 0.0
+    assert ledger_csv.transactions("01-01-2024", "31-01-2024")["amount"].tolist() == [100.0, 45.0]
@@ -0,0 +1,44 @@
+from datetime import datetime
+
+import numpy as np
+
+from conftest import open_store
+from records import Transaction, TransactionBatch, day_number, from_day
+
+
+def test_day_numbers_round_trip():
+    for value in (datetime(1970, 1, 1), datetime(2024, 2, 29), np.datetime64("1969-12-31")):
+        day = day_number(value)
+        assert from_day(day) == datetime.fromisoformat(str(np.datetime64(value, "D")))
+    assert day_number(datetime(1970, 1, 2)) == 1
+
+
+def test_batch_matches_the_frame(tmp_path):
+    store = open_store(tmp_path / "ledger.csv")
+    store.append("05-01-2024", 12.5, "Expense/Food", "lunch", "Card")
+    store.append("06-01-2024", 100.0, "Income", "pay")
+    store.append("05-01-2024", 3.0, "Expense/Food", "coffee", "Card")
+    store.delete(2)
+
+    batch = store.batch(store.live_slots())
+    assert len(batch) == 2
+    assert batch.ids.tolist() == [1, 3]
+    assert batch.codes.dtype == np.uint8
+    assert [t.description for t in batch] == ["lunch", "coffee"]
+    assert batch[1].category == "Expense/Food" and batch[1].account == "Card"
+    assert batch.display_rows("%d-%m-%Y") == [
+        (1, "05-01-2024", 12.5, "Expense/Food", "lunch", "Card"),
+        (3, "05-01-2024", 3.0, "Expense/Food", "coffee", "Card"),
+    ]
+
+    plain = TransactionBatch.from_frame(store.frame().astype({"category": str, "account": str}))
+    assert [repr(t) for t in plain] == [repr(t) for t in batch]
+
+
+def test_get_returns_a_transaction(tmp_path):
+    store = open_store(tmp_path / "ledger.csv")
+    store.append("05-01-2024", 12.5, "Expense", "lunch")
+    row = store.get(1)
+    assert isinstance(row, Transaction)
+    assert (row.id, row.date, row.amount) == (1, datetime(2024, 1, 5), 12.5)
+    assert not hasattr(row, "__dict__")
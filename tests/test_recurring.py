@@ -0,0 +1,77 @@
+import shutil
+
+import numpy as np
+import pytest
+
+from conftest import open_store
+from recurring import RecurringRules, Rule
+
+
+def _days(rule, first, last):
+    return [str(day) for day in rule.days(np.datetime64(first), np.datetime64(last))]
+
+
+def test_month_ends_are_clamped():
+    rule = Rule(1, "2024-01-31", "monthly", 10.0, "Expense/Rent")
+    assert _days(rule, "2024-01-01", "2024-05-31") == [
+        "2024-01-31", "2024-02-29", "2024-03-31", "2024-04-30", "2024-05-31"]
+    leap = Rule(2, "2024-02-29", "yearly", 10.0, "Expense")
+    assert _days(leap, "2024-01-01", "2028-12-31") == ["2024-02-29", "2025-02-28", "2026-02-28", "2027-02-28",
+                                                       "2028-02-29"]
+
+
+def test_intervals_bounds_and_end_date():
+    rule = Rule(1, "2024-01-01", "weekly", 5.0, "Expense", interval=2, until="2024-02-12")
+    assert _days(rule, "2024-01-10", "2024-12-31") == ["2024-01-15", "2024-01-29", "2024-02-12"]
+    assert _days(rule, "2023-01-01", "2023-12-31") == []
+    quarterly = Rule(2, "2024-01-15", "monthly", 5.0, "Expense", interval=3)
+    assert _days(quarterly, "2024-03-01", "2024-12-31") == ["2024-04-15", "2024-07-15", "2024-10-15"]
+    with pytest.raises(ValueError):
+        Rule(3, "2024-01-01", "hourly", 1.0, "Expense")
+
+
+def test_write_out_is_idempotent_even_after_an_interruption(tmp_path):
+    store = open_store(tmp_path / "ledger.csv")
+    rules = RecurringRules(str(tmp_path / "ledger.csv.rules.json"))
+    rules.add("2024-01-01", "monthly", 1000.0, "Expense/Rent", "rent")
+    rules.add("2024-01-05", "weekly", 20.0, "Expense/Food", "box", until="2024-01-19")
+    assert len(rules.occurrences("2024-01-01", "2024-03-31")) == 6
+    shutil.copy(rules.path, tmp_path / "before.json")
+
+    assert rules.write_out(store, "2024-03-31") == 6
+    assert rules.occurrences("2024-01-01", "2024-03-31").empty
+    assert rules.write_out(store, "2024-03-31") == 0
+
+    # The rows were appended but the rules file still says nothing was written.
+    shutil.copy(tmp_path / "before.json", rules.path)
+    assert rules.write_out(open_store(tmp_path / "ledger.csv"), "2024-03-31") == 0
+    assert len(open_store(tmp_path / "ledger.csv").frame()) == 6
+    assert rules.write_out(store, "2024-04-30") == 1
+
+
+def test_projected_rows_count_until_written(ledger_csv):
+    ledger_csv.initialize_csv()
+    ledger_csv.add_entry("02-01-2024", "3000", "I", "pay")
+    assert ledger_csv.add_recurring("01-01-2024", "monthly", "1000", "E/Rent", "rent", end_date="31-12-2024")
+    assert ledger_csv.add_recurring("01-01-2024", "monthly", "5", "E", "x", end_date="31-12-2023") is None
+
+    rows = ledger_csv.transactions("01-01-2024", "29-02-2024")
+    assert rows.index.tolist() == ["r1", 1, "r1"]
+    assert ledger_csv.summary("01-01-2024", "29-02-2024") == (3000.0, 2000.0)
+    assert ledger_csv.write_recurring("31-01-2024") == 1
+    assert ledger_csv.summary("01-01-2024", "29-02-2024") == (3000.0, 2000.0)
+    assert ledger_csv.transactions("01-01-2024", "29-02-2024").index.tolist() == [2, 1, "r1"]
+    assert ledger_csv.delete_recurring(1)
+    assert ledger_csv.summary("01-01-2024", "29-02-2024") == (3000.0, 1000.0)
+
+
+def test_search_and_has_transactions_include_occurrences(ledger_csv):
+    ledger_csv.initialize_csv()
+    ledger_csv.add_entry("05-01-2024", "10", "E", "coffee shop")
+    ledger_csv.add_recurring("01-01-2024", "monthly", "900", "E/Rent", "rent flat")
+    assert ledger_csv.search("", "01-01-2024", "29-02-2024").index.tolist() == ["r1", 1, "r1"]
+    assert ledger_csv.search("rnet", "01-01-2024", "29-02-2024").index.tolist() == ["r1", "r1"]
+    assert ledger_csv.search("coffee", "01-01-2024", "29-02-2024").index.tolist() == [1]
+    assert ledger_csv.search("rent").empty
+    assert ledger_csv.has_transactions("01-03-2024", "02-03-2024")
+    assert not ledger_csv.has_transactions("02-03-2024", "03-03-2024")
@@ -0,0 +1,94 @@
+import contextlib
+
+import pytest
+
+from backends import SQLiteBackend
+from conftest import open_store
+from main import CSV
+
+
+@pytest.fixture
+def sqlite_csv(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(CSV, "BACKEND", "sqlite")
+    monkeypatch.setattr(CSV, "SQLITE_FILE", str(tmp_path / "ledger.db"))
+    monkeypatch.setattr(CSV, "_store", None)
+    monkeypatch.setattr(CSV, "_cache", None)
+    monkeypatch.setattr(CSV, "_rules", None)
+    store = open_store(tmp_path / "ledger.db", "sqlite")
+    store.append("01-01-2024", 100.0, "Income", "pay")
+    store.append("02-01-2024", 10.0, "Expense/Food", "lunch", "Card")
+    store.close()
+    yield CSV
+    CSV.close()
+
+
+@contextlib.contextmanager
+def no_full_read(monkeypatch):
+    def read(self):
+        raise AssertionError("the whole database was read")
+    with monkeypatch.context() as patch:
+        patch.setattr(SQLiteBackend, "read", read)
+        yield
+
+
+def test_startup_queries_edits_and_deletes_do_not_read_the_database(sqlite_csv, monkeypatch, capsys):
+    with no_full_read(monkeypatch):
+        CSV.initialize_csv()
+        assert len(CSV.store()) == 2
+        assert CSV.summary("01-01-2024", "31-01-2024") == (100.0, 10.0)
+        CSV.edit_entry(2, "03-01-2024", 12.0, "Expense/Food", "dinner")
+        edited = CSV.store().get(2)
+        assert (edited.amount, edited.description, edited.account) == (12.0, "dinner", "Card")
+        CSV.delete_entry(1)
+        assert list(CSV.transactions("01-01-2024", "31-01-2024").index) == [2]
+        CSV.edit_entry(7, "03-01-2024", 1.0, "Expense", "x")
+    assert "Invalid transaction ID." in capsys.readouterr().out
+
+
+def test_deleting_the_highest_id_without_loading_keeps_it_taken(sqlite_csv, monkeypatch):
+    with no_full_read(monkeypatch):
+        CSV.initialize_csv()
+        CSV.delete_entry(2)
+    CSV.use_ledger(CSV.SQLITE_FILE, "sqlite")
+    assert CSV.store().append("04-01-2024", 1.0, "Expense", "new") == 3
+
+
+def test_round_trip_and_dictionary_tables(tmp_path):
+    path = tmp_path / "ledger.db"
+    store = open_store(path, "sqlite")
+    store.append("01-01-2024", 1.0, "Expense/Food/Groceries", "a", "Card")
+    store.append("02-01-2024", 2.0, "Income", "b")
+    store.update(1, "01-01-2024", 1.5, "Expense/Food", "a", "Savings")
+    store.close()
+
+    reopened = open_store(path, "sqlite")
+    rows = reopened.frame()
+    assert rows.loc[1, ["amount", "category", "account"]].tolist() == [1.5, "Expense/Food", "Savings"]
+    reopened.write(rows)
+    db = reopened.backend.connection()
+    # A rewrite prunes names no row uses any more.
+    assert {name for (name,) in db.execute("SELECT name FROM accounts")} == {"Main", "Savings"}
+    assert {name for (name,) in db.execute("SELECT name FROM categories")} == {"Expense/Food", "Income"}
+
+
+def test_adds_imports_and_write_outs_do_not_read_the_database(sqlite_csv, monkeypatch, tmp_path, capsys):
+    statement = tmp_path / "statement.csv"
+    statement.write_text("date,amount,category,description\n"
+                         "02-01-2024,10.0,Expense/Food,lunch\n05-01-2024,3.0,Expense,bus\n")
+    with no_full_read(monkeypatch):
+        CSV.initialize_csv()
+        assert CSV.add_entry("03-01-2024", 5.0, "Expense", "coffee")
+        assert not CSV.add_entry("03-01-2024", 5.0, "Expense", " Coffee ", on_duplicate="skip")
+        assert CSV.is_duplicate("02-01-2024", 10.0, "Expense/Food", "LUNCH", "Card")
+        report = CSV.import_statement(str(statement), on_duplicate="skip", account="Card")
+        assert (report.imported, report.duplicates) == (1, 1)
+        CSV.add_recurring("01-01-2024", "monthly", 500.0, "Expense/Rent", "rent")
+        assert CSV.write_recurring("01-02-2024") == 2
+        assert CSV.write_recurring("01-02-2024") == 0
+        assert CSV.has_transactions("05-01-2024", "05-01-2024")
+        assert CSV.store()._df is None
+    assert "Duplicate transaction skipped." in capsys.readouterr().out
+    rows = CSV.store().frame()
+    assert rows.index.tolist() == [1, 2, 3, 4, 5, 6]
+    assert rows["description"].tolist() == ["pay", "lunch", "coffee", "bus", "rent", "rent"]
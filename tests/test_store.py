@@ -0,0 +1,140 @@
+import pytest
+
+from conftest import open_store
+
+
+@pytest.mark.parametrize("use_log", [True, False])
+@pytest.mark.parametrize("close", [True, False])
+def test_deleted_highest_id_is_not_reused(tmp_path, kind, use_log, close):
+    path = tmp_path / "ledger"
+    store = open_store(path, kind, use_log)
+    store.append("01-01-2024", 1.0, "Expense", "a")
+    store.append("02-01-2024", 2.0, "Expense", "b")
+    store.delete(2)
+    if close:
+        store.close()
+
+    reopened = open_store(path, kind, use_log)
+    assert reopened.append("03-01-2024", 3.0, "Income", "c") == 3
+    assert sorted(reopened.frame().index) == [1, 3]
+    reopened.close()
+    assert sorted(open_store(path, kind, use_log).frame().index) == [1, 3]
+
+
+def _rows(store):
+    """The store's rows with plain string columns (unused category levels differ between sessions)."""
+    return store.frame().astype({"category": str, "account": str})
+
+
+def _ledger(tmp_path, **kwargs):
+    store = open_store(tmp_path / "ledger.csv", **kwargs)
+    store.append("01-01-2024", 1.0, "Expense", "a")
+    store.append("02-01-2024", 2.0, "Expense", "b")
+    store.append("03-01-2024", 3.0, "Income", "c")
+    return store
+
+
+def test_log_replays_edits_without_touching_the_base_file(tmp_path):
+    store = _ledger(tmp_path)
+    base = (tmp_path / "ledger.csv").read_bytes()
+    store.update(2, "04-01-2024", 20.0, "Income", "b2", "Card")
+    store.delete(1)
+    assert (tmp_path / "ledger.csv").read_bytes() == base
+    assert store.pending_log_records() == 2
+
+    reopened = open_store(tmp_path / "ledger.csv")
+    assert _rows(reopened).equals(_rows(store))
+    row = reopened.get(2)
+    assert (row.amount, row.category, row.description, row.account) == (20.0, "Income", "b2", "Card")
+
+    reopened.compact()
+    assert not (tmp_path / "ledger.csv.log").exists()
+    assert _rows(open_store(tmp_path / "ledger.csv")).equals(_rows(store))
+
+
+def test_log_compacts_at_threshold(tmp_path):
+    store = _ledger(tmp_path, compact_threshold=3)
+    for amount in (4.0, 5.0, 6.0):
+        store.update(3, "03-01-2024", amount, "Income", "c")
+    assert not (tmp_path / "ledger.csv.log").exists()
+    assert open_store(tmp_path / "ledger.csv").get(3).amount == 6.0
+
+
+def test_positional_log_from_before_ids_is_migrated(tmp_path):
+    path = tmp_path / "ledger.csv"
+    path.write_text("date,amount,category,description\n"
+                    "01-01-2024,1.0,Expense,a\n02-01-2024,2.0,Expense,b\n03-01-2024,3.0,Income,c\n")
+    # Version 1 records address rows by their position at the time: after
+    # deleting row 0, "b" sits at position 0.
+    (tmp_path / "ledger.csv.log").write_text("# finance-tracker log v1\nD,0\nU,0,05-01-2024,7.0,Income,b2\n")
+
+    store = open_store(path)
+    assert store.frame()["description"].tolist() == ["b2", "c"]
+    assert store.frame().index.tolist() == [1, 2]
+    assert not (tmp_path / "ledger.csv.log").exists()
+    assert path.read_text().splitlines()[0] == "id,date,amount,category,description,account"
+
+
+@pytest.mark.parametrize("renamed", [True, False])
+def test_interrupted_compaction_is_recovered(tmp_path, monkeypatch, renamed):
+    store = _ledger(tmp_path)
+    store.update(2, "02-01-2024", 20.0, "Expense", "b2")
+    store.delete(3)
+    commit_write = store.backend.commit_write
+
+    def crash(tmp_file):
+        if renamed:
+            commit_write(tmp_file)
+        raise OSError("crash")
+
+    monkeypatch.setattr(store.backend, "commit_write", crash)
+    with pytest.raises(OSError):
+        store.compact()
+    assert (tmp_path / "ledger.csv.log").exists()
+
+    reopened = open_store(tmp_path / "ledger.csv")
+    assert reopened.frame()["description"].tolist() == ["a", "b2"]
+    # Once the compacted file is in place, the leftover log is dropped instead of replayed.
+    assert (tmp_path / "ledger.csv.log").exists() != renamed
+    assert reopened.append("05-01-2024", 5.0, "Expense", "d") == 4
+
+
+def test_ids_stay_put_when_other_rows_go(tmp_path, kind):
+    store = open_store(tmp_path / "ledger", kind)
+    ids = [store.append(f"0{day}-01-2024", float(day), "Expense", f"row {day}") for day in range(1, 6)]
+    assert ids == [1, 2, 3, 4, 5]
+    store.delete(2)
+    store.delete(4)
+    store.update(5, "09-01-2024", 50.0, "Income", "row 5")
+    assert 2 not in store and 3 in store
+    assert store.get(3).description == "row 3"
+    assert store.get(5).amount == 50.0
+    with pytest.raises(KeyError):
+        store.get(4)
+    store.compact()
+    assert open_store(tmp_path / "ledger", kind).get(5).description == "row 5"
+
+
+def test_legacy_rows_get_ids_once(tmp_path):
+    path = tmp_path / "ledger.csv"
+    path.write_text("id,date,amount,category,description\n"
+                    "7,01-01-2024,1.0,Expense,a\n,02-01-2024,2.0,Expense,b\n7,03-01-2024,3.0,Income,c\n")
+    store = open_store(path)
+    # Missing and repeated ids are numbered after the highest one in the file.
+    assert store.frame().index.tolist() == [7, 8, 9]
+    assert path.read_text().splitlines()[1:3] == ["7,01-01-2024,1.0,Expense,a,Main", "8,02-01-2024,2.0,Expense,b,Main"]
+    assert open_store(path).frame().index.tolist() == [7, 8, 9]
+
+
+def test_facade_edits_by_id(ledger_csv, capsys):
+    ledger_csv.initialize_csv()
+    for day in (1, 2, 3):
+        ledger_csv.add_entry(f"0{day}-01-2024", day, "E", f"row {day}")
+    assert ledger_csv.delete_entry(1)
+    assert ledger_csv.edit_entry(3, "04-01-2024", "30", "I", "edited", "Card")
+    assert not ledger_csv.edit_entry(1, "04-01-2024", "30", "I", "gone")
+    assert not ledger_csv.delete_entry(1)
+    assert capsys.readouterr().out.count("Invalid transaction ID.") == 2
+    rows = ledger_csv.store().frame()
+    assert rows.index.tolist() == [2, 3]
+    assert rows.loc[3, ["amount", "category", "description", "account"]].tolist() == [30.0, "Income", "edited", "Card"]
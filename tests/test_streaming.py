@@ -0,0 +1,60 @@
+import pandas as pd
+import pytest
+
+import streaming
+from conftest import open_store
+
+CATEGORIES = ["Income", "Expense/Food", "Expense/Rent"]
+
+
+@pytest.fixture
+def ledger(tmp_path, kind):
+    """Path of a ledger with pending edits and deletes (in the append log, where the backend has one)."""
+    store = open_store(tmp_path / "ledger", kind)
+    for i in range(40):
+        store.append(f"{i % 28 + 1:02d}-0{i % 3 + 1}-2024", float(i + 1), CATEGORIES[i % 3], f"row {i}",
+                     "Card" if i % 4 else "Main")
+    for transaction_id in (3, 10, 25):
+        store.update(transaction_id, "15-02-2024", 100.0, "Expense/Food", "edited")
+    for transaction_id in (1, 11, 40):
+        store.delete(transaction_id)
+    return tmp_path / "ledger"
+
+
+def test_chunks_apply_pending_changes_without_loading(ledger, kind):
+    store = open_store(ledger, kind)
+    chunks = list(streaming.iter_ledger(store, chunksize=7))
+    assert store._df is None
+    assert max(len(chunk) for chunk in chunks) <= 7
+    streamed = pd.concat(chunks).sort_index()
+    expected = open_store(ledger, kind).frame().sort_index()
+    assert streamed.index.tolist() == expected.index.tolist()
+    assert streamed["amount"].tolist() == expected["amount"].tolist()
+    assert streamed.loc[10, "description"] == "edited"
+
+
+def test_range_and_totals_match_the_loaded_store(ledger, kind):
+    start, end = "10-01-2024", "20-02-2024"
+    streamed = open_store(ledger, kind)
+    loaded = open_store(ledger, kind)
+
+    chunks = list(streaming.iter_range(streamed, start, end, chunksize=5))
+    assert all(chunk["date"].is_monotonic_increasing for chunk in chunks)
+    assert sorted(pd.concat(chunks).index) == sorted(loaded.range(start, end).index)
+
+    summary = streaming.summary(streamed, start, end, chunksize=5)
+    assert summary == pytest.approx({k: v for k, v in loaded.summary(start, end).items() if v})
+
+    daily = streaming.daily_totals(streamed, ["Income", "Expense"], start, end, chunksize=5)
+    assert daily.to_numpy() == pytest.approx(loaded.daily_totals(["Income", "Expense"], start, end).to_numpy())
+
+    by = streaming.totals_by(streamed, ["account", "category"], start, end, chunksize=5)
+    assert by.to_dict() == pytest.approx(loaded.totals_by(["account", "category"], start, end).to_dict())
+    assert streamed._df is None
+
+
+def test_empty_range(ledger, kind):
+    store = open_store(ledger, kind)
+    assert list(streaming.iter_range(store, "01-01-2030", "31-01-2030")) == []
+    assert streaming.summary(store, "01-01-2030", "31-01-2030") == {}
+    assert streaming.totals_by(store, ["category"], "01-01-2030", "31-01-2030").empty
@@ -0,0 +1,46 @@
+import numpy as np
+
+from conftest import open_store
+
+
+def _store(tmp_path):
+    store = open_store(tmp_path / "ledger", use_log=False)
+    store.append("01-01-2024", 1.0, "Expense", "Coffee shop")
+    store.append("02-01-2024", 2.0, "Expense", "grocery store")
+    store.append("03-01-2024", 3.0, "Income", "salary")
+    return store
+
+
+def test_empty_query_returns_every_row_without_building(tmp_path):
+    store = _store(tmp_path)
+    for query in ("", "   ", "--"):
+        assert np.array_equal(store.search_slots(query), store.live_slots())
+    assert not store.text_index.built
+
+
+def test_prefix_and_typo_matches(tmp_path):
+    store = _store(tmp_path)
+    descriptions = lambda query: store.frame()["description"].iloc[store.search_slots(query)].tolist()
+    assert descriptions("cof") == ["Coffee shop"]
+    assert descriptions("grocey") == ["grocery store"]
+    assert descriptions("GROCERY st") == ["grocery store"]
+    assert descriptions("store coffee") == []
+    assert descriptions("nothing") == []
+
+
+def test_search_follows_edits_and_ranges(tmp_path):
+    store = _store(tmp_path)
+
+    def descriptions(query, *span, fuzzy=True):
+        return store.slots_frame()["description"].iloc[store.search_slots(query, *span, fuzzy=fuzzy)].tolist()
+
+    assert descriptions("shop") == ["Coffee shop"]
+    store.update(1, "01-01-2024", 1.0, "Expense", "tea house")
+    store.append("04-01-2024", 4.0, "Expense", "bike shop")
+    assert descriptions("shop") == ["bike shop"]
+    assert descriptions("tea") == ["tea house"]
+    assert descriptions("s", "02-01-2024", "03-01-2024") == ["grocery store", "salary"]
+    store.delete(3)
+    assert descriptions("salary") == []
+    assert descriptions("bkie shop") == ["bike shop"]
+    assert descriptions("bkie shop", fuzzy=False) == []
@@ -0,0 +1,60 @@
+import pandas as pd
+import pytest
+
+from validation import (INVALID_AMOUNT, INVALID_DATE, NEGATIVE_AMOUNT, UNKNOWN_CATEGORY, ZERO_AMOUNT,
+                        parse_entry, validate_frame)
+
+DATE_FORMAT = "%d-%m-%Y"
+
+# (date, amount, category) -> reason validate_frame gives, "" if the row is fine
+CASES = [
+    (("05-01-2024", "12.50", "E"), ""),
+    (("05-01-2024", " 3 ", "income"), ""),
+    (("05-01-2024", "1", "Debit/Food/ Groceries "), ""),
+    (("31-02-2024", "1", "E"), INVALID_DATE),
+    (("2024-01-05", "1", "E"), INVALID_DATE),
+    (("05-01-2024", "abc", "E"), INVALID_AMOUNT),
+    (("05-01-2024", "", "E"), INVALID_AMOUNT),
+    (("05-01-2024", "0", "E"), ZERO_AMOUNT),
+    (("05-01-2024", "-4", "E"), NEGATIVE_AMOUNT),
+    (("05-01-2024", "4", "Savings"), UNKNOWN_CATEGORY),
+    (("05-01-2024", "4", "E//Food"), UNKNOWN_CATEGORY),
+]
+
+
+def _frame(cases):
+    return pd.DataFrame([values for values, _ in cases], columns=["date", "amount", "category"]).assign(
+        description=" note ")
+
+
+def test_batch_reasons():
+    rows, errors = validate_frame(_frame(CASES), DATE_FORMAT)
+    assert errors.tolist() == [reason for _, reason in CASES]
+    good = rows[errors == ""]
+    assert good["category"].tolist() == ["Expense", "Income", "Expense/Food/Groceries"]
+    assert good["amount"].tolist() == [12.5, 3.0, 1.0]
+    assert set(good["description"]) == {"note"}
+    assert set(good["account"]) == {"Main"}
+
+
+@pytest.mark.parametrize("values, reason", CASES)
+def test_single_entries_follow_the_same_rules(values, reason):
+    if reason:
+        with pytest.raises(ValueError):
+            parse_entry(*values, " note ", DATE_FORMAT)
+    else:
+        date, amount, category, description = parse_entry(*values, " note ", DATE_FORMAT)
+        rows, _ = validate_frame(_frame([(values, reason)]), DATE_FORMAT)
+        assert (pd.Timestamp(date), amount, category, description) == (
+            rows["date"][0], rows["amount"][0], rows["category"][0], rows["description"][0])
+
+
+def test_signed_amounts_pick_the_category():
+    raw = pd.DataFrame({"date": ["05-01-2024"] * 3, "amount": ["-£1,250.00", "20", "-5"],
+                        "category": ["", "", "Expense/Rent"], "description": ["", "", ""],
+                        "account": ["", " Card ", None]})
+    rows, errors = validate_frame(raw, DATE_FORMAT, signed=True)
+    assert errors.tolist() == ["", "", ""]
+    assert rows["amount"].tolist() == [1250.0, 20.0, 5.0]
+    assert rows["category"].tolist() == ["Expense", "Income", "Expense/Rent"]
+    assert rows["account"].tolist() == ["Main", "Card", "Main"]
@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+tk = pytest.importorskip("tkinter")
+
+
+@pytest.fixture
+def root():
+    try:
+        root = tk.Tk()
+    except tk.TclError:
+        pytest.skip("no display")
+    root.withdraw()
+    yield root
+    root.destroy()
+
+
+@pytest.fixture
+def table(root):
+    from widgets import VirtualTable
+
+    def format_rows(frame, positions):
+        return [(str(frame.index[p]), frame["description"].iloc[p]) for p in positions]
+
+    table = VirtualTable(root, ["id", "description"], format_rows, height=5)
+    frame = pd.DataFrame({"description": [f"row {i}" for i in range(1000)]}, index=pd.RangeIndex(1, 1001))
+    table.set_rows(frame)
+    return table
+
+
+def _shown(table):
+    return [str(table.tree.item(item, "values")[0]) for item in table.tree.get_children()]
+
+
+def test_only_visible_rows_get_items(table):
+    assert len(table) == 1000
+    assert _shown(table) == ["1", "2", "3", "4", "5"]
+    table.scroll_to(500)
+    assert _shown(table) == ["501", "502", "503", "504", "505"]
+    table.scroll_to(10_000)
+    assert table.top == 995
+    assert len(table.tree.get_children()) == 5
+
+
+def test_slots_select_and_order_rows(table):
+    table.set_rows(table.frame, np.array([9, 3, 7]))
+    assert table.top == 0
+    assert _shown(table) == ["10", "4", "8"]
+
+
+def test_remove_slot_keeps_selection_on_its_row(table):
+    table.set_rows(table.frame, np.arange(10))
+    table.selected_row = 4
+    table.remove_slot(1)
+    assert table.selected_row == 3
+    assert table.selected_values() == ("5", "row 4")
+    table.remove_slot(4)
+    assert table.selected_row is None
+    assert len(table) == 8
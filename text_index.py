@@ -0,0 +1,174 @@
+import bisect
+import re
+
+import numpy as np
+import pandas as pd
+
+_TOKEN = re.compile(r"\w+")
+
+
+def tokenize(text):
+    """Lower-cased word tokens of a description."""
+    return _TOKEN.findall(str(text).lower())
+
+
+def _one_edit(a, b):
+    """True if ``a`` and ``b`` differ by at most one insertion, deletion, substitution or adjacent swap."""
+    if a == b:
+        return True
+    if abs(len(a) - len(b)) > 1:
+        return False
+    i = 0
+    while i < min(len(a), len(b)) and a[i] == b[i]:
+        i += 1
+    if len(a) > len(b):
+        return a[i + 1:] == b[i:]
+    if len(a) < len(b):
+        return a[i:] == b[i + 1:]
+    return a[i + 1:] == b[i + 1:] or (a[i:i + 2] == b[i:i + 2][::-1] and a[i + 2:] == b[i + 2:])
+
+
+def _deletes(token):
+    return {token[:i] + token[i + 1:] for i in range(len(token))}
+
+
+class TextIndex:
+    """
+    Inverted index over the words of each description.
+
+    Descriptions repeat a lot, so each distinct description gets a code
+    (``codes`` holds one per store slot) and the postings map every token
+    to the codes of the descriptions containing it. A query term matches
+    tokens that start with it (found by bisecting the sorted ``vocabulary``)
+    and, for terms of ``FUZZY_MIN`` or more characters, tokens one typo away
+    from it (through a map of single-character deletions, built on first
+    use). A row matches when its description matches every term; the codes
+    become a boolean table looked up by slot, so filtering a million rows
+    is one vectorized gather.
+
+    The index is built from the store's frame on the first search after a
+    (re)load, so sessions that never search do not pay for it. From then on
+    changes only patch the structures, like DateIndex: descriptions no
+    longer used stay in the vocabulary until the next reload.
+    """
+
+    # Shortest query term that also matches tokens one typo away
+    FUZZY_MIN = 4
+
+    def __init__(self, store):
+        self.store = store
+        self.built = False
+        self.codes = np.empty(0, dtype="int32")
+        self.descriptions = {}
+        self.postings = {}
+        self.vocabulary = []
+        self._near = None
+
+    def rebuild(self, df):
+        self.built = False
+        self.codes = np.empty(0, dtype="int32")
+        self.descriptions = {}
+        self.postings = {}
+        self.vocabulary = []
+        self._near = None
+
+    def _build(self):
+        codes, uniques = pd.factorize(self.store.slots_frame()["description"])
+        uniques = uniques.tolist()
+        postings = {}
+        for code, description in enumerate(uniques):
+            for token in set(tokenize(description)):
+                postings.setdefault(token, []).append(code)
+        self.postings = postings
+        self.vocabulary = sorted(postings)
+        self.descriptions = dict(zip(uniques, range(len(uniques))))
+        self.codes = codes.astype("int32")
+        self.built = True
+
+    def _code(self, description):
+        """Code of ``description``, indexing its tokens the first time it is seen."""
+        code = self.descriptions.get(description)
+        if code is None:
+            code = self.descriptions[description] = len(self.descriptions)
+            for token in set(tokenize(description)):
+                postings = self.postings.get(token)
+                if postings is None:
+                    postings = self.postings[token] = []
+                    bisect.insort(self.vocabulary, token)
+                    if self._near is not None:
+                        self._add_near(token)
+                postings.append(code)
+        return code
+
+    def _codes(self, descriptions):
+        return np.fromiter((self._code(d) for d in descriptions), dtype="int32", count=len(descriptions))
+
+    def on_append(self, df, positions):
+        if self.built:
+            self.codes = np.concatenate([self.codes, self._codes(df["description"].tolist())])
+
+    def on_update(self, position, old, new):
+        if self.built:
+            self.codes[position] = self._code(new.description)
+
+    def on_delete(self, position, old):
+        pass
+
+    # ---------- queries ----------
+    def _add_near(self, token):
+        for variant in _deletes(token) | {token}:
+            self._near.setdefault(variant, set()).add(token)
+
+    def _fuzzy(self, term):
+        if self._near is None:
+            self._near = {}
+            for token in self.vocabulary:
+                self._add_near(token)
+        candidates = set()
+        for variant in _deletes(term) | {term}:
+            candidates |= self._near.get(variant, set())
+        return [token for token in candidates if _one_edit(term, token)]
+
+    def tokens(self, term, fuzzy=True):
+        """Vocabulary tokens matched by one query term."""
+        lo = bisect.bisect_left(self.vocabulary, term)
+        hi = bisect.bisect_left(self.vocabulary, term + "\U0010ffff")
+        tokens = set(self.vocabulary[lo:hi])
+        if fuzzy and len(term) >= self.FUZZY_MIN:
+            tokens.update(self._fuzzy(term))
+        return tokens
+
+    def matches(self, query, fuzzy=True):
+        """Boolean table over description codes for ``query``, or None if it has no terms."""
+        terms = tokenize(query)
+        if not terms:
+            return None
+        hit = np.ones(len(self.descriptions), dtype=bool)
+        for term in terms:
+            term_hit = np.zeros(len(self.descriptions), dtype=bool)
+            for token in self.tokens(term, fuzzy):
+                term_hit[self.postings[token]] = True
+            hit &= term_hit
+        return hit
+
+    def filter(self, slots, query, fuzzy=True):
+        """The ``slots`` (kept in order) whose description matches ``query``."""
+        # A query without terms matches everything; no need to build the index for it.
+        if not tokenize(query):
+            return slots
+        if not self.built:
+            self._build()
+        hit = self.matches(query, fuzzy)
+        if hit is None:
+            return slots
+        return slots[hit[self.codes[slots]]]
+
+
+def description_matches(query, description, fuzzy=True):
+    """True if ``description`` matches ``query`` as TextIndex would, for rows outside the index."""
+    tokens = tokenize(description)
+    return all(
+        any(token.startswith(term) or (fuzzy and len(term) >= TextIndex.FUZZY_MIN and _one_edit(term, token))
+            for token in tokens)
+        for term in tokenize(query)
+    )
@@ -0,0 +1,141 @@
+"""
+Validation and parsing of candidate transactions.
+
+One set of rules for every way a transaction comes in: the date must match
+the ledger's format, the amount must be a positive number and the category
+must start with a known top level (``CATEGORY_ALIASES``), optionally
+followed by subcategories ("E/Food/Groceries" is stored as
+"Expense/Food/Groceries"; see categories.py). An empty account means
+``DEFAULT_ACCOUNT``. ``validate_frame`` checks a whole
+batch with vectorized pandas operations and returns a typed frame plus the
+reason each bad row failed. The ``parse_*`` helpers apply the same rules
+to a single entry with the standard library only, so adding from the CLI
+still does not import pandas (see fastpath.py). Either way values are
+parsed once, on the way in; the store keeps them typed.
+"""
+from datetime import datetime
+
+from categories import SEPARATOR
+
+CATEGORY_ALIASES = {"i": "Income", "income": "Income", "credit": "Income", "cr": "Income",
+                    "e": "Expense", "expense": "Expense", "debit": "Expense", "dr": "Expense"}
+# Account of rows entered without one (and of every row in older ledgers)
+DEFAULT_ACCOUNT = "Main"
+
+# Reasons reported per row by validate_frame
+INVALID_DATE = "invalid date"
+INVALID_AMOUNT = "invalid amount"
+ZERO_AMOUNT = "zero amount"
+NEGATIVE_AMOUNT = "negative amount"
+UNKNOWN_CATEGORY = "unknown category"
+
+
+def parse_date(value, date_format):
+    """``value`` as a datetime; strings must match ``date_format``."""
+    if isinstance(value, datetime):
+        return value
+    try:
+        return datetime.strptime(str(value).strip(), date_format)
+    except ValueError:
+        raise ValueError(f"Invalid date {value!r}; expected the format {date_format}.") from None
+
+
+def parse_amount(value):
+    """``value`` as a positive float."""
+    try:
+        amount = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid amount {value!r}; enter a number.") from None
+    if not amount > 0:
+        raise ValueError("Amount must be a positive, non-zero value.")
+    return amount
+
+
+def _category(value):
+    """The ledger category for ``value``, or None if it has no known top level or an empty level."""
+    top, *rest = str(value).split(SEPARATOR)
+    category = CATEGORY_ALIASES.get(top.strip().lower())
+    rest = [part.strip() for part in rest]
+    if category is None or not all(rest):
+        return None
+    return SEPARATOR.join([category] + rest)
+
+
+def parse_category(value):
+    """The ledger category for ``value`` ("I", "expense", "Debit", "E/Food/Groceries", ...)."""
+    category = _category(value)
+    if category is None:
+        raise ValueError(f"Unknown category {value!r}; use Income (I) or Expense (E), "
+                         f"optionally followed by subcategories such as E{SEPARATOR}Food.")
+    return category
+
+
+def parse_account(value):
+    """The account name for ``value``; empty means DEFAULT_ACCOUNT."""
+    return str(value or "").strip() or DEFAULT_ACCOUNT
+
+
+def parse_entry(date, amount, category, description, date_format):
+    """Check one entry; returns (datetime, amount, category, description) or raises ValueError."""
+    return (
+        parse_date(date, date_format),
+        parse_amount(amount),
+        parse_category(category),
+        str(description or "").strip(),
+    )
+
+
+def _map_distinct(series, fn):
+    """Apply ``fn`` once per distinct value instead of once per row."""
+    import pandas as pd
+
+    codes, uniques = pd.factorize(series)
+    return pd.Series([fn(value) for value in uniques], dtype=object).reindex(codes).set_axis(series.index)
+
+
+def validate_frame(raw, date_format, signed=False):
+    """
+    Check a batch of candidate rows at once.
+
+    ``raw`` has date, amount, category and description columns, usually as
+    strings, and optionally an account column. Returns (rows, errors): ``rows`` is typed (datetime64 dates,
+    float amounts) with NaT/NaN where a value did not parse, and ``errors``
+    holds one reason per row, "" for rows that are fine.
+
+    With ``signed``, as in bank statements, negative amounts are allowed:
+    rows without a category become Income (positive) or Expense (negative)
+    and amounts are stored as positive values.
+    """
+    import pandas as pd
+
+    from backends import parse_dates
+
+    dates = parse_dates(raw["date"], date_format, errors="coerce")
+    amounts = pd.to_numeric(raw["amount"], errors="coerce")
+    unparsed = amounts.isna() & (raw["amount"].astype(str).str.strip() != "")
+    if unparsed.any():
+        # Retry only the failures with currency symbols and separators removed.
+        cleaned = raw["amount"][unparsed].astype(str).str.replace(r"[^\d.\-]", "", regex=True)
+        amounts[unparsed] = pd.to_numeric(cleaned, errors="coerce")
+    given = _map_distinct(raw["category"].fillna(""), lambda value: str(value).strip().lower())
+    categories = _map_distinct(raw["category"].fillna(""), _category)
+    if signed:
+        from_sign = (given == "") & amounts.notna()
+        categories = categories.mask(from_sign, amounts.lt(0).map({True: "Expense", False: "Income"}))
+
+    errors = pd.Series("", index=raw.index, dtype=object)
+    errors = errors.mask(categories.isna(), UNKNOWN_CATEGORY)
+    if not signed:
+        errors = errors.mask(amounts.lt(0), NEGATIVE_AMOUNT)
+    errors = errors.mask(amounts.eq(0), ZERO_AMOUNT)
+    errors = errors.mask(amounts.isna(), INVALID_AMOUNT)
+    errors = errors.mask(dates.isna(), INVALID_DATE)
+
+    rows = pd.DataFrame({
+        "date": dates,
+        "amount": amounts.abs() if signed else amounts,
+        "category": categories.astype(object),
+        "description": _map_distinct(raw["description"].fillna(""), lambda value: str(value).strip()),
+        "account": _map_distinct(raw["account"].fillna(""), parse_account) if "account" in raw else DEFAULT_ACCOUNT,
+    })
+    return rows, errors
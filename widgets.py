@@ -0,0 +1,227 @@
+import tkinter as tk
+from tkinter import ttk
+
+import numpy as np
+
+import metrics
+
+
+class VirtualTable(ttk.Frame):
+    """
+    Treeview that only holds Tk items for the rows currently on screen.
+
+    The rows live in a DataFrame handed to ``set_rows``, optionally together
+    with an array of row positions (the store's slots) selecting and ordering
+    the rows to show. The widget keeps a fixed pool of items sized to the
+    viewport and rewrites their values as the user scrolls, so refreshing or
+    scrolling costs the same whether the ledger has a hundred rows or a
+    million. ``format_rows(frame, positions)`` turns the rows of the frame
+    at those positions into one tuple of display values per row.
+    """
+
+    def __init__(self, parent, columns, format_rows, height=10):
+        super().__init__(parent)
+        self.format_rows = format_rows
+        self.frame = None
+        self.slots = None
+        self.top = 0
+        self.visible = height
+        self.selected_row = None
+        self._items = []
+
+        self.tree = ttk.Treeview(self, columns=columns, show="headings", height=height, selectmode="browse")
+        for column in columns:
+            self.tree.heading(column, text=column)
+        self.scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self._on_scrollbar)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        self.tree.bind("<Configure>", self._on_resize)
+        self.tree.bind("<<TreeviewSelect>>", self._on_select)
+        self.tree.bind("<MouseWheel>", self._on_wheel)
+        self.tree.bind("<Button-4>", lambda e: self.scroll_to(self.top - 3))
+        self.tree.bind("<Button-5>", lambda e: self.scroll_to(self.top + 3))
+        self.tree.bind("<Up>", lambda e: self._move_selection(-1))
+        self.tree.bind("<Down>", lambda e: self._move_selection(1))
+        self.tree.bind("<Prior>", lambda e: self.scroll_to(self.top - self.visible))
+        self.tree.bind("<Next>", lambda e: self.scroll_to(self.top + self.visible))
+
+    def __len__(self):
+        if self.frame is None:
+            return 0
+        return len(self.frame) if self.slots is None else len(self.slots)
+
+    def _page(self, start, stop):
+        if self.slots is None:
+            return np.arange(start, min(stop, len(self.frame)))
+        return self.slots[start:stop]
+
+    def set_rows(self, frame, slots=None):
+        """Show ``frame`` (or its rows at ``slots``); keeps the scroll position where it still fits."""
+        self.frame = frame
+        self.slots = slots
+        if self.selected_row is not None and self.selected_row >= len(self):
+            self.selected_row = None
+        self.scroll_to(self.top)
+
+    def refresh(self, frame=None):
+        """Redraw the visible rows, e.g. after rows were edited in place."""
+        if frame is not None:
+            self.frame = frame
+        self._render()
+
+    def remove_slot(self, slot):
+        """Drop the row at ``slot`` without reloading the rest."""
+        if self.slots is None:
+            return
+        rows = np.flatnonzero(self.slots == slot)
+        if not len(rows):
+            return
+        self.slots = np.delete(self.slots, rows[0])
+        if self.selected_row is not None and self.selected_row >= rows[0]:
+            self.selected_row = self.selected_row - 1 if self.selected_row > rows[0] else None
+        self.scroll_to(self.top)
+
+    def scroll_to(self, top):
+        self.top = max(0, min(top, len(self) - self.visible))
+        self._render()
+        return "break"
+
+    @metrics.timed("VirtualTable.render")
+    def _render(self):
+        rows = [] if self.frame is None else self.format_rows(self.frame, self._page(self.top, self.top + self.visible))
+        while len(self._items) < len(rows):
+            self._items.append(self.tree.insert("", tk.END))
+        for item, values in zip(self._items, rows):
+            self.tree.item(item, values=values)
+        for item in self._items[len(rows):]:
+            self.tree.delete(item)
+        del self._items[len(rows):]
+
+        if self.tree.selection():
+            self.tree.selection_remove(*self.tree.selection())
+        if self.selected_row is not None and self.top <= self.selected_row < self.top + len(rows):
+            item = self._items[self.selected_row - self.top]
+            self.tree.selection_set(item)
+            self.tree.focus(item)
+
+        total = max(len(self), 1)
+        self.scrollbar.set(self.top / total, min(self.top + self.visible, total) / total)
+
+    def selected_values(self):
+        """Display values of the selected row, or None."""
+        if self.selected_row is None:
+            return None
+        return self.format_rows(self.frame, self._page(self.selected_row, self.selected_row + 1))[0]
+
+    # ---------- event handlers ----------
+    def _on_resize(self, event):
+        style = ttk.Style(self)
+        row_height = int(style.lookup("Treeview", "rowheight") or 20)
+        visible = max(1, (event.height - row_height) // row_height)
+        if visible != self.visible:
+            self.visible = visible
+            self.scroll_to(self.top)
+
+    def _on_select(self, event):
+        selection = self.tree.selection()
+        if selection and selection[0] in self._items:
+            self.selected_row = self.top + self._items.index(selection[0])
+
+    def _on_wheel(self, event):
+        return self.scroll_to(self.top - (event.delta // 120 or (1 if event.delta > 0 else -1)) * 3)
+
+    def _on_scrollbar(self, action, amount, unit=None):
+        if action == "moveto":
+            self.scroll_to(int(float(amount) * len(self)))
+        elif action == "scroll":
+            step = self.visible if unit == "pages" else 1
+            self.scroll_to(self.top + int(amount) * step)
+
+    def _move_selection(self, step):
+        if not len(self):
+            return "break"
+        row = 0 if self.selected_row is None else min(max(self.selected_row + step, 0), len(self) - 1)
+        self.selected_row = row
+        if row < self.top:
+            self.top = row
+        elif row >= self.top + self.visible:
+            self.top = row - self.visible + 1
+        return self.scroll_to(self.top)
+
+
+class PlotCanvas(ttk.Frame):
+    """
+    One embedded matplotlib figure whose lines are updated in place.
+
+    ``set_data`` swaps the data of the existing ``Line2D`` artists instead of
+    building a new figure. The lines are animated: a full redraw happens
+    only when the axis limits change (new ticks), and is cached as a
+    background bitmap; otherwise the background is restored and just the
+    lines are redrawn and blitted.
+    """
+
+    def __init__(self, parent, lines, title="", xlabel="", ylabel=""):
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        from matplotlib.figure import Figure
+
+        super().__init__(parent)
+        self.figure = Figure(figsize=(10, 5))
+        self.ax = self.figure.add_subplot()
+        self.ax.set_title(title)
+        self.ax.set_xlabel(xlabel)
+        self.ax.set_ylabel(ylabel)
+        self.ax.xaxis_date()
+        self.ax.grid(True)
+        self.lines = {
+            name: self.ax.plot([], [], color=color, label=name, animated=True)[0]
+            for name, color in lines.items()
+        }
+        self.ax.legend()
+        self.limits = None
+        self._background = None
+
+        self.canvas = FigureCanvasTkAgg(self.figure, master=self)
+        self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        self.canvas.mpl_connect("draw_event", self._on_draw)
+
+    def pixel_width(self):
+        """Width of the plotting area in pixels; decimate series to this many buckets."""
+        return max(int(self.ax.bbox.width), 100)
+
+    @metrics.timed("PlotCanvas.set_data")
+    def set_data(self, data):
+        """Show ``{line name: (x, y)}`` with ``x`` in matplotlib date numbers."""
+        for name, (x, y) in data.items():
+            self.lines[name].set_data(x, y)
+        limits = self._limits(data.values())
+        if limits != self.limits:
+            self.limits = limits
+            (x0, x1), (y0, y1) = limits
+            self.ax.set_xlim(x0, x1)
+            self.ax.set_ylim(y0, y1)
+            self.canvas.draw_idle()
+        elif self._background is not None:
+            self.canvas.restore_region(self._background)
+            self._draw_lines()
+            self.canvas.blit(self.figure.bbox)
+
+    @staticmethod
+    def _limits(data):
+        xs = [x for x, _ in data if len(x)]
+        ys = [y for _, y in data if len(y)]
+        if not xs:
+            return (0.0, 1.0), (0.0, 1.0)
+        x0 = min(float(x[0]) for x in xs)
+        x1 = max(float(x[-1]) for x in xs)
+        top = max(float(y.max()) for y in ys)
+        return (x0, x1 if x1 > x0 else x0 + 1), (0.0, top * 1.05 if top > 0 else 1.0)
+
+    def _draw_lines(self):
+        for line in self.lines.values():
+            self.ax.draw_artist(line)
+
+    def _on_draw(self, event):
+        # Runs inside a full draw, which puts the result on screen itself.
+        self._background = self.canvas.copy_from_bbox(self.figure.bbox)
+        self._draw_lines()